@@ -0,0 +1,13 @@
+"""
+Statistics shared by the benchmark scripts.
+"""
+
+import math
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list (None if it is empty)."""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark: booking throughput with and without the group-commit write queue
+
+Runs the same concurrent booking workload twice against a fresh SQLite
+file - once committing every booking on its own (the default) and once
+through the single-writer queue - and prints bookings/second, commit
+batches and failures for each mode.
+
+Usage:
+    python benchmarks/bench_group_commit.py --threads 16 --bookings 100
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'flight_reservation_system'))
+
+from flask import Flask
+from models import db, Flight
+from reservations import reserve_seats
+from write_queue import WriteQueue
+
+
+def build_app(db_path, queued, max_batch, max_wait_ms):
+    """Create a minimal app bound to its own database file"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'pool_size': 64, 'max_overflow': 64}
+    app.config['WRITE_QUEUE_ENABLED'] = queued
+    app.config['WRITE_QUEUE_MAX_BATCH'] = max_batch
+    app.config['WRITE_QUEUE_MAX_WAIT_MS'] = max_wait_ms
+    db.init_app(app)
+    queue = WriteQueue(app)
+    return app, queue
+
+
+def seed(app, flights, rows):
+    with app.app_context():
+        db.create_all()
+        for i in range(flights):
+            db.session.add(Flight(
+                id=f"BENCH{i}", airline="Bench Air", origin="DEL", destination="BOM",
+                date="2030-01-01", dep_time="10:00", arr_time="12:00", price=5000,
+                seat_rows=rows, seat_cols=6,
+            ))
+        db.session.commit()
+
+
+def run_mode(queued, threads, bookings, max_batch, max_wait_ms):
+    with tempfile.TemporaryDirectory() as tmp:
+        app, queue = build_app(os.path.join(tmp, 'bench.db'), queued, max_batch, max_wait_ms)
+        rows = bookings // 6 + 1
+        seed(app, threads, rows)
+
+        failures = []
+        latencies = []
+        lock = threading.Lock()
+        start_gate = threading.Barrier(threads + 1)
+
+        def worker(idx):
+            fid = f"BENCH{idx}"
+            seats = [f"{r}{c}" for r in range(1, rows + 1) for c in "ABCDEF"][:bookings]
+            with app.app_context():
+                start_gate.wait()
+                for seat in seats:
+                    t0 = time.perf_counter()
+                    try:
+                        queue.submit(reserve_seats, fid, [seat], "Bench User", "bench@example.com", "9999999999")
+                    except Exception as e:
+                        with lock:
+                            failures.append(type(e).__name__)
+                    finally:
+                        db.session.remove()
+                    with lock:
+                        latencies.append(time.perf_counter() - t0)
+
+        workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+        for w in workers:
+            w.start()
+        start_gate.wait()
+        t0 = time.perf_counter()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - t0
+
+        latencies.sort()
+        committed = threads * bookings - len(failures)
+        return {
+            "mode": "group-commit" if queued else "per-request",
+            "threads": threads,
+            "bookings": threads * bookings,
+            "committed": committed,
+            "failures": len(failures),
+            "failure_types": sorted(set(failures)),
+            "seconds": round(elapsed, 3),
+            "bookings_per_sec": round(committed / elapsed, 1) if elapsed else 0,
+            "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+            "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+            "commit_batches": queue.writer(app).batches_committed if queued else committed,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Group-commit booking benchmark")
+    parser.add_argument("--threads", type=int, default=16, help="concurrent booking threads")
+    parser.add_argument("--bookings", type=int, default=100, help="bookings per thread")
+    parser.add_argument("--max-batch", type=int, default=64, help="WRITE_QUEUE_MAX_BATCH")
+    parser.add_argument("--max-wait-ms", type=float, default=2, help="WRITE_QUEUE_MAX_WAIT_MS")
+    parser.add_argument("--json", help="write results to this file as JSON")
+    args = parser.parse_args()
+
+    results = [run_mode(queued, args.threads, args.bookings, args.max_batch, args.max_wait_ms)
+               for queued in (False, True)]
+
+    print(f"{'mode':<14}{'bookings/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'commits':>10}{'failures':>10}")
+    for r in results:
+        print(f"{r['mode']:<14}{r['bookings_per_sec']:>12}{r['p50_ms']:>10}{r['p99_ms']:>10}"
+              f"{r['commit_batches']:>10}{r['failures']:>10}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
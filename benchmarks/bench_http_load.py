@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Benchmark: HTTP load test with latency percentiles per endpoint
+
+Starts the app under gunicorn on a local port (``gunicorn.conf.py``, so
+workers warm their caches first) against a throwaway seeded SQLite file,
+then keeps ``--concurrency`` client connections busy for ``--duration``
+seconds. Each client sends a random request from the mix over a keep-alive
+connection and waits for the full response before sending the next:
+
+* ``flights``  - ``GET /api/flights``
+* ``bookings`` - ``GET /api/bookings``
+* ``seats``    - ``GET /api/flights/<id>/seats``
+* ``home``, ``search``, ``flight`` - the HTML pages ``/``, ``/search``, ``/flight/<fid>``
+* ``book``     - ``POST /api/bookings`` for random seats (off by default: it changes the data)
+
+Requests sent during the first ``--warmup`` seconds are not counted.
+Results are written as JSON: per endpoint the request and error counts,
+status codes, throughput, p50/p90/p95/p99 and a latency histogram over
+fixed logarithmic buckets (the same bounds in every run, so histograms
+from different commits can be compared bucket by bucket). ``--compare``
+prints the change against an earlier result file.
+
+Usage:
+    python benchmarks/bench_http_load.py --workers 4 --concurrency 32 --duration 30 --json load.json
+    python benchmarks/bench_http_load.py --mix flights=1,seats=1,book=1 --compare load.json
+    python benchmarks/bench_http_load.py --url http://127.0.0.1:5000 --flight-ids AI101,6E212
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from urllib.parse import urlencode, urlsplit
+
+from _stats import percentile
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'flight_reservation_system'))
+
+# Bucket upper bounds in ms: 0.1 ms to ~105 s, four buckets per doubling
+BUCKET_BOUNDS_MS = [round(0.1 * 2 ** (i / 4), 4) for i in range(81)]
+PERCENTILES = (50, 90, 95, 99)
+DEFAULT_MIX = "flights=20,bookings=10,seats=25,home=15,search=20,flight=10"
+READY_TIMEOUT = 60
+
+SEED_PROBE = r"""
+import json, random, sys
+from app import app
+from bootstrap import bootstrap_database
+from models import db, Flight
+from reservations import reserve_seats
+flights, bookings = int(sys.argv[1]), int(sys.argv[2])
+bootstrap_database(app)
+rng = random.Random(42)
+airports = ["DEL", "BOM", "BLR", "MAA", "CCU", "HYD", "GOI", "PNQ"]
+with app.app_context():
+    for i in range(flights):
+        origin, destination = rng.sample(airports, 2)
+        db.session.add(Flight(
+            id=f"LT{i}", airline="Load Air", origin=origin, destination=destination,
+            date=f"2030-01-{rng.randint(1, 28):02d}", dep_time=f"{rng.randint(0, 23):02d}:00",
+            arr_time="23:59", price=rng.randint(3000, 9000), seat_rows=30, seat_cols=6,
+        ))
+    db.session.commit()
+    for i in range(bookings):
+        reserve_seats(f"LT{i % flights}", [f"{i // flights + 1}A"], "Load Test", "load@example.com", "9999999999")
+    db.session.commit()
+    print(json.dumps([[f.id, f.origin, f.destination, f.seat_rows, f.seat_cols] for f in Flight.query.all()]))
+"""
+
+
+# ------------------ Request mix ------------------
+def search_path(rng, flight):
+    return "/search?" + urlencode({"origin": flight[1], "destination": flight[2]})
+
+
+def booking_body(rng, flight):
+    seat = f"{rng.randint(1, flight[3])}{'ABCDEF'[rng.randrange(min(flight[4], 6))]}"
+    return json.dumps({"flight_id": flight[0], "fullname": "Load Test", "email": "load@example.com",
+                       "phone": "9999999999", "seats": [seat]})
+
+
+# name -> (label, method, path(rng, flight), body(rng, flight) or None, expected statuses)
+ENDPOINTS = {
+    "flights": ("GET /api/flights", "GET", lambda rng, f: "/api/flights", None, (200,)),
+    "bookings": ("GET /api/bookings", "GET", lambda rng, f: "/api/bookings", None, (200,)),
+    "seats": ("GET /api/flights/<id>/seats", "GET", lambda rng, f: f"/api/flights/{f[0]}/seats", None, (200,)),
+    "home": ("GET /", "GET", lambda rng, f: "/", None, (200,)),
+    "search": ("GET /search", "GET", search_path, None, (200,)),
+    "flight": ("GET /flight/<fid>", "GET", lambda rng, f: f"/flight/{f[0]}", None, (200,)),
+    # 400 is a seat that was already taken: the expected outcome of a race, not an error
+    "book": ("POST /api/bookings", "POST", lambda rng, f: "/api/bookings", booking_body, (201, 400)),
+}
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint: {name}. Use one of: {', '.join(ENDPOINTS)}")
+        mix[name.strip()] = float(weight or 1)
+    if sum(mix.values()) <= 0:
+        raise ValueError("Endpoint mix weights must add up to more than 0")
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+# ------------------ Server ------------------
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(host, port, process):
+    deadline = time.monotonic() + READY_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=2)
+            conn.request("GET", "/ready")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"gunicorn was not ready after {READY_TIMEOUT}s")
+
+
+def start_server(env, workers, threads):
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--workers", str(workers),
+         "--threads", str(threads), "--bind", f"127.0.0.1:{port}", "--log-level", "warning", "app:app"],
+        cwd=APP_DIR, env=env)
+    try:
+        wait_ready("127.0.0.1", port, process)
+    except Exception:
+        process.terminate()
+        process.wait()
+        raise
+    return process, f"http://127.0.0.1:{port}"
+
+
+# ------------------ Load ------------------
+class Recorder:
+    """Latency samples and status codes per endpoint, shared by the client threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}       # label -> [ms]
+        self.statuses = {}      # label -> {status: count}
+        self.errors = {}        # label -> count
+
+    def record(self, label, ms, status, ok):
+        with self.lock:
+            self.samples.setdefault(label, []).append(ms)
+            statuses = self.statuses.setdefault(label, {})
+            statuses[status] = statuses.get(status, 0) + 1
+            if not ok:
+                self.errors[label] = self.errors.get(label, 0) + 1
+
+
+def client(url, flights, mix, seed, measure_from, stop_at, recorder):
+    parts = urlsplit(url)
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+    while time.monotonic() < stop_at:
+        label, method, path, body, expected = ENDPOINTS[rng.choices(names, weights)[0]]
+        flight = rng.choice(flights)
+        payload = body(rng, flight) if body else None
+        headers = {"Content-Type": "application/json"} if payload else {}
+        start = time.monotonic()
+        try:
+            conn.request(method, path(rng, flight), body=payload, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+            status = "error"
+        end = time.monotonic()
+        if start >= measure_from:
+            recorder.record(label, (end - start) * 1000, status, status in expected)
+    conn.close()
+
+
+def run_load(url, flights, mix, concurrency, duration, warmup, seed):
+    recorder = Recorder()
+    measure_from = time.monotonic() + warmup
+    stop_at = measure_from + duration
+    threads = [threading.Thread(target=client, args=(url, flights, mix, seed * 1000 + i, measure_from,
+                                                     stop_at, recorder)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return recorder
+
+
+# ------------------ Results ------------------
+def histogram(values):
+    """Counts per bucket of BUCKET_BOUNDS_MS; the last count is everything above the last bound."""
+    counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+    for value in values:
+        counts[bisect_left(BUCKET_BOUNDS_MS, value)] += 1
+    return counts
+
+
+def summarize(values, errors, duration):
+    values = sorted(values)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "per_sec": round(len(values) / duration, 1),
+        "mean_ms": round(sum(values) / len(values), 3),
+        **{f"p{p}_ms": round(percentile(values, p), 3) for p in PERCENTILES},
+        "max_ms": round(values[-1], 3),
+    }
+
+
+def results(recorder, duration):
+    endpoints = {}
+    for label in sorted(recorder.samples):
+        values = recorder.samples[label]
+        endpoints[label] = {
+            **summarize(values, recorder.errors.get(label, 0), duration),
+            "statuses": {str(status): count for status, count in sorted(recorder.statuses[label].items(),
+                                                                           key=lambda item: str(item[0]))},
+            "histogram": histogram(values),
+        }
+    every = [ms for values in recorder.samples.values() for ms in values]
+    return {
+        "total": summarize(every, sum(recorder.errors.values()), duration) if every else None,
+        "histogram_bounds_ms": BUCKET_BOUNDS_MS,
+        "endpoints": endpoints,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def relative_change(current, before, key):
+    return f"{(current[key] - before[key]) / before[key]:+.0%}" if before[key] else "n/a"
+
+
+def print_table(report, baseline=None):
+    rows = [("all", report["total"])] + list(report["endpoints"].items())
+    print(f"{'endpoint':<30}{'requests':>10}{'req/s':>9}{'errors':>8}"
+          + "".join(f"{f'p{p} ms':>10}" for p in PERCENTILES))
+    for label, r in rows:
+        if r is None:
+            continue
+        print(f"{label:<30}{r['requests']:>10}{r['per_sec']:>9}{r['errors']:>8}"
+              + "".join(f"{r[f'p{p}_ms']:>10}" for p in PERCENTILES))
+        before = None
+        if baseline:
+            before = baseline["total"] if label == "all" else baseline["endpoints"].get(label)
+        if before:
+            print(f"{'  vs ' + str(baseline.get('commit') or 'baseline'):<30}{'':>10}"
+                  f"{relative_change(r, before, 'per_sec'):>9}{'':>8}"
+                  + "".join(f"{relative_change(r, before, f'p{p}_ms'):>10}" for p in PERCENTILES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP load test with per-endpoint latency percentiles")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn worker processes")
+    parser.add_argument("--threads", type=int, default=1, help="gunicorn threads per worker")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent client connections")
+    parser.add_argument("--duration", type=float, default=10, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=2, help="seconds of load before measuring")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="endpoints and weights")
+    parser.add_argument("--flights", type=int, default=200, help="extra flights seeded for the run")
+    parser.add_argument("--bookings", type=int, default=500, help="bookings seeded for the run")
+    parser.add_argument("--url", help="load an already running server instead of starting gunicorn")
+    parser.add_argument("--flight-ids", help="with --url: comma-separated flight ids to request")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this file as JSON")
+    parser.add_argument("--compare", help="earlier JSON result to compare against")
+    args = parser.parse_args()
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.url and not args.flight_ids:
+        parser.error("--url needs --flight-ids")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = None
+        if args.url:
+            url = args.url
+            flights = [[fid, "", "", 30, 6] for fid in args.flight_ids.split(",")]
+        else:
+            env = dict(os.environ, FRS_DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'load.db')}")
+            out = subprocess.run([sys.executable, "-c", SEED_PROBE, str(args.flights), str(args.bookings)],
+                                 cwd=APP_DIR, env=env, capture_output=True, text=True, check=True)
+            flights = json.loads(out.stdout.strip().splitlines()[-1])
+            server, url = start_server(env, args.workers, args.threads)
+        try:
+            recorder = run_load(url, flights, mix, args.concurrency, args.duration, args.warmup, args.seed)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    report = {
+        "commit": git_commit(),
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {"workers": args.workers, "threads": args.threads, "concurrency": args.concurrency,
+                   "duration": args.duration, "warmup": args.warmup, "mix": mix, "url": args.url,
+                   "storage_profile": os.environ.get("FRS_STORAGE_PROFILE", "compat")},
+        **results(recorder, args.duration),
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_table(report, baseline)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
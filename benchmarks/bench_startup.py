@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark: worker cold start
+
+Each sample runs in a fresh interpreter (as a newly spawned gunicorn
+worker would) and reports how long ``import app`` takes, whether the PDF/QR
+stack or NumPy got imported, and how long the first request takes. The bootstrap
+command is timed separately on an empty and on an already seeded database.
+
+Usage:
+    python benchmarks/bench_startup.py --samples 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'flight_reservation_system'))
+
+WORKER_PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+client = app.app.test_client()
+client.get("/api/flights")
+t2 = time.perf_counter()
+heavy = [m for m in ("reportlab", "qrcode", "PIL", "numpy") if m in sys.modules]
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "first_request_ms": (t2 - t1) * 1000, "heavy_modules": heavy}))
+"""
+
+BOOTSTRAP_PROBE = r"""
+import json, time
+import app
+from bootstrap import bootstrap_database
+t0 = time.perf_counter()
+bootstrap_database(app.app)
+print(json.dumps({"bootstrap_ms": (time.perf_counter() - t0) * 1000}))
+"""
+
+
+def run_probe(code, env):
+    out = subprocess.run([sys.executable, "-c", code], cwd=APP_DIR, env=env,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def summarize(values):
+    return {"median": round(statistics.median(values), 1), "min": round(min(values), 1), "max": round(max(values), 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker cold-start benchmark")
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--json", help="write results to this file as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, FRS_DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+
+        first_bootstrap = run_probe(BOOTSTRAP_PROBE, env)["bootstrap_ms"]
+        repeat_bootstrap = run_probe(BOOTSTRAP_PROBE, env)["bootstrap_ms"]
+        samples = [run_probe(WORKER_PROBE, env) for _ in range(args.samples)]
+
+    results = {
+        "import_ms": summarize([s["import_ms"] for s in samples]),
+        "first_request_ms": summarize([s["first_request_ms"] for s in samples]),
+        "heavy_modules_at_start": samples[0]["heavy_modules"],
+        "bootstrap_empty_db_ms": round(first_bootstrap, 1),
+        "bootstrap_seeded_db_ms": round(repeat_bootstrap, 1),
+    }
+
+    print(f"import app          median {results['import_ms']['median']} ms "
+          f"(min {results['import_ms']['min']}, max {results['import_ms']['max']})")
+    print(f"first request       median {results['first_request_ms']['median']} ms")
+    print(f"heavy modules loaded {', '.join(results['heavy_modules_at_start']) or 'no'}")
+    print(f"bootstrap           empty DB {results['bootstrap_empty_db_ms']} ms, "
+          f"seeded DB {results['bootstrap_seeded_db_ms']} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
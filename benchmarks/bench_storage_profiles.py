@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark: booking and search throughput across SQLite storage profiles
+
+For every profile in storage.PROFILES a fresh database is seeded and a
+mixed workload runs for a fixed time: writer threads create bookings
+while reader threads run route searches the way GET /search does (so
+WAL profiles serve them from the read-only pool).
+
+Usage:
+    python benchmarks/bench_storage_profiles.py --seconds 5 --writers 4 --readers 8
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'flight_reservation_system'))
+
+from flask import Flask
+from models import db, Flight
+from reservations import reserve_seats
+from storage import PROFILES, configure_database, install_storage_profile
+from write_queue import WriteQueue
+
+AIRPORTS = ["DEL", "BOM", "BLR", "MAA", "CCU", "HYD", "GOI", "PNQ"]
+
+
+def build_app(db_path, profile):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'pool_size': 32, 'max_overflow': 32}
+    configure_database(app, profile)
+    db.init_app(app)
+    install_storage_profile(app, db)
+    return app, WriteQueue(app)
+
+
+def seed(app, flights):
+    rng = random.Random(42)
+    with app.app_context():
+        db.create_all()
+        for i in range(flights):
+            origin, destination = rng.sample(AIRPORTS, 2)
+            db.session.add(Flight(
+                id=f"PF{i}", airline="Bench Air", origin=origin, destination=destination,
+                date=f"2030-01-{rng.randint(1, 28):02d}", dep_time=f"{rng.randint(0, 23):02d}:00",
+                arr_time="23:59", price=rng.randint(3000, 9000), seat_rows=40, seat_cols=6,
+            ))
+        db.session.commit()
+
+
+def run_profile(profile, seconds, writers, readers, flights):
+    with tempfile.TemporaryDirectory() as tmp:
+        app, queue = build_app(os.path.join(tmp, 'bench.db'), profile)
+        seed(app, flights)
+
+        counts = {"bookings": 0, "searches": 0, "errors": 0}
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        def writer(idx):
+            seats = iter(f"{r}{c}" for r in range(1, 41) for c in "ABCDEF")
+            flight_ids = [f"PF{i}" for i in range(idx, flights, writers)]
+            with app.app_context():
+                while not stop.is_set():
+                    try:
+                        seat = next(seats)
+                    except StopIteration:
+                        seats = iter(f"{r}{c}" for r in range(1, 41) for c in "ABCDEF")
+                        flight_ids = flight_ids[1:] + flight_ids[:1]
+                        continue
+                    try:
+                        queue.submit(reserve_seats, flight_ids[0], [seat], "Bench", "b@example.com", "9999999999")
+                        key = "bookings"
+                    except Exception:
+                        key = "errors"
+                    finally:
+                        db.session.remove()
+                    with lock:
+                        counts[key] += 1
+
+        def reader(idx):
+            rng = random.Random(idx)
+            while not stop.is_set():
+                origin, destination = rng.sample(AIRPORTS, 2)
+                with app.test_request_context("/search", method="GET"):
+                    app.preprocess_request()
+                    try:
+                        flights_found = Flight.query.filter_by(origin=origin, destination=destination).all()
+                        [f.to_dict() for f in flights_found]
+                        key = "searches"
+                    except Exception:
+                        key = "errors"
+                    finally:
+                        db.session.remove()
+                with lock:
+                    counts[key] += 1
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+        threads += [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+
+        return {
+            "profile": profile,
+            "bookings_per_sec": round(counts["bookings"] / seconds, 1),
+            "searches_per_sec": round(counts["searches"] / seconds, 1),
+            "errors": counts["errors"],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite storage profile benchmark")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--flights", type=int, default=400)
+    parser.add_argument("--profiles", nargs="*", default=list(PROFILES))
+    parser.add_argument("--json", help="write results to this file as JSON")
+    args = parser.parse_args()
+
+    results = [run_profile(p, args.seconds, args.writers, args.readers, args.flights) for p in args.profiles]
+
+    print(f"{'profile':<18}{'bookings/s':>12}{'searches/s':>12}{'errors':>8}")
+    for r in results:
+        print(f"{r['profile']:<18}{r['bookings_per_sec']:>12}{r['searches_per_sec']:>12}{r['errors']:>8}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Benchmark: discrete-event traffic simulation against the real Flask routes
+
+Simulated users arrive as a Poisson process and each follows a scripted
+session through the HTML routes, with exponential think times between
+steps:
+
+* ``browse`` - search, then open one to three flights
+* ``book``   - search, open a flight, book seats, pay, download the ticket
+* ``cancel`` - the booking session, then cancel the booking
+
+Every step is an event on a simulated clock. Events run in time order
+through the WSGI test client of a full ``create_app()`` application, so
+each request goes through routing, templates, pricing, caches and the
+database exactly as it would under gunicorn, with no browser or network.
+Worker processes share one throwaway SQLite file (like gunicorn workers
+share ``database.db``); each simulates its share of the arrival rate with
+its own random stream, and the per-route latencies are merged.
+
+By default events run back to back, which measures how much traffic the
+processes can serve. ``--realtime`` paces them to the simulated clock, so
+latency is measured at the offered load, and the report shows how far
+behind schedule the processes fell.
+
+Usage:
+    python benchmarks/bench_traffic.py --rate 20 --duration 60 --processes 4
+    python benchmarks/bench_traffic.py --mix browse=50,book=40,cancel=10 --realtime --json traffic.json
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+from _stats import percentile
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'flight_reservation_system'))
+sys.path.insert(0, APP_DIR)
+
+AIRPORTS = ["DEL", "BOM", "BLR", "MAA", "CCU", "HYD", "GOI", "PNQ"]
+SEAT_ROWS, SEAT_COLS = 60, "ABCDEF"
+BOOKING_ATTEMPTS = 3        # a user picks other seats this often when theirs were taken
+DEFAULT_MIX = "browse=70,book=25,cancel=5"
+
+
+def parse_mix(value):
+    """``"browse=3,book=1"`` -> ``{"browse": 0.75, "book": 0.25}``."""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in SESSIONS:
+            raise ValueError(f"Unknown session type: {name}. Use one of: {', '.join(SESSIONS)}")
+        mix[name.strip()] = float(weight)
+    total = sum(mix.values())
+    if total <= 0:
+        raise ValueError("Session mix weights must add up to more than 0")
+    return {name: weight / total for name, weight in mix.items()}
+
+
+# ------------------ Database ------------------
+def seed(db_url, flights, seed_value):
+    """Bootstrap a fresh database and add ``flights`` future flights with large cabins."""
+    os.environ["FRS_DATABASE_URL"] = db_url
+    from app import create_app
+    from bootstrap import bootstrap_database
+    from models import db, Flight
+
+    app = create_app()
+    bootstrap_database(app)
+    rng = random.Random(seed_value)
+    with app.app_context():
+        for i in range(flights):
+            origin, destination = rng.sample(AIRPORTS, 2)
+            db.session.add(Flight(
+                id=f"TS{i}", airline="Sim Air", origin=origin, destination=destination,
+                date=f"2030-01-{rng.randint(1, 28):02d}", dep_time=f"{rng.randint(0, 23):02d}:00",
+                arr_time="23:59", price=rng.randint(3000, 9000), seat_rows=SEAT_ROWS, seat_cols=len(SEAT_COLS),
+            ))
+        db.session.commit()
+        catalogue = [(f.id, f.origin, f.destination, f.date, f.seat_rows, f.seat_cols) for f in Flight.query.all()]
+        db.engine.dispose()
+    return catalogue
+
+
+# ------------------ Sessions ------------------
+class User:
+    """One simulated visitor: own cookie jar, own random choices."""
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.rng = sim.rng
+        self.client = sim.app.test_client()
+        self.pnr = None
+
+    def think(self):
+        return self.rng.expovariate(1 / self.sim.think) if self.sim.think > 0 else 0.0
+
+    def request(self, route, method, path, ok_statuses=(200,), **kwargs):
+        start = time.perf_counter()
+        response = self.client.open(path, method=method, **kwargs)
+        response.get_data()
+        self.sim.record(route, time.perf_counter() - start, response.status_code in ok_statuses)
+        return response
+
+    def search(self):
+        flight = self.rng.choice(self.sim.catalogue)
+        query = {"origin": flight[1], "destination": flight[2]}
+        if self.rng.random() < 0.5:
+            query["date"] = flight[3]
+        self.request("GET /search", "GET", "/search", query_string=query)
+        return flight
+
+    def view(self, flight):
+        self.request("GET /flight/<fid>", "GET", f"/flight/{flight[0]}")
+
+    def book(self, flight):
+        """Book one or two seats; True once a booking is held (``self.pnr``)."""
+        _, _, _, _, rows, cols = flight
+        for _ in range(BOOKING_ATTEMPTS):
+            count = self.rng.choice((1, 1, 1, 2))
+            seats = {f"{self.rng.randint(1, rows)}{SEAT_COLS[self.rng.randrange(min(cols, len(SEAT_COLS)))]}"
+                     for _ in range(count)}
+            response = self.request("POST /book", "POST", "/book", ok_statuses=(302,), data={
+                "flight_id": flight[0], "fullname": "Sim User", "email": "sim@example.com",
+                "phone": "9999999999", "seats": sorted(seats)})
+            location = response.headers.get("Location", "")
+            if "/payment/" in location:
+                self.pnr = location.rsplit("/payment/", 1)[1]
+                return True
+            self.sim.counters["seat_conflicts"] += 1
+        self.sim.counters["failed_bookings"] += 1
+        return False
+
+    def pay(self):
+        self.request("GET /payment/<pnr>", "GET", f"/payment/{self.pnr}")
+        yield self.think()
+        self.request("POST /payment/<pnr>", "POST", f"/payment/{self.pnr}", ok_statuses=(302,))
+
+
+def browse_session(user):
+    flight = user.search()
+    for _ in range(user.rng.randint(1, 3)):
+        yield user.think()
+        user.view(flight)
+
+
+def book_session(user):
+    flight = user.search()
+    yield user.think()
+    user.view(flight)
+    yield user.think()
+    if not user.book(flight):
+        return
+    yield from user.pay()
+    yield user.think()
+    user.request("GET /ticket/<pnr>/download", "GET", f"/ticket/{user.pnr}/download")
+    user.sim.counters["bookings"] += 1
+
+
+def cancel_session(user):
+    yield from book_session(user)
+    if user.pnr is None:
+        return
+    yield user.think()
+    user.request("POST /cancel_booking/<pnr>", "POST", f"/cancel_booking/{user.pnr}", ok_statuses=(302,))
+    user.sim.counters["cancellations"] += 1
+
+
+SESSIONS = {"browse": browse_session, "book": book_session, "cancel": cancel_session}
+
+
+# ------------------ Simulation ------------------
+class Simulation:
+    """Event loop of one worker process: session arrivals and steps on a simulated clock."""
+
+    def __init__(self, app, catalogue, rng, rate, duration, mix, think, realtime):
+        self.app = app
+        self.catalogue = catalogue
+        self.rng = rng
+        self.rate = rate
+        self.duration = duration
+        self.mix = mix
+        self.think = think
+        self.realtime = realtime
+        self.latencies = {}     # route -> [seconds]
+        self.errors = {}        # route -> count
+        self.counters = dict.fromkeys(("sessions", "bookings", "cancellations", "seat_conflicts",
+                                       "failed_bookings"), 0)
+        self.max_lag = 0.0
+
+    def record(self, route, seconds, ok):
+        self.latencies.setdefault(route, []).append(seconds)
+        if not ok:
+            self.errors[route] = self.errors.get(route, 0) + 1
+
+    def run(self):
+        names, weights = list(self.mix), list(self.mix.values())
+        events = []             # (simulated time, tie-breaker, session generator or None for an arrival)
+        order = itertools.count()
+        if self.rate > 0:
+            heapq.heappush(events, (self.rng.expovariate(self.rate), next(order), None))
+        started = time.perf_counter()
+        while events:
+            at, _, session = heapq.heappop(events)
+            if self.realtime:
+                behind = time.perf_counter() - started - at
+                if behind < 0:
+                    time.sleep(-behind)
+                self.max_lag = max(self.max_lag, behind)
+            if session is None:
+                # New visitor; sessions that started in time run to completion
+                following = at + self.rng.expovariate(self.rate)
+                if following < self.duration:
+                    heapq.heappush(events, (following, next(order), None))
+                session = SESSIONS[self.rng.choices(names, weights)[0]](User(self))
+                self.counters["sessions"] += 1
+            try:
+                delay = next(session)
+            except StopIteration:
+                continue
+            heapq.heappush(events, (at + delay, next(order), session))
+        return time.perf_counter() - started
+
+
+def run_worker(task):
+    index, db_url, catalogue, options = task
+    # A fresh interpreter (spawn): the app is created after the database URL is set
+    os.environ["FRS_DATABASE_URL"] = db_url
+    from app import create_app
+
+    app = create_app()
+    sim = Simulation(app, catalogue, random.Random(options["seed"] * 1000 + index),
+                     options["rate"] / options["processes"], options["duration"], options["mix"],
+                     options["think"], options["realtime"])
+    elapsed = sim.run()
+    return {"elapsed": elapsed, "latencies": sim.latencies, "errors": sim.errors,
+            "counters": sim.counters, "max_lag": sim.max_lag}
+
+
+def summarize(results, duration, realtime):
+    wall = max(r["elapsed"] for r in results)
+    routes = {}
+    for route in sorted({route for r in results for route in r["latencies"]}):
+        values = sorted(v for r in results for v in r["latencies"].get(route, []))
+        routes[route] = {
+            "requests": len(values),
+            "errors": sum(r["errors"].get(route, 0) for r in results),
+            "per_sec": round(len(values) / wall, 1) if wall else None,
+            "mean_ms": round(sum(values) / len(values) * 1000, 2),
+            **{f"p{p}_ms": round(percentile(values, p) * 1000, 2) for p in (50, 95, 99)},
+            "max_ms": round(values[-1] * 1000, 2),
+        }
+    counters = {name: sum(r["counters"][name] for r in results) for name in results[0]["counters"]}
+    total = sum(route["requests"] for route in routes.values())
+    return {
+        "simulated_seconds": duration,
+        "wall_seconds": round(wall, 2),
+        "requests": total,
+        "requests_per_sec": round(total / wall, 1) if wall else None,
+        "max_lag_seconds": round(max(r["max_lag"] for r in results), 3) if realtime else None,
+        **counters,
+        "routes": routes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Discrete-event traffic simulation of the web app")
+    parser.add_argument("--rate", type=float, default=20, help="user sessions starting per simulated second")
+    parser.add_argument("--duration", type=float, default=60, help="simulated seconds during which users arrive")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="session types and weights")
+    parser.add_argument("--think", type=float, default=5, help="mean think time between steps, in seconds")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--flights", type=int, default=200, help="extra flights seeded for the run")
+    parser.add_argument("--realtime", action="store_true", help="pace events to the simulated clock")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this file as JSON")
+    args = parser.parse_args()
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{os.path.join(tmp, 'traffic.db')}"
+        catalogue = seed(db_url, args.flights, args.seed)
+
+        options = {"rate": args.rate, "duration": args.duration, "mix": mix, "think": args.think,
+                   "processes": args.processes, "realtime": args.realtime, "seed": args.seed}
+        tasks = [(i, db_url, catalogue, options) for i in range(args.processes)]
+        with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+            results = pool.map(run_worker, tasks)
+    summary = summarize(results, args.duration, args.realtime)
+
+    print(f"{summary['sessions']:,} sessions, {summary['requests']:,} requests in {summary['wall_seconds']}s "
+          f"({summary['requests_per_sec']} req/s); {summary['bookings']:,} bookings, "
+          f"{summary['cancellations']:,} cancellations, {summary['seat_conflicts']:,} seat conflicts")
+    if args.realtime:
+        print(f"max lag behind the simulated clock: {summary['max_lag_seconds']}s")
+    print(f"{'route':<30}{'requests':>10}{'req/s':>9}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for route, r in summary["routes"].items():
+        print(f"{route:<30}{r['requests']:>10}{r['per_sec']:>9}{r['errors']:>8}"
+              f"{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
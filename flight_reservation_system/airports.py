@@ -0,0 +1,120 @@
+"""
+Airport and route autocomplete backed by an in-memory prefix index.
+
+The index is a sorted list of ``(key, code)`` pairs where each airport is
+filed under its code, its city, its airport name and every word of those,
+all lowercased. The suggestions for a prefix are the contiguous run of keys
+starting at ``bisect_left(prefix)``, so a lookup costs one binary search
+plus the handful of matches returned, however many airports there are.
+
+It is built from the distinct routes in the flights table and cached in the
+catalogue cache as a network entry: bookings and fare changes leave it
+alone, a flight being added, removed or re-routed in this worker rebuilds it
+on the next lookup, and other workers' changes show up within the TTL.
+"""
+
+import bisect
+
+from catalog_cache import catalog_cache
+from models import db, Flight
+
+# code -> (city, airport name). Codes missing here are still suggested by code.
+AIRPORTS = {
+    "AMD": ("Ahmedabad", "Sardar Vallabhbhai Patel International Airport"),
+    "ATQ": ("Amritsar", "Sri Guru Ram Dass Jee International Airport"),
+    "BBI": ("Bhubaneswar", "Biju Patnaik International Airport"),
+    "BLR": ("Bengaluru", "Kempegowda International Airport"),
+    "BOM": ("Mumbai", "Chhatrapati Shivaji Maharaj International Airport"),
+    "CCU": ("Kolkata", "Netaji Subhas Chandra Bose International Airport"),
+    "COK": ("Kochi", "Cochin International Airport"),
+    "DEL": ("Delhi", "Indira Gandhi International Airport"),
+    "GAU": ("Guwahati", "Lokpriya Gopinath Bordoloi International Airport"),
+    "GOI": ("Goa", "Dabolim Airport"),
+    "GOX": ("Goa", "Manohar International Airport"),
+    "HYD": ("Hyderabad", "Rajiv Gandhi International Airport"),
+    "IXC": ("Chandigarh", "Chandigarh International Airport"),
+    "JAI": ("Jaipur", "Jaipur International Airport"),
+    "LKO": ("Lucknow", "Chaudhary Charan Singh International Airport"),
+    "MAA": ("Chennai", "Chennai International Airport"),
+    "NAG": ("Nagpur", "Dr. Babasaheb Ambedkar International Airport"),
+    "PAT": ("Patna", "Jay Prakash Narayan Airport"),
+    "PNQ": ("Pune", "Pune Airport"),
+    "SXR": ("Srinagar", "Sheikh ul-Alam International Airport"),
+    "TRV": ("Thiruvananthapuram", "Trivandrum International Airport"),
+    "VNS": ("Varanasi", "Lal Bahadur Shastri International Airport"),
+}
+
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 50
+
+
+def describe(code):
+    """Suggestion dict for one airport code."""
+    city, name = AIRPORTS.get(code, (code, code))
+    return {"code": code, "city": city, "name": name, "label": f"{city} ({code})"}
+
+
+class AirportIndex:
+    """Sorted prefix index over airport codes, cities and names."""
+
+    def __init__(self, routes):
+        self.destinations = {}   # origin -> sorted destination codes
+        for origin, destination in routes:
+            self.destinations.setdefault(origin, set()).add(destination)
+        self.reachable = {origin: frozenset(codes) for origin, codes in self.destinations.items()}
+        self.destinations = {origin: sorted(codes) for origin, codes in self.destinations.items()}
+
+        codes = set(self.destinations).union(*self.destinations.values())
+        entries = set()
+        for code in codes:
+            city, name = AIRPORTS.get(code, ("", ""))
+            keys = {code, city, name} | set(city.split()) | set(name.split())
+            entries.update((key.lower(), code) for key in keys if key)
+        self.keys = sorted(entries)
+        self.codes = sorted(codes)
+        self.known = codes
+
+    @classmethod
+    def from_database(cls):
+        return cls(db.session.query(Flight.origin, Flight.destination).distinct())
+
+    def _matches(self, prefix):
+        keys = self.keys
+        i = bisect.bisect_left(keys, (prefix, ""))
+        while i < len(keys) and keys[i][0].startswith(prefix):
+            yield keys[i][1]
+            i += 1
+
+    def suggest(self, q="", origin=None, limit=DEFAULT_LIMIT):
+        """Airport codes matching prefix ``q``, exact code match first.
+
+        With ``origin`` only destinations reachable from it are returned;
+        an empty ``q`` then lists all of them.
+        """
+        allowed = self.reachable.get(origin, frozenset()) if origin else None
+        prefix = q.strip().lower()
+        if not prefix:
+            candidates = self.destinations.get(origin, ()) if origin else self.codes
+            return list(candidates[:limit])
+
+        found = []
+        exact = prefix.upper()
+        if exact in self.known and (allowed is None or exact in allowed):
+            found.append(exact)
+        for code in self._matches(prefix):
+            if len(found) >= limit:
+                break
+            if code not in found and (allowed is None or code in allowed):
+                found.append(code)
+        return found
+
+
+@catalog_cache.register_warmup
+def airport_index():
+    """The current worker's index, rebuilt when the route network changes."""
+    return catalog_cache.network_entry("airport_index", AirportIndex.from_database)
+
+
+def suggest_airports(q="", origin=None, limit=DEFAULT_LIMIT):
+    """Suggestion dicts for the autocomplete endpoint."""
+    return [describe(code) for code in airport_index().suggest(q, origin, limit)]
@@ -0,0 +1,89 @@
+"""
+Amenity dictionary and bitmask encoding.
+
+Every distinct amenity name owns one bit (its row in the ``amenities``
+table) and a flight stores the OR of its amenities' bits in
+``flights.amenity_mask``. Serializing a flight is a lookup in a table of
+mask -> names lists filled on first use instead of a JSON parse, and "has
+WiFi and a meal" becomes bitwise ANDs the database evaluates.
+
+Filters match names loosely: case and punctuation are ignored and a
+trailing "s" is optional, so ``wifi,meals`` finds "WiFi" and "Meal". Names
+that normalize the same way ("Wi-Fi", "WiFi") are interchangeable.
+"""
+
+import re
+import threading
+
+MAX_AMENITIES = 63  # bits of a signed 64-bit column
+
+
+def amenity_key(name):
+    """Normalized form used to match filter terms against amenity names.
+
+    Applied to both sides, so "Meals" matches ``meal`` as well as ``meals``.
+    """
+    key = re.sub(r"[^a-z0-9]", "", name.lower())
+    return key[:-1] if len(key) > 1 and key.endswith("s") else key
+
+
+class AmenityTable:
+    """In-memory copy of the amenity dictionary plus the mask -> names table."""
+
+    def __init__(self, rows=()):
+        self.lock = threading.Lock()
+        self.load(rows)
+
+    def load(self, rows):
+        """Replace the dictionary with ``(bit, name)`` rows."""
+        names = dict(rows)
+        by_key = {}
+        for bit, name in names.items():
+            key = amenity_key(name)
+            by_key[key] = by_key.get(key, 0) | (1 << bit)
+        with self.lock:
+            self.names = names                  # bit -> name
+            self.bits = {name: bit for bit, name in names.items()}
+            self.by_key = by_key                # normalized name -> mask of its spellings
+            self.known_mask = sum(1 << bit for bit in names)
+            self.lists = {0: []}                # mask -> names, filled on demand
+
+    def covers(self, mask):
+        return mask & ~self.known_mask == 0
+
+    def missing(self, names):
+        return [name for name in dict.fromkeys(names) if name not in self.bits]
+
+    def free_bits(self, count):
+        bits = [bit for bit in range(MAX_AMENITIES) if bit not in self.names][:count]
+        if len(bits) < count:
+            raise ValueError(f"At most {MAX_AMENITIES} distinct amenities are supported")
+        return bits
+
+    def mask_of(self, names):
+        """Bitmask for names that are all in the dictionary."""
+        mask = 0
+        for name in names:
+            mask |= 1 << self.bits[name]
+        return mask
+
+    def names_for(self, mask):
+        """Amenity names encoded in ``mask``, in dictionary order (shared list, do not mutate)."""
+        names = self.lists.get(mask)
+        if names is None:
+            names = [self.names[bit] for bit in sorted(self.names) if mask >> bit & 1]
+            self.lists[mask] = names
+        return names
+
+    def filter_masks(self, terms):
+        """One mask per filter term; a flight matches a term if it has any bit of it.
+
+        Raises ValueError for terms that match no amenity.
+        """
+        masks = []
+        for term in terms:
+            mask = self.by_key.get(amenity_key(term))
+            if not mask:
+                raise ValueError(f"Unknown amenity: {term}")
+            masks.append(mask)
+        return masks
@@ -1,93 +1,63 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
-from flask_sqlalchemy import SQLAlchemy
-import json, os, random, string, datetime
-from io import BytesIO
+from flask import (Flask, Blueprint, render_template, request, redirect, url_for, flash, jsonify,
+                   current_app, get_template_attribute)
+from sqlalchemy import and_
+import json, os, datetime, heapq
 from flask import send_file
-import qrcode
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from PIL import Image
-from reportlab.lib.utils import ImageReader
-import datetime
-from models import db, Flight, Booking, User
+from models import db, Flight, Booking, User, amenity_filter, amenity_table
+from pricing import parse_date, price_flights, price_trend
+import pricing_rules
+from pagination import keyset_page, parse_cursor, sorted_by_departure
+from projection import encoded_flights, parse_fields, project
+from seatmap import seat_map, FORMATS as SEAT_MAP_FORMATS
+from assets import static_assets
+from fragment_cache import fragment_cache
+from price_history import price_history, to_datetime
+from airports import suggest_airports, MAX_LIMIT as MAX_SUGGESTIONS, DEFAULT_LIMIT as DEFAULT_SUGGESTIONS
+from bootstrap import bootstrap_database, bootstrap_command
+from bulk_import import import_command
+from revenue_simulator import simulate_command
+from catalog_cache import catalog_cache
+from fast_json import FastJSONProvider
+from fares import fare_calendar
+from itineraries import itinerary_planner
+from reservations import (FlightNotFound, BookingNotFound, SeatUnavailable, InvalidBookingState,
+                          reserve_seats, confirm_booking, update_booking,
+                          cancel_booking as cancel_booking_op)
+from storage import configure_database, install_storage_profile
+from write_queue import write_queue
 
 
 
-app = Flask(__name__)
-app.secret_key = "super-secret-key"
-
-# SQLAlchemy configuration
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///database.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
-
-DATA_DIR = os.path.dirname(os.path.abspath(__file__))
-FLIGHTS_FILE = os.path.join(DATA_DIR, "flights.json")
-BOOKINGS_FILE = os.path.join(DATA_DIR, "bookings.json")
 ADMIN_PASS = os.environ.get("FRS_ADMIN_PASS", "admin123")
 
-# ------------------ One-time DB bootstrap on first deploy ------------------
-def _load_json(path, default):
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return default
-
-def initialize_database_if_needed():
-    """Create tables and seed data on empty DB (first run)."""
-    with app.app_context():
-        db.create_all()
-
-        # Seed flights
-        if Flight.query.count() == 0:
-            flights_data = _load_json(FLIGHTS_FILE, {"flights": []}).get("flights", [])
-            for item in flights_data:
-                flight = Flight(
-                    id=item.get("id"),
-                    airline=item.get("airline", ""),
-                    origin=item.get("origin", ""),
-                    destination=item.get("destination", ""),
-                    date=item.get("date", ""),
-                    dep_time=item.get("dep_time", ""),
-                    arr_time=item.get("arr_time", ""),
-                    price=item.get("price", 0),
-                    status=item.get("status", "On Time"),
-                    gate=item.get("gate", "A1"),
-                    terminal=item.get("terminal", "T1"),
-                    seat_rows=item.get("seats", {}).get("rows", 12),
-                    seat_cols=item.get("seats", {}).get("cols", 6),
-                )
-                flight.set_booked_seats(item.get("seats", {}).get("booked", []))
-                flight.set_amenities(item.get("amenities", []))
-                db.session.add(flight)
-
-        # Seed bookings
-        if Booking.query.count() == 0:
-            bookings_data = _load_json(BOOKINGS_FILE, {"bookings": []}).get("bookings", [])
-            for item in bookings_data:
-                booking = Booking(
-                    pnr=item.get("pnr"),
-                    flight_id=item.get("flight_id", ""),
-                    fullname=item.get("fullname", ""),
-                    email=item.get("email", ""),
-                    phone=item.get("phone", ""),
-                    amount=item.get("amount", 0),
-                    status=item.get("status", "PENDING"),
-                    created_at=item.get("created_at", datetime.datetime.now().strftime("%d-%m-%Y %H:%M")),
-                )
-                booking.set_seats(item.get("seats", []))
-                db.session.add(booking)
-
-        # Ensure an admin user exists
-        if not User.query.filter_by(username="admin").first():
-            admin_user = User(username="admin", password=ADMIN_PASS, role="admin")
-            db.session.add(admin_user)
-
-        db.session.commit()
-
-# Initialize at import time so each Render dyno boots a ready DB
-initialize_database_if_needed()
+bp = Blueprint("main", __name__)
+
+# ------------------ Application factory ------------------
+def create_app(config=None):
+    """Build a configured app. Does no database I/O; run the bootstrap command for that."""
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    app.secret_key = "super-secret-key"
+    app.config["ADMIN_PASS"] = ADMIN_PASS
+    if config:
+        app.config.update(config)
+
+    # SQLAlchemy configuration (FRS_DATABASE_URL / FRS_STORAGE_PROFILE, see storage.py)
+    configure_database(app)
+    db.init_app(app)
+    install_storage_profile(app, db)
+    write_queue.init_app(app)
+    catalog_cache.init_app(app)
+    itinerary_planner.init_app(app)
+    static_assets.init_app(app)
+    fragment_cache.init_app(app)
+    price_history.init_app(app)
+
+    app.register_blueprint(bp)
+    app.cli.add_command(bootstrap_command)
+    app.cli.add_command(import_command)
+    app.cli.add_command(simulate_command)
+    return app
 
 # ------------------ Database Utilities ------------------
 def find_flight(fid):
@@ -98,73 +68,193 @@ def find_booking(pnr):
     """Find a booking by PNR"""
     return db.session.get(Booking, pnr)
 
-def generate_pnr(prefix="IN"):
-    code = "".join(random.choices(string.ascii_uppercase + string.digits, k=4))
-    return f"{prefix}-{code}"
+MAX_FLEX_DAYS = 7
 
-@app.template_filter("date_in")
-def date_in(value, format="%d-%m-%Y"):
+def date_window(date, flex_days):
+    """First and last date (YYYY-MM-DD) of a ±flex_days search around ``date``"""
+    if not flex_days:
+        return date, date
     try:
-        return datetime.datetime.strptime(value, "%Y-%m-%d").strftime(format)
-    except:
-        return value
+        center = datetime.datetime.strptime(date, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError("date must be YYYY-MM-DD when flex_days is used")
+    delta = datetime.timedelta(days=flex_days)
+    return (center - delta).strftime("%Y-%m-%d"), (center + delta).strftime("%Y-%m-%d")
+
+def parse_flex_days(value):
+    """``flex_days`` query parameter, clamped to 0..MAX_FLEX_DAYS"""
+    try:
+        return min(max(int(value or 0), 0), MAX_FLEX_DAYS)
+    except ValueError:
+        raise ValueError("flex_days must be an integer")
+
+def parse_limit(value):
+    """``limit`` query parameter: a positive integer, or None when not given"""
+    if not value:
+        return None
+    try:
+        limit = int(value)
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return limit
+
+def parse_amenities(args):
+    """Amenity names from ``?amenities=wifi,meals`` (the parameter may also repeat)"""
+    return [a.strip() for value in args.getlist("amenities") for a in value.split(",") if a.strip()]
+
+MAX_BATCH_IDS = 100
+
+def parse_ids(value):
+    """Flight IDs from ``?ids=A,B,C`` in request order, without duplicates"""
+    ids = list(dict.fromkeys(i.strip() for i in (value or "").split(",") if i.strip()))
+    if len(ids) > MAX_BATCH_IDS:
+        raise ValueError(f"At most {MAX_BATCH_IDS} ids per request")
+    return ids
+
+def matching_flights(origin, destination, window, condition=None, fields=None):
+    """Flights for a search: extra SQL conditions (amenities, ids) run in the database,
+    the rest comes from the catalogue cache.
+
+    Flights loaded outside the cache are built with only ``fields``.
+    """
+    if condition is not None:
+        return catalog_cache.flights_where(condition, origin, destination, *(window or (None, None)),
+                                           fields=fields)
+    if window:
+        return catalog_cache.flights_between(origin, destination, *window, fields=fields)
+    return catalog_cache.flights(origin, destination)
+
+def group_by_date(flights):
+    """{date: [flights]} in date order"""
+    grouped = {}
+    for f in sorted(flights, key=lambda f: f["date"]):
+        grouped.setdefault(f["date"], []).append(f)
+    return grouped
+
+# ------------------ Result pages ------------------
+HOME_CARD_CLASSES = "animate__animated animate__fadeInUp"
+
+def next_page_url(cursor):
+    """This page's URL with ``after`` moved on to ``cursor``; None on the last page."""
+    if cursor is None:
+        return None
+    args = request.args.to_dict(flat=False)
+    args.pop("partial", None)
+    args["after"] = cursor
+    return url_for(request.endpoint, **args)
+
+def results_page(flights, next_cursor, results_by_date=None, selected_date=None, classes=""):
+    """"Load more" response: the rendered cards of one page and the URL of the next."""
+    flight_results = get_template_attribute("_flight_results.html", "flight_results")
+    return jsonify({
+        "success": True,
+        "html": flight_results(flights, results_by_date, selected_date, classes),
+        "count": len(flights),
+        "next_url": next_page_url(next_cursor),
+    })
+
+@bp.app_template_filter("date_in")
+def date_in(value, format="%d-%m-%Y"):
+    # parse_date is memoized: each distinct date is parsed once per worker
+    day = parse_date(value)
+    return day.strftime(format) if day is not None else value
 
 # ------------------ Routes ------------------
-@app.route("/")
+@bp.route("/")
 def home():
-    flights = Flight.query.all()
-    flights_data = [f.to_dict() for f in flights]
-    origins = sorted(set([f.origin for f in flights]))
-    destinations = sorted(set([f.destination for f in flights]))
-    return render_template("home.html", flights=flights_data,
-                           origins=origins, destinations=destinations)
-
-
-@app.context_processor
+    try:
+        after = parse_cursor(request.args.get("after"))
+    except ValueError as e:
+        if request.args.get("partial"):
+            return jsonify({"success": False, "error": str(e)}), 400
+        flash(str(e), "danger")
+        after = None
+    flights, next_cursor = catalog_cache.departures_page(after)
+    if request.args.get("partial"):
+        return results_page(flights, next_cursor, classes=HOME_CARD_CLASSES)
+
+    dimensions = catalog_cache.dimensions()
+    return render_template("home.html", flights=flights, card_classes=HOME_CARD_CLASSES,
+                           next_url=next_page_url(next_cursor),
+                           origins=dimensions["origins"], destinations=dimensions["destinations"])
+
+
+@bp.app_context_processor
 def inject_now():
     return {'now': datetime.datetime.utcnow()}
 
-@app.route("/search")
+@bp.route("/search")
 def search():
     origin = request.args.get("origin", "").upper()
     destination = request.args.get("destination", "").upper()
     date = request.args.get("date", "")
     max_price = request.args.get("max_price", "")
+    amenities = parse_amenities(request.args)
+    window_error = None
+    try:
+        flex_days = parse_flex_days(request.args.get("flex_days"))
+        if date and parse_date(date) is None:
+            raise ValueError("date must be YYYY-MM-DD")
+        window = date_window(date, flex_days) if date else None
+    except ValueError as e:
+        window_error = str(e)
+        flash(window_error, "danger")
+        flex_days, window = 0, (date, date)
+    try:
+        amenity_condition = amenity_filter(amenities) if amenities else None
+    except ValueError as e:
+        flash(str(e), "danger")
+        amenities, amenity_condition = [], None
 
-    # Build query filters
-    query = Flight.query
-    
-    if origin:
-        query = query.filter(Flight.origin == origin)
-    if destination:
-        query = query.filter(Flight.destination == destination)
-    if date:
-        query = query.filter(Flight.date == date)
-    if max_price:
-        query = query.filter(Flight.price <= int(max_price))
+    try:
+        after = parse_cursor(request.args.get("after"))
+    except ValueError as e:
+        if request.args.get("partial"):
+            return jsonify({"success": False, "error": str(e)}), 400
+        flash(str(e), "danger")
+        after = None
+
+    # Route results come from the warm catalogue cache; dates are one range lookup
+    if origin or destination or window or amenity_condition is not None or max_price:
+        results_data = matching_flights(origin, destination, window, amenity_condition)
+        if max_price:
+            results_data = [f for f in results_data if f["price"] <= int(max_price)]
+        results_data, next_cursor = keyset_page(*sorted_by_departure(results_data), after)
+    else:
+        results_data, next_cursor = catalog_cache.departures_page(after)
+    results_by_date = group_by_date(results_data) if flex_days else None
+    if request.args.get("partial"):
+        return results_page(results_data, next_cursor, results_by_date, date)
     
-    results = query.all()
-    results_data = [f.to_dict() for f in results]
+    # Connecting itineraries (direct flights are already in results), shown on the first page
+    itineraries = []
+    if origin and destination and after is None and window_error is None:
+        itineraries = [i for i in itinerary_planner.search(origin, destination, date or None) if i["stops"] > 0]
     
-    # Get all flights for dropdown options
-    all_flights = Flight.query.all()
-    origins = sorted(set([f.origin for f in all_flights]))
-    destinations = sorted(set([f.destination for f in all_flights]))
+    # Dropdown options
+    dimensions = catalog_cache.dimensions()
 
     return render_template(
         "search.html",
         results=results_data,
-        q={"origin": origin, "destination": destination, "date": date, "max_price": max_price},
-        origins=origins,
-        destinations=destinations
+        results_by_date=results_by_date,
+        next_url=next_page_url(next_cursor),
+        itineraries=itineraries,
+        q={"origin": origin, "destination": destination, "date": date, "max_price": max_price,
+           "flex_days": flex_days, "amenities": amenities},
+        amenity_names=sorted(amenity_table().bits),
+        origins=dimensions["origins"],
+        destinations=dimensions["destinations"]
     )
 
-@app.route("/flight/<fid>")
+@bp.route("/flight/<fid>")
 def flight_details(fid):
     flight = find_flight(fid)
     if not flight:
         flash("Flight not found", "danger")
-        return redirect(url_for("home"))
+        return redirect(url_for(".home"))
 
     flight_data = flight.to_dict()
     return render_template(
@@ -174,7 +264,7 @@ def flight_details(fid):
     )
 
 
-@app.route("/book", methods=["POST"])
+@bp.route("/book", methods=["POST"])
 def book():
     fid = request.form.get("flight_id")
     fullname = request.form.get("fullname")
@@ -184,65 +274,39 @@ def book():
 
     if not seats:
         flash("Please select at least one seat.", "warning")
-        return redirect(url_for("flight_details", fid=fid))
+        return redirect(url_for(".flight_details", fid=fid))
 
     # Find flight
     flight = find_flight(fid)
     if not flight:
         flash("Flight not found", "danger")
-        return redirect(url_for("home"))
+        return redirect(url_for(".home"))
 
     try:
-        # Start database transaction
-        # Validate seat availability
-        booked_seats = flight.get_booked_seats()
-        for s in seats:
-            if s in booked_seats:
-                flash(f"Seat {s} already booked!", "danger")
-                return redirect(url_for("flight_details", fid=fid))
-
-        # Reserve seats now (mark as booked to avoid race conditions)
-        for seat in seats:
-            flight.add_booked_seat(seat)
-        
-        # Generate unique PNR
-        pnr = generate_pnr(fid)
-        while find_booking(pnr):  # Ensure PNR is unique
-            pnr = generate_pnr(fid)
-
-        # Calculate amount using dynamic pricing
-        dynamic_price = flight.calculate_dynamic_price()
-        
-        # Create booking with PENDING status
-        booking = Booking(
-            pnr=pnr,
-            flight_id=fid,
-            fullname=fullname,
-            email=email,
-            phone=phone,
-            amount=dynamic_price * len(seats),
-            status="PENDING",
-            created_at=datetime.datetime.now().strftime("%d-%m-%Y %H:%M")
-        )
-        booking.set_seats(seats)
-        
-        db.session.add(booking)
-        db.session.commit()
+        # Validate and reserve seats, then create the PENDING booking in one
+        # transaction (queued behind other writers when group commit is on)
+        booking = write_queue.submit(reserve_seats, fid, seats, fullname, email, phone)
 
         # Redirect to payment simulation page
-        return redirect(url_for("payment", pnr=pnr))
-        
+        return redirect(url_for(".payment", pnr=booking["pnr"]))
+
+    except SeatUnavailable as e:
+        flash(str(e), "danger")
+        return redirect(url_for(".flight_details", fid=fid))
+    except FlightNotFound as e:
+        flash(str(e), "danger")
+        return redirect(url_for(".home"))
     except Exception as e:
         db.session.rollback()
         flash(f"Booking failed: {str(e)}", "danger")
-        return redirect(url_for("flight_details", fid=fid))
+        return redirect(url_for(".flight_details", fid=fid))
 
-@app.route("/booking/<pnr>")
+@bp.route("/booking/<pnr>")
 def booking_details(pnr):
     booking = find_booking(pnr)
     if not booking:
         flash("Booking not found", "danger")
-        return redirect(url_for("home"))
+        return redirect(url_for(".home"))
 
     flight = find_flight(booking.flight_id)
     
@@ -254,60 +318,37 @@ def booking_details(pnr):
     show_modal = True if request.args.get("confirmed") == "1" else False
     return render_template("booking.html", booking=booking_data, flight=flight_data, show_modal=show_modal)
 
-@app.route("/booking_search")
+@bp.route("/booking_search")
 def booking_search():
     pnr = request.args.get("pnr", "").strip()
     if not pnr:
         flash("Enter a PNR to search.", "warning")
-        return redirect(url_for("home"))
+        return redirect(url_for(".home"))
     
     booking = find_booking(pnr)
     if not booking:
         flash("PNR not found.", "danger")
-        return redirect(url_for("home"))
+        return redirect(url_for(".home"))
     
-    return redirect(url_for("booking_details", pnr=pnr))
+    return redirect(url_for(".booking_details", pnr=pnr))
 
-@app.route("/ticket/<pnr>/download")
+@bp.route("/ticket/<pnr>/download")
 def download_ticket(pnr):
     booking = find_booking(pnr)
     if not booking:
         flash("Booking not found.", "danger")
-        return redirect(url_for("home"))
+        return redirect(url_for(".home"))
     
     flight = find_flight(booking.flight_id)
     flight_data = flight.to_dict() if flight else {}
 
-    # generate QR (PNG in memory)
-    qr_img = qrcode.make(booking.pnr)
-    qr_io = BytesIO()
-    qr_img.save(qr_io, format="PNG")
-    qr_io.seek(0)
-
-    # create PDF
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
-    w, h = A4
-    c.setFont("Helvetica-Bold", 20)
-    c.drawString(40, h - 80, "FlightCraft Studio ✈️ — E-Ticket")
-    c.setFont("Helvetica", 12)
-    c.drawString(40, h - 120, f"PNR: {booking.pnr}")
-    c.drawString(40, h - 140, f"Passenger: {booking.fullname}")
-    c.drawString(40, h - 160, f"Phone: {booking.phone}")
-    c.drawString(40, h - 180, f"Flight: {flight_data.get('airline','')} ({flight_data.get('id','')})")
-    c.drawString(40, h - 200, f"Route: {flight_data.get('origin','')} → {flight_data.get('destination','')}")
-    c.drawString(40, h - 220, f"Date/Time: {flight_data.get('date','')} {flight_data.get('dep_time','')}-{flight_data.get('arr_time','')}")
-    c.drawString(40, h - 240, f"Seats: {', '.join(booking.get_seats())}")
-    # place QR
-    img = ImageReader(qr_io)
-    c.drawImage(img, w - 180, h - 260, width=120, height=120)
-    c.showPage()
-    c.save()
-    buffer.seek(0)
+    # reportlab/qrcode are only loaded the first time a ticket is requested
+    from tickets import render_ticket_pdf
+    buffer = render_ticket_pdf(booking, flight_data)
 
     return send_file(buffer, as_attachment=True, download_name=f"ticket_{pnr}.pdf", mimetype="application/pdf")
 
-@app.route("/booking/<pnr>/receipt.json")
+@bp.route("/booking/<pnr>/receipt.json")
 def download_json_receipt(pnr):
     """Generate and return booking receipt in JSON format"""
     booking = find_booking(pnr)
@@ -427,7 +468,7 @@ def download_json_receipt(pnr):
     return response
 
 
-@app.route("/admin", methods=["GET", "POST"])
+@bp.route("/admin", methods=["GET", "POST"])
 def admin():
     key = request.form.get("key") or request.args.get("key")
     if key != ADMIN_PASS:
@@ -474,7 +515,7 @@ def admin():
                     status=request.form.get("status") or "On Time",
                     gate=request.form.get("gate") or "A1",
                     terminal=request.form.get("terminal") or "T1",
-                    amenities=json.dumps(amenities)
+                    amenities=amenities
                 )
                 
                 db.session.add(new_flight)
@@ -501,9 +542,9 @@ def admin():
                     flight.gate = request.form.get("gate")
                     flight.terminal = request.form.get("terminal")
                     
-                    # Update amenities as JSON
+                    # Update amenities (bitmask over the amenity dictionary)
                     amenities = [a.strip() for a in (request.form.get("amenities") or "").split(",") if a.strip()]
-                    flight.amenities = json.dumps(amenities)
+                    flight.set_amenities(amenities)
                     
                     db.session.commit()
                     flash(f"Flight {fid} updated successfully!", "info")
@@ -527,7 +568,7 @@ def admin():
                 db.session.rollback()
                 flash(f"Error removing flight: {str(e)}", "danger")
 
-        return redirect(url_for("admin", key=key))
+        return redirect(url_for(".admin", key=key))
 
     return render_template("admin.html",
                            flights=flights_data,
@@ -535,64 +576,54 @@ def admin():
                            total_rev=total_rev,
                            key=ADMIN_PASS)
 
-@app.route("/payment/<pnr>", methods=["GET", "POST"])
+@bp.route("/payment/<pnr>", methods=["GET", "POST"])
 def payment(pnr):
     booking = find_booking(pnr)
     if not booking:
         flash("Booking not found.", "danger")
-        return redirect(url_for("home"))
+        return redirect(url_for(".home"))
 
     if request.method == "POST":
         try:
             # Simulate payment success
-            booking.status = "CONFIRMED"
-            db.session.commit()
+            write_queue.submit(confirm_booking, pnr)
 
             flash(f"Payment successful! Booking confirmed. PNR: {pnr}", "success")
             # redirect to booking details and show modal
-            return redirect(url_for("booking_details", pnr=pnr, confirmed=1))
+            return redirect(url_for(".booking_details", pnr=pnr, confirmed=1))
         
         except Exception as e:
             db.session.rollback()
             flash(f"Payment failed: {str(e)}", "danger")
-            return redirect(url_for("payment", pnr=pnr))
+            return redirect(url_for(".payment", pnr=pnr))
 
     # GET -> show mock payment page
     return render_template("payment.html", booking=booking.to_dict())
 
-@app.route("/cancel_booking/<pnr>", methods=["POST"])
+@bp.route("/cancel_booking/<pnr>", methods=["POST"])
 def cancel_booking(pnr):
     booking = find_booking(pnr)
     if not booking:
         flash("Booking not found.", "danger")
-        return redirect(url_for("home"))
+        return redirect(url_for(".home"))
     
     if booking.status != "CONFIRMED":
         flash("Only confirmed bookings can be cancelled.", "warning")
-        return redirect(url_for("booking_details", pnr=pnr))
+        return redirect(url_for(".booking_details", pnr=pnr))
     
     try:
-        # Load flight and release seats
-        flight = find_flight(booking.flight_id)
-        
-        if flight:
-            # Remove booked seats from flight
-            for seat in booking.get_seats():
-                flight.remove_booked_seat(seat)
-        
-        # Update booking status to cancelled
-        booking.status = "CANCELLED"
-        db.session.commit()
-        
+        # Release seats and mark the booking as cancelled
+        write_queue.submit(cancel_booking_op, pnr, required_status="CONFIRMED")
+
         flash(f"Booking {pnr} has been cancelled successfully. Seats have been released.", "info")
-        return redirect(url_for("booking_details", pnr=pnr))
+        return redirect(url_for(".booking_details", pnr=pnr))
         
     except Exception as e:
         db.session.rollback()
         flash(f"Cancellation failed: {str(e)}", "danger")
-        return redirect(url_for("booking_details", pnr=pnr))
+        return redirect(url_for(".booking_details", pnr=pnr))
 
-@app.route("/booked_flights")
+@bp.route("/booked_flights")
 def booked_flights():
     # Get all bookings from database
     bookings = Booking.query.all()
@@ -614,14 +645,14 @@ def booked_flights():
     
     return render_template("booked_flights.html", booked_flights=booked_flights_data)
 
-@app.route("/api-demo")
+@bp.route("/api-demo")
 def api_demo():
     """Display API demo page"""
     return render_template("api_demo.html")
 
 # -------------- API Endpoints for Dynamic Pricing --------------
 
-@app.route("/api/flight/<fid>/price")
+@bp.route("/api/flight/<fid>/price")
 def api_get_flight_price(fid):
     """API endpoint to get current dynamic price for a flight"""
     flight = find_flight(fid)
@@ -638,21 +669,22 @@ def api_get_flight_price(fid):
         "timestamp": datetime.datetime.now().isoformat()
     })
 
-@app.route("/api/flights/prices")
+@bp.route("/api/flights/prices")
 def api_get_all_prices():
     """API endpoint to get dynamic prices for all flights"""
     flights = Flight.query.all()
     
+    # One batch pricing pass; the trend comes from the same price
     prices_data = []
-    for flight in flights:
+    for flight, dynamic_price in zip(flights, price_flights(flights)):
         prices_data.append({
             "flight_id": flight.id,
             "airline": flight.airline,
             "route": f"{flight.origin} → {flight.destination}",
             "date": flight.date,
             "base_price": flight.price,
-            "dynamic_price": flight.calculate_dynamic_price(),
-            "price_trend": flight.get_price_trend(),
+            "dynamic_price": dynamic_price,
+            "price_trend": price_trend(flight.price, dynamic_price),
             "occupancy_rate": round(flight.get_occupancy_rate(), 2)
         })
     
@@ -662,7 +694,7 @@ def api_get_all_prices():
         "total_flights": len(prices_data)
     })
 
-@app.route("/api/theme", methods=["POST"])
+@bp.route("/api/theme", methods=["POST"])
 def api_set_theme():
     """API endpoint to save user theme preference"""
     try:
@@ -684,7 +716,7 @@ def api_set_theme():
     except Exception as e:
         return jsonify({"error": "Failed to save theme preference"}), 500
 
-@app.route("/api/search/dynamic")
+@bp.route("/api/search/dynamic")
 def api_dynamic_search():
     """API endpoint for flight search with dynamic pricing"""
     origin = request.args.get("origin", "").upper()
@@ -724,7 +756,70 @@ def api_dynamic_search():
         "total_results": len(filtered_results)
     })
 
-@app.route("/api/pricing/analysis")
+@bp.route("/api/itineraries")
+def api_search_itineraries():
+    """API endpoint for direct and connecting itineraries between two airports"""
+    origin = request.args.get("origin", "").upper()
+    destination = request.args.get("destination", "").upper()
+    date = request.args.get("date", "")
+    sort_by = request.args.get("sort_by", "duration")  # duration, price
+
+    if not origin or not destination:
+        return jsonify({"success": False, "error": "origin and destination are required"}), 400
+
+    try:
+        max_legs = min(int(request.args.get("max_legs", 3)), 4)
+        min_layover = int(request.args.get("min_layover", 45))
+        max_layover = int(request.args.get("max_layover", 360))
+        limit = min(int(request.args.get("limit", 10)), 50)
+        itineraries = itinerary_planner.search(origin, destination, date or None, min_layover,
+                                               max_layover, max_legs, limit)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    if sort_by == "price":
+        itineraries.sort(key=lambda i: i["total_dynamic_price"])
+
+    return jsonify({
+        "success": True,
+        "itineraries": itineraries,
+        "search_params": {
+            "origin": origin,
+            "destination": destination,
+            "date": date,
+            "max_legs": max_legs,
+            "min_layover": min_layover,
+            "max_layover": max_layover,
+            "sort_by": sort_by
+        },
+        "timestamp": datetime.datetime.now().isoformat(),
+        "total_results": len(itineraries)
+    })
+
+@bp.route("/api/fares/calendar")
+def api_fare_calendar():
+    """API endpoint for the cheapest dynamic fare per day of a month on one route"""
+    origin = request.args.get("origin", "").upper()
+    destination = request.args.get("destination", "").upper()
+    month = request.args.get("month", "")
+
+    if not origin or not destination:
+        return jsonify({"success": False, "error": "origin and destination are required"}), 400
+    try:
+        fares = fare_calendar(origin, destination, month)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    return jsonify({
+        "success": True,
+        "origin": origin,
+        "destination": destination,
+        "month": month,
+        **fares,
+        "timestamp": datetime.datetime.now().isoformat()
+    })
+
+@bp.route("/api/pricing/analysis")
 def api_pricing_analysis():
     """API endpoint for detailed pricing analysis and trends"""
     flights = Flight.query.all()
@@ -771,15 +866,102 @@ def api_pricing_analysis():
             "total_flights": len(flights),
             "average_price_change": f"{avg_price_change}%",
             "trend_distribution": price_trends,
-            "market_status": "high_demand" if price_trends["high"] > price_trends["low"] else "stable_market"
+            "market_status": "high_demand" if price_trends["high"] > price_trends["low"] else "stable_market",
+            "pricing_rules_version": pricing_rules.current().version
         },
         "timestamp": datetime.datetime.now().isoformat()
     })
 
+def parse_curve_grid(args):
+    """Grid axes from ``?occupancy_steps=`` and ``?max_days=``; raises ValueError."""
+    # price_curves (and NumPy) are only loaded the first time a curve is requested
+    from price_curves import curve_grid, DEFAULT_MAX_DAYS, DEFAULT_OCCUPANCY_STEPS
+    try:
+        occupancy_steps = int(args.get("occupancy_steps", DEFAULT_OCCUPANCY_STEPS))
+        max_days = int(args.get("max_days", DEFAULT_MAX_DAYS))
+    except ValueError:
+        raise ValueError("occupancy_steps and max_days must be integers") from None
+    return curve_grid(occupancy_steps, max_days)
+
+def curve_entry(flight, prices, point):
+    return {
+        "flight_id": flight.id,
+        "route": f"{flight.origin} → {flight.destination}",
+        "base_price": flight.price,
+        "current": point,
+        "prices": prices.tolist(),
+    }
+
+@bp.route("/api/pricing/curve/<fid>")
+def api_pricing_curve(fid):
+    """API: Expected price of one flight over an occupancy × days-to-departure grid"""
+    try:
+        try:
+            occupancy, days = parse_curve_grid(request.args)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        flight = find_flight(fid)
+        if not flight:
+            return jsonify({"success": False, "error": "Flight not found"}), 404
+
+        from price_curves import current_points, price_curves
+        rules = pricing_rules.current()
+        prices = price_curves([flight], occupancy, days, rules)
+        return jsonify({
+            "success": True,
+            "occupancy": occupancy.round(4).tolist(),
+            "days": days.tolist(),
+            **curve_entry(flight, prices[0], current_points([flight])[0]),
+            "meta": {"pricing_rules_version": rules.version, "timestamp": datetime.datetime.now().isoformat()}
+        })
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@bp.route("/api/pricing/curves")
+def api_pricing_curves():
+    """API: Price curves of several flights (``?ids=A,B,C``) or the whole catalogue in one pass"""
+    try:
+        try:
+            occupancy, days = parse_curve_grid(request.args)
+            ids = parse_ids(request.args.get("ids"))
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
+        query = Flight.query.filter(Flight.id.in_(ids)) if ids else Flight.query.order_by(Flight.id)
+        flights = query.all()
+        if ids:
+            by_id = {f.id: f for f in flights}
+            flights = [by_id[fid] for fid in ids if fid in by_id]
+        else:
+            by_id = {}
+
+        from price_curves import current_points, price_curves
+        rules = pricing_rules.current()
+        try:
+            prices = price_curves(flights, occupancy, days, rules)
+        except ValueError as e:
+            return jsonify({"success": False, "error": f"{e}; request fewer flights or a coarser grid"}), 400
+        return jsonify({
+            "success": True,
+            "occupancy": occupancy.round(4).tolist(),
+            "days": days.tolist(),
+            "curves": [curve_entry(f, p, point) for f, p, point in zip(flights, prices, current_points(flights))],
+            "missing_ids": [fid for fid in ids if fid not in by_id],
+            "meta": {
+                "flights": len(flights),
+                "pricing_rules_version": rules.version,
+                "timestamp": datetime.datetime.now().isoformat()
+            }
+        })
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
 # ==================== REST API ENDPOINTS ====================
 # Comprehensive REST API for frontend integration and external consumption
 
-@app.route("/api/flights", methods=["GET"])
+@bp.route("/api/flights", methods=["GET"])
 def api_get_flights():
     """API: Get all flights with optional filtering"""
     try:
@@ -794,57 +976,87 @@ def api_get_flights():
         sort_by = request.args.get("sort_by", "price")  # price, date, departure_time
         order = request.args.get("order", "asc")  # asc, desc
         include_dynamic_pricing = request.args.get("dynamic_pricing", "true").lower() == "true"
-
-        # Build query
-        query = Flight.query
+        amenities = parse_amenities(request.args)
+        try:
+            ids = parse_ids(request.args.get("ids"))
+            conditions = [Flight.id.in_(ids)] if ids else []
+            if amenities:
+                conditions.append(amenity_filter(amenities))
+            flex_days = parse_flex_days(request.args.get("flex_days"))
+            window = date_window(date, flex_days) if date else None
+            fields = parse_fields(request.args.get("fields"))
+            limit = parse_limit(request.args.get("limit"))
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
+        # Filtering and sorting need a few fields beyond the projection
+        needed = fields
+        if fields is not None:
+            needed = set(fields) | {"id", "airline", "date", "dep_time", "status", "price"}
+            if include_dynamic_pricing and (sort_by == "price" or min_price or max_price or flex_days):
+                needed.add("dynamic_price")
+
+        # Route lookup from the warm catalogue cache, dates as one range lookup,
+        # amenities in SQL, remaining filters in memory
+        flights = matching_flights(origin, destination, window, and_(*conditions) if conditions else None, needed)
         
-        if origin:
-            query = query.filter(Flight.origin == origin)
-        if destination:
-            query = query.filter(Flight.destination == destination)
-        if date:
-            query = query.filter(Flight.date == date)
         if airline:
-            query = query.filter(Flight.airline.ilike(f"%{airline}%"))
+            flights = [f for f in flights if airline.lower() in f['airline'].lower()]
         if status:
-            query = query.filter(Flight.status.ilike(f"%{status}%"))
-
-        # Execute query
-        flights = query.all()
+            flights = [f for f in flights if status.lower() in (f['status'] or '').lower()]
         
-        # Process results
+        # Process results (with ?fields=, dynamic_price is only loaded when a price filter needs it)
         results = []
-        for flight in flights:
-            flight_data = flight.to_dict()
-            
-            # Apply price filtering after dynamic price calculation
-            current_price = flight_data['dynamic_price'] if include_dynamic_pricing else flight_data['price']
-            
-            if min_price and current_price < int(min_price):
-                continue
-            if max_price and current_price > int(max_price):
-                continue
+        for flight_data in flights:
+            if min_price or max_price:
+                # Apply price filtering after dynamic price calculation
+                current_price = flight_data['dynamic_price'] if include_dynamic_pricing else flight_data['price']
+
+                if min_price and current_price < int(min_price):
+                    continue
+                if max_price and current_price > int(max_price):
+                    continue
                 
             results.append(flight_data)
 
         # Sorting
-        if sort_by == "price":
-            results.sort(key=lambda x: x['dynamic_price'] if include_dynamic_pricing else x['price'], 
-                        reverse=(order == "desc"))
-        elif sort_by == "date":
-            results.sort(key=lambda x: x['date'], reverse=(order == "desc"))
-        elif sort_by == "departure_time":
-            results.sort(key=lambda x: x['dep_time'], reverse=(order == "desc"))
-
-        return jsonify({
+        sort_keys = {
+            "price": lambda x: x['dynamic_price'] if include_dynamic_pricing else x['price'],
+            "date": lambda x: x['date'],
+            "departure_time": lambda x: x['dep_time'],
+        }
+        sort_key = sort_keys.get(sort_by)
+        matches = results
+        if limit and sort_key:
+            # Only the top `limit` are needed: bounded heap instead of a full sort
+            select = heapq.nlargest if order == "desc" else heapq.nsmallest
+            results = select(limit, matches, key=sort_key)
+        else:
+            if sort_key:
+                results.sort(key=sort_key, reverse=(order == "desc"))
+            if limit:
+                results = results[:limit]
+
+        # Requested ids that don't exist or didn't match the other filters, price
+        # filters included (ids cut off by ``limit`` are matches, not missing)
+        found_ids = {f["id"] for f in matches} if ids else set()
+        missing_ids = [i for i in ids if i not in found_ids]
+
+        response = {
             "success": True,
-            "flights": results,
+            "flights": encoded_flights(results) if fields is None else [project(f, fields) for f in results],
             "meta": {
-                "total_results": len(results),
+                "total_results": len(matches),
+                "returned_results": len(results),
+                "limit": limit,
+                "missing_ids": missing_ids,
                 "filters_applied": {
                     "origin": origin,
                     "destination": destination,
                     "date": date,
+                    "flex_days": flex_days,
+                    "amenities": amenities,
+                    "ids": ids,
                     "airline": airline,
                     "status": status,
                     "max_price": max_price,
@@ -852,25 +1064,43 @@ def api_get_flights():
                 },
                 "sort_by": sort_by,
                 "order": order,
+                "fields": list(fields) if fields else "full",
                 "dynamic_pricing_enabled": include_dynamic_pricing,
                 "timestamp": datetime.datetime.now().isoformat()
             }
-        })
+        }
+        
+        # Flexible-date searches also get a per-date summary of all matches
+        if flex_days:
+            price_key = sort_keys["price"]
+            response["dates"] = [{
+                "date": day,
+                "total_results": len(day_flights),
+                "lowest_price": min(price_key(f) for f in day_flights),
+                "flight_ids": [f['id'] for f in (sorted(day_flights, key=sort_key, reverse=(order == "desc"))
+                                                 if sort_key else day_flights)]
+            } for day, day_flights in group_by_date(matches).items()]
+        
+        return jsonify(response)
         
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
-@app.route("/api/flights/<flight_id>", methods=["GET"])
+@bp.route("/api/flights/<flight_id>", methods=["GET"])
 def api_get_flight(flight_id):
     """API: Get specific flight by ID"""
     try:
+        try:
+            fields = parse_fields(request.args.get("fields"))
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
         flight = find_flight(flight_id)
         if not flight:
             return jsonify({"success": False, "error": "Flight not found"}), 404
         
         return jsonify({
             "success": True,
-            "flight": flight.to_dict(),
+            "flight": flight.to_dict(fields=fields),
             "meta": {
                 "timestamp": datetime.datetime.now().isoformat()
             }
@@ -879,42 +1109,21 @@ def api_get_flight(flight_id):
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
-@app.route("/api/flights/<flight_id>/seats", methods=["GET"])
+@bp.route("/api/flights/<flight_id>/seats", methods=["GET"])
 def api_get_flight_seats(flight_id):
-    """API: Get seat availability for specific flight"""
+    """API: Get seat availability for specific flight (``?format=compact`` for one string per row)"""
     try:
+        format = request.args.get("format", "full")
+        if format not in SEAT_MAP_FORMATS:
+            return jsonify({"success": False, "error": f"format must be one of: {', '.join(SEAT_MAP_FORMATS)}"}), 400
         flight = find_flight(flight_id)
         if not flight:
             return jsonify({"success": False, "error": "Flight not found"}), 404
         
-        booked_seats = flight.get_booked_seats()
-        total_seats = flight.seat_rows * flight.seat_cols
-        available_seats = total_seats - len(booked_seats)
-        
-        # Generate seat map
-        seat_map = []
-        for row in range(1, flight.seat_rows + 1):
-            for col_idx in range(flight.seat_cols):
-                col_letter = chr(65 + col_idx)  # A, B, C, D, E, F
-                seat_code = f"{row}{col_letter}"
-                seat_map.append({
-                    "seat": seat_code,
-                    "row": row,
-                    "column": col_letter,
-                    "available": seat_code not in booked_seats
-                })
-        
         return jsonify({
             "success": True,
             "flight_id": flight_id,
-            "seats": {
-                "total": total_seats,
-                "booked": len(booked_seats),
-                "available": available_seats,
-                "occupancy_rate": round(flight.get_occupancy_rate(), 2),
-                "booked_seats": booked_seats,
-                "seat_map": seat_map
-            },
+            "seats": seat_map(flight, format),
             "meta": {
                 "timestamp": datetime.datetime.now().isoformat()
             }
@@ -923,7 +1132,59 @@ def api_get_flight_seats(flight_id):
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
-@app.route("/api/bookings", methods=["GET"])
+@bp.route("/api/flights/<fid>/price-history", methods=["GET"])
+def api_get_price_history(fid):
+    """API: Recorded dynamic prices of a flight, oldest first (downsampled with age)"""
+    try:
+        points = price_history.series(fid)
+        if not points and not find_flight(fid):
+            return jsonify({"success": False, "error": "Flight not found"}), 404
+
+        return jsonify({
+            "success": True,
+            "flight_id": fid,
+            "times": [to_datetime(t).isoformat() for t, _ in points],
+            "prices": [price for _, price in points],
+            "meta": {
+                "points": len(points),
+                "sample_interval_seconds": current_app.config["PRICE_HISTORY_INTERVAL"],
+                "timestamp": datetime.datetime.now().isoformat()
+            }
+        })
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@bp.route("/api/flights/seats", methods=["GET"])
+def api_get_flight_seats_batch():
+    """API: Seat maps for several flights (``?ids=A,B,C``) in one query"""
+    try:
+        format = request.args.get("format", "full")
+        if format not in SEAT_MAP_FORMATS:
+            return jsonify({"success": False, "error": f"format must be one of: {', '.join(SEAT_MAP_FORMATS)}"}), 400
+        try:
+            ids = parse_ids(request.args.get("ids"))
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        if not ids:
+            return jsonify({"success": False, "error": "ids is required"}), 400
+
+        flights = {f.id: f for f in Flight.query.filter(Flight.id.in_(ids)).all()}
+        return jsonify({
+            "success": True,
+            "seat_maps": {fid: seat_map(flights[fid], format) for fid in ids if fid in flights},
+            "missing_ids": [fid for fid in ids if fid not in flights],
+            "meta": {
+                "requested": len(ids),
+                "found": len(flights),
+                "timestamp": datetime.datetime.now().isoformat()
+            }
+        })
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@bp.route("/api/bookings", methods=["GET"])
 def api_get_bookings():
     """API: Get all bookings with optional filtering"""
     try:
@@ -999,7 +1260,7 @@ def api_get_bookings():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
-@app.route("/api/bookings/<pnr>", methods=["GET"])
+@bp.route("/api/bookings/<pnr>", methods=["GET"])
 def api_get_booking(pnr):
     """API: Get specific booking by PNR"""
     try:
@@ -1025,7 +1286,7 @@ def api_get_booking(pnr):
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
-@app.route("/api/bookings", methods=["POST"])
+@bp.route("/api/bookings", methods=["POST"])
 def api_create_booking():
     """API: Create new booking"""
     try:
@@ -1051,46 +1312,35 @@ def api_create_booking():
 
         # Calculate amount (use dynamic pricing if not provided)
         amount = data.get('amount', flight.calculate_dynamic_price() * len(requested_seats))
-        
-        # Generate PNR
-        pnr = generate_pnr(flight.origin[:2])
-        while find_booking(pnr):  # Ensure uniqueness
-            pnr = generate_pnr(flight.origin[:2])
-
-        # Create booking
-        booking = Booking(
-            pnr=pnr,
-            flight_id=data['flight_id'],
-            fullname=data['fullname'],
-            email=data['email'],
-            phone=data['phone'],
-            seats=json.dumps(requested_seats),
+
+        # Create booking and update flight seats
+        booking = write_queue.submit(
+            reserve_seats, data['flight_id'], requested_seats,
+            data['fullname'], data['email'], data['phone'],
+            pnr_prefix=flight.origin[:2],
             amount=amount,
             status=data.get('status', 'PENDING'),
-            created_at=datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            created_at_format='%Y-%m-%d %H:%M:%S'
         )
 
-        # Update flight seats
-        for seat in requested_seats:
-            flight.add_booked_seat(seat)
-
-        db.session.add(booking)
-        db.session.commit()
-
         return jsonify({
             "success": True,
-            "booking": booking.to_dict(),
+            "booking": booking,
             "message": "Booking created successfully",
             "meta": {
                 "timestamp": datetime.datetime.now().isoformat()
             }
         }), 201
-        
+
+    except SeatUnavailable as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except FlightNotFound as e:
+        return jsonify({"success": False, "error": str(e)}), 404
     except Exception as e:
         db.session.rollback()
         return jsonify({"success": False, "error": str(e)}), 500
 
-@app.route("/api/bookings/<pnr>", methods=["PUT"])
+@bp.route("/api/bookings/<pnr>", methods=["PUT"])
 def api_update_booking(pnr):
     """API: Update booking status or details"""
     try:
@@ -1099,43 +1349,26 @@ def api_update_booking(pnr):
             return jsonify({"success": False, "error": "Booking not found"}), 404
 
         data = request.get_json()
-        
-        # Update allowed fields
-        if 'status' in data:
-            old_status = booking.status
-            booking.status = data['status']
-            
-            # Handle seat management for status changes
-            if old_status == 'PENDING' and data['status'] == 'CANCELLED':
-                # Release seats
-                flight = find_flight(booking.flight_id)
-                if flight:
-                    for seat in booking.get_seats():
-                        flight.remove_booked_seat(seat)
-        
-        if 'fullname' in data:
-            booking.fullname = data['fullname']
-        if 'email' in data:
-            booking.email = data['email']
-        if 'phone' in data:
-            booking.phone = data['phone']
 
-        db.session.commit()
+        # Update allowed fields (releases seats on PENDING -> CANCELLED)
+        booking = write_queue.submit(update_booking, pnr, data)
 
         return jsonify({
             "success": True,
-            "booking": booking.to_dict(),
+            "booking": booking,
             "message": "Booking updated successfully",
             "meta": {
                 "timestamp": datetime.datetime.now().isoformat()
             }
         })
-        
+
+    except BookingNotFound as e:
+        return jsonify({"success": False, "error": str(e)}), 404
     except Exception as e:
         db.session.rollback()
         return jsonify({"success": False, "error": str(e)}), 500
 
-@app.route("/api/bookings/<pnr>", methods=["DELETE"])
+@bp.route("/api/bookings/<pnr>", methods=["DELETE"])
 def api_cancel_booking(pnr):
     """API: Cancel booking (alternative to PUT with status=CANCELLED)"""
     try:
@@ -1147,53 +1380,42 @@ def api_cancel_booking(pnr):
             return jsonify({"success": False, "error": "Booking already cancelled"}), 400
 
         # Update status and release seats
-        booking.status = 'CANCELLED'
-        
-        flight = find_flight(booking.flight_id)
-        if flight:
-            for seat in booking.get_seats():
-                flight.remove_booked_seat(seat)
-
-        db.session.commit()
+        booking = write_queue.submit(cancel_booking_op, pnr)
 
         return jsonify({
             "success": True,
             "message": "Booking cancelled successfully",
-            "booking": booking.to_dict(),
+            "booking": booking,
             "meta": {
                 "timestamp": datetime.datetime.now().isoformat()
             }
         })
-        
+
+    except BookingNotFound as e:
+        return jsonify({"success": False, "error": str(e)}), 404
+    except InvalidBookingState as e:
+        return jsonify({"success": False, "error": str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({"success": False, "error": str(e)}), 500
 
-@app.route("/api/search", methods=["GET"])
+@bp.route("/api/search", methods=["GET"])
 def api_flight_search():
     """API: Enhanced flight search with comprehensive filtering"""
     return api_get_flights()  # Reuse the flights endpoint with filtering
 
-@app.route("/api/airports", methods=["GET"])
+@bp.route("/api/airports", methods=["GET"])
 def api_get_airports():
     """API: Get list of available airports/cities from flights"""
     try:
-        flights = Flight.query.all()
-        
-        origins = set()
-        destinations = set()
-        
-        for flight in flights:
-            origins.add(flight.origin)
-            destinations.add(flight.destination)
-        
-        airports = list(origins.union(destinations))
+        dimensions = catalog_cache.dimensions()
+        airports = dimensions["airports"]
         
         return jsonify({
             "success": True,
-            "airports": sorted(airports),
-            "origins": sorted(list(origins)),
-            "destinations": sorted(list(destinations)),
+            "airports": airports,
+            "origins": dimensions["origins"],
+            "destinations": dimensions["destinations"],
             "meta": {
                 "total_airports": len(airports),
                 "timestamp": datetime.datetime.now().isoformat()
@@ -1203,7 +1425,32 @@ def api_get_airports():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
-@app.route("/api/airlines", methods=["GET"])
+@bp.route("/api/airports/suggest", methods=["GET"])
+def api_suggest_airports():
+    """API: Airport autocomplete by code, city or name prefix, optionally reachable from an origin"""
+    q = request.args.get("q", "")
+    origin = request.args.get("origin", "").upper() or None
+    try:
+        limit = int(request.args.get("limit", DEFAULT_SUGGESTIONS))
+        if not 1 <= limit <= MAX_SUGGESTIONS:
+            raise ValueError
+    except ValueError:
+        return jsonify({"success": False, "error": f"limit must be an integer between 1 and {MAX_SUGGESTIONS}"}), 400
+
+    suggestions = suggest_airports(q, origin, limit)
+    return jsonify({
+        "success": True,
+        "query": q,
+        "origin": origin,
+        "suggestions": suggestions,
+        "meta": {
+            "returned_results": len(suggestions),
+            "limit": limit,
+            "timestamp": datetime.datetime.now().isoformat()
+        }
+    })
+
+@bp.route("/api/airlines", methods=["GET"])
 def api_get_airlines():
     """API: Get list of available airlines"""
     try:
@@ -1232,7 +1479,7 @@ def api_get_airlines():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
-@app.route("/api/stats", methods=["GET"])
+@bp.route("/api/stats", methods=["GET"])
 def api_get_stats():
     """API: Get system statistics"""
     try:
@@ -1284,9 +1531,15 @@ def api_get_stats():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+@bp.route("/ready", methods=["GET"])
+def readiness():
+    """Readiness probe: 200 once this worker has warmed its catalogue cache, 503 before"""
+    ready, status = catalog_cache.readiness()
+    return jsonify({"ready": ready, **status}), 200 if ready else 503
+
 # ==================== API DOCUMENTATION ENDPOINT ====================
 
-@app.route("/api", methods=["GET"])
+@bp.route("/api", methods=["GET"])
 def api_documentation():
     """API: Documentation and available endpoints"""
     return jsonify({
@@ -1296,7 +1549,9 @@ def api_documentation():
             "flights": {
                 "GET /api/flights": "List all flights with filtering options",
                 "GET /api/flights/<id>": "Get specific flight details",
-                "GET /api/flights/<id>/seats": "Get seat availability for flight"
+                "GET /api/flights/<id>/seats": "Get seat availability for flight",
+                "GET /api/flights/seats": "Seat maps for several flights (?ids=A,B,C)",
+                "GET /api/flights/<id>/price-history": "Recorded dynamic prices of a flight over time"
             },
             "bookings": {
                 "GET /api/bookings": "List all bookings with filtering options",
@@ -1307,21 +1562,28 @@ def api_documentation():
             },
             "search": {
                 "GET /api/search": "Search flights (alias for /api/flights)",
-                "GET /api/search/dynamic": "Search flights with dynamic pricing"
+                "GET /api/search/dynamic": "Search flights with dynamic pricing",
+                "GET /api/itineraries": "Direct and connecting itineraries between two airports"
             },
             "pricing": {
                 "GET /api/flight/<id>/price": "Get dynamic price for specific flight",
-                "GET /api/flights/prices": "Get dynamic prices for all flights"
+                "GET /api/flights/prices": "Get dynamic prices for all flights",
+                "GET /api/fares/calendar": "Cheapest fare per day of a month for a route",
+                "GET /api/pricing/curve/<id>": "What-if price grid over occupancy × days to departure",
+                "GET /api/pricing/curves": "What-if price grids for several flights (?ids=A,B,C) or all"
             },
             "utilities": {
                 "GET /api/airports": "List available airports/cities",
+                "GET /api/airports/suggest": "Airport autocomplete by code/city prefix, optionally from an origin",
                 "GET /api/airlines": "List available airlines with stats",
-                "GET /api/stats": "System statistics and overview"
+                "GET /api/stats": "System statistics and overview",
+                "GET /ready": "Readiness probe (503 until the worker is warm)"
             }
         },
         "query_parameters": {
-            "flights": ["origin", "destination", "date", "airline", "max_price", "min_price", "status", "sort_by", "order", "dynamic_pricing"],
-            "bookings": ["status", "flight_id", "email", "date_from", "date_to", "sort_by", "order"]
+            "flights": ["ids", "origin", "destination", "date", "flex_days", "amenities", "airline", "max_price", "min_price", "status", "sort_by", "order", "limit", "fields", "dynamic_pricing"],
+            "bookings": ["status", "flight_id", "email", "date_from", "date_to", "sort_by", "order"],
+            "pricing_curves": ["ids", "occupancy_steps", "max_days"]
         },
         "response_format": {
             "success": "boolean - indicates operation success",
@@ -1331,10 +1593,17 @@ def api_documentation():
         },
         "meta": {
             "timestamp": datetime.datetime.now().isoformat(),
-            "total_endpoints": 16
+            "total_endpoints": 24
         }
     })
 
+# Module-level app for `gunicorn app:app` and `flask --app app ...`
+app = create_app()
+
 if __name__ == "__main__":
+    # Development server: make sure the database exists before serving
+    bootstrap_database(app)
+    itinerary_planner.warm(app)
+    catalog_cache.warm(app)
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=False)
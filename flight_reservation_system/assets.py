@@ -0,0 +1,124 @@
+"""
+Fingerprinted, precompressed static assets and compressed JSON responses.
+
+At startup every file in ``static/`` is read once, named after a hash of
+its content (``script.js`` -> ``script.3f2a9c1b4e5d.js``) and compressed
+with gzip and, when the ``brotli`` package is installed, brotli. Every
+``url_for('static', filename=...)`` then produces the fingerprinted URL,
+which is served from memory in the best encoding the client accepts with
+``Cache-Control: immutable``: browsers never revalidate it, and a changed
+file gets a new URL. Unfingerprinted URLs keep working with Flask's
+default headers.
+
+JSON responses larger than ``JSON_COMPRESS_MIN_SIZE`` bytes are compressed
+on the fly for clients that accept it.
+
+Assets are hashed when the app is created; restart after editing them.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def _best_encoding(accept_encodings, available):
+    for encoding in ("br", "gzip"):
+        if encoding in available and accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+class Asset:
+    """One static file: fingerprinted name and its encoded bodies."""
+
+    def __init__(self, filename, data):
+        self.digest = hashlib.sha256(data).hexdigest()[:12]
+        root, ext = os.path.splitext(filename)
+        self.url_name = f"{root}.{self.digest}{ext}"
+        self.mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        self.bodies = {None: data, "gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(data, quality=11)
+        # Keep a compressed variant only if it is actually smaller
+        for encoding in [e for e in self.bodies if e and len(self.bodies[e]) >= len(data)]:
+            del self.bodies[encoding]
+
+
+class StaticAssets:
+    """Flask extension serving fingerprinted assets and compressing JSON responses."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("STATIC_FINGERPRINT", os.environ.get("FRS_STATIC_FINGERPRINT", "1") == "1")
+        app.config.setdefault("JSON_COMPRESS_MIN_SIZE", int(os.environ.get("FRS_JSON_COMPRESS_MIN_SIZE", 1024)))
+
+        if app.config["STATIC_FINGERPRINT"] and app.static_folder and os.path.isdir(app.static_folder):
+            self._install_fingerprints(app)
+        if app.config["JSON_COMPRESS_MIN_SIZE"] > 0:
+            app.after_request(self._compress_json)
+
+    def _install_fingerprints(self, app):
+        by_name = {}
+        for directory, _, files in os.walk(app.static_folder):
+            for name in files:
+                path = os.path.join(directory, name)
+                filename = os.path.relpath(path, app.static_folder).replace(os.sep, "/")
+                with open(path, "rb") as f:
+                    by_name[filename] = Asset(filename, f.read())
+        by_url = {asset.url_name: asset for asset in by_name.values()}
+        app.extensions["static_assets"] = by_name
+
+        @app.url_defaults
+        def fingerprint_static_urls(endpoint, values):
+            if endpoint == "static" and values.get("filename") in by_name:
+                values["filename"] = by_name[values["filename"]].url_name
+
+        send_static = app.view_functions["static"]
+
+        def static(filename):
+            asset = by_url.get(filename)
+            if asset is None:
+                return send_static(filename=filename)
+            encoding = _best_encoding(request.accept_encodings, asset.bodies)
+            response = app.response_class(asset.bodies[encoding], mimetype=asset.mimetype)
+            response.headers["Cache-Control"] = IMMUTABLE
+            response.vary.add("Accept-Encoding")
+            if encoding:
+                response.headers["Content-Encoding"] = encoding
+            response.set_etag(f"{asset.digest}-{encoding or 'identity'}")
+            return response.make_conditional(request)
+
+        app.view_functions["static"] = static
+
+    def _compress_json(self, response):
+        if (response.mimetype != "application/json" or response.status_code != 200
+                or response.direct_passthrough or "Content-Encoding" in response.headers):
+            return response
+        encoding = _best_encoding(request.accept_encodings, ("br", "gzip") if brotli is not None else ("gzip",))
+        if encoding is None:
+            return response
+        body = response.get_data()
+        if len(body) < current_app.config["JSON_COMPRESS_MIN_SIZE"]:
+            return response
+        # Fast settings: this runs on every large response
+        body = brotli.compress(body, quality=4) if encoding == "br" else gzip.compress(body, compresslevel=5)
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        return response
+
+
+static_assets = StaticAssets()
@@ -0,0 +1,138 @@
+"""
+One-time database bootstrap: create tables and seed an empty database.
+
+This used to run at import time in every worker. It now runs once per
+deploy, either from ``flask --app app bootstrap`` (see start.sh) or when
+the development server is started with ``python app.py``. An exclusive
+file lock next to the database keeps concurrent deploy jobs or workers
+from seeding twice.
+"""
+
+import contextlib
+import json
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import click
+from flask import current_app
+
+from bulk_import import import_records, iter_records
+from sqlalchemy import inspect, text
+
+from models import db, Flight, Booking, User, amenity_mask
+from pricing import schedule_columns
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+FLIGHTS_FILE = os.path.join(DATA_DIR, "flights.json")
+BOOKINGS_FILE = os.path.join(DATA_DIR, "bookings.json")
+
+
+@contextlib.contextmanager
+def _exclusive_lock(path):
+    """Hold an OS-level exclusive lock on ``path`` for the duration of the block."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a+") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _seed(kind, path):
+    if os.path.exists(path):
+        import_records(kind, iter_records(path))
+
+
+def _create_missing_indexes():
+    # create_all() skips tables that already exist, including their new indexes
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+
+
+def _migrate_amenity_masks():
+    # Databases created before the amenity dictionary keep amenities as a JSON
+    # text column; add the bitmask column and fill it from that text once.
+    columns = {c["name"] for c in inspect(db.engine).get_columns("flights")}
+    if "amenity_mask" in columns:
+        return
+    with db.engine.begin() as conn:
+        conn.execute(text("ALTER TABLE flights ADD COLUMN amenity_mask BIGINT NOT NULL DEFAULT 0"))
+    if "amenities" not in columns:
+        return
+    with db.engine.connect() as conn:
+        legacy = conn.execute(text("SELECT id, amenities FROM flights "
+                                   "WHERE amenities IS NOT NULL AND amenities != '[]'")).all()
+    updates = [{"mask": amenity_mask(json.loads(amenities)), "fid": fid} for fid, amenities in legacy]
+    if updates:
+        with db.engine.begin() as conn:
+            conn.execute(text("UPDATE flights SET amenity_mask = :mask WHERE id = :fid"), updates)
+
+
+SCHEDULE_COLUMNS = {"departs_at": "INTEGER", "dep_hour": "INTEGER", "weekday": "INTEGER",
+                    "route_key": "VARCHAR(21)"}
+
+
+def _migrate_schedule_columns():
+    # Add the derived schedule columns to older databases and fill them for
+    # rows written before they existed (or by tools that bypass the ORM).
+    columns = {c["name"] for c in inspect(db.engine).get_columns("flights")}
+    missing = [name for name in SCHEDULE_COLUMNS if name not in columns]
+    if missing:
+        with db.engine.begin() as conn:
+            for name in missing:
+                conn.execute(text(f"ALTER TABLE flights ADD COLUMN {name} {SCHEDULE_COLUMNS[name]}"))
+    with db.engine.connect() as conn:
+        stale = conn.execute(text("SELECT id, date, dep_time, origin, destination FROM flights "
+                                  "WHERE route_key IS NULL")).all()
+    updates = [dict(schedule_columns(date, dep_time, origin, destination), fid=fid)
+               for fid, date, dep_time, origin, destination in stale]
+    if updates:
+        with db.engine.begin() as conn:
+            conn.execute(text("UPDATE flights SET departs_at = :departs_at, dep_hour = :dep_hour, "
+                              "weekday = :weekday, route_key = :route_key WHERE id = :fid"), updates)
+
+
+def bootstrap_database(app):
+    """Create tables and seed data on empty DB (first run). Safe to call repeatedly."""
+    lock_path = os.path.join(app.instance_path, "bootstrap.lock")
+    with _exclusive_lock(lock_path), app.app_context():
+        # Connecting also applies the storage profile (e.g. switches the file to WAL)
+        db.create_all()
+        _create_missing_indexes()
+        _migrate_amenity_masks()
+        _migrate_schedule_columns()
+
+        if Flight.query.count() == 0:
+            _seed("flights", FLIGHTS_FILE)
+
+        if Booking.query.count() == 0:
+            _seed("bookings", BOOKINGS_FILE)
+
+        # Ensure an admin user exists
+        if not User.query.filter_by(username="admin").first():
+            admin_user = User(username="admin", password=app.config["ADMIN_PASS"], role="admin")
+            db.session.add(admin_user)
+
+        db.session.commit()
+
+
+@click.command("bootstrap")
+def bootstrap_command():
+    """Create tables and seed the database if it is empty."""
+    bootstrap_database(current_app._get_current_object())
+    click.echo("Database ready.")
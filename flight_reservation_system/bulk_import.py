@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Streaming, batched and resumable bulk import of flights and bookings.
+
+Inputs are read one record at a time, so file size does not matter:
+
+* ``.json``   - ``{"flights": [...]}`` / ``{"bookings": [...]}`` or a bare array
+* ``.ndjson`` / ``.jsonl`` - one JSON object per line
+* ``.csv``    - one row per record; nested flight fields are flattened to
+  ``seat_rows``, ``seat_cols``, ``booked_seats`` and ``amenities`` (lists as
+  JSON or ``;``-separated)
+
+Records are upserted in batches with a single executemany per batch. After
+every committed batch a checkpoint (``<input>.import-state.json``) records
+how far the import got; ``--resume`` continues from there. Upserts are
+idempotent, so re-running a batch that committed right before a crash is
+harmless.
+
+Usage:
+    python bulk_import.py flights schedule.ndjson --batch-size 5000 --resume
+    flask --app app import-data bookings bookings.csv
+"""
+
+import argparse
+import csv
+import datetime
+import io
+import json
+import os
+import re
+import sys
+import time
+
+import click
+from sqlalchemy import bindparam, select, update
+
+from models import db, Flight, Booking, amenity_mask
+from pricing import schedule_columns
+
+CHECKPOINT_SUFFIX = ".import-state.json"
+MAX_JSON_RECORD_CHARS = 64 << 20   # a longer undecodable record is malformed, not cut off by a chunk
+JSON_TAIL_SLACK = 16               # decode errors this close to the buffer end may be a cut-off record
+_JSON_SEPARATOR = re.compile(r"\s*,?\s*")
+_JSON_NEXT_CHAR = re.compile(r"\s*(\S)")
+
+
+# ------------------ Record mapping ------------------
+def _as_list(value):
+    if value is None or value == "":
+        return []
+    if isinstance(value, list):
+        return value
+    value = str(value).strip()
+    if value.startswith("["):
+        return json.loads(value)
+    return [v.strip() for v in value.split(";") if v.strip()]
+
+
+def _as_int(value, default):
+    if value is None or value == "":
+        return default
+    return int(value)
+
+
+def flight_row(item):
+    """Map an input record to a ``flights`` row."""
+    seats = item.get("seats") if isinstance(item.get("seats"), dict) else {}
+    return {
+        "id": item.get("id"),
+        "airline": item.get("airline", ""),
+        "origin": item.get("origin", ""),
+        "destination": item.get("destination", ""),
+        "date": item.get("date", ""),
+        "dep_time": item.get("dep_time", ""),
+        "arr_time": item.get("arr_time", ""),
+        "price": _as_int(item.get("price"), 0),
+        "status": item.get("status") or "On Time",
+        "gate": item.get("gate") or "A1",
+        "terminal": item.get("terminal") or "T1",
+        "seat_rows": _as_int(seats.get("rows", item.get("seat_rows")), 12),
+        "seat_cols": _as_int(seats.get("cols", item.get("seat_cols")), 6),
+        "booked_seats": json.dumps(_as_list(seats.get("booked", item.get("booked_seats")))),
+        "amenity_mask": amenity_mask(_as_list(item.get("amenities"))),
+        **schedule_columns(item.get("date", ""), item.get("dep_time", ""),
+                           item.get("origin", ""), item.get("destination", "")),
+    }
+
+
+def booking_row(item):
+    """Map an input record to a ``bookings`` row."""
+    return {
+        "pnr": item.get("pnr"),
+        "flight_id": item.get("flight_id", ""),
+        "fullname": item.get("fullname", ""),
+        "email": item.get("email", ""),
+        "phone": item.get("phone", ""),
+        "seats": json.dumps(_as_list(item.get("seats"))),
+        "amount": _as_int(item.get("amount"), 0),
+        "status": item.get("status") or "PENDING",
+        "created_at": item.get("created_at") or datetime.datetime.now().strftime("%d-%m-%Y %H:%M"),
+    }
+
+
+KINDS = {
+    "flights": (Flight, flight_row),
+    "bookings": (Booking, booking_row),
+}
+
+
+# ------------------ Streaming readers ------------------
+# Each reader yields (record, position) where position is what a resumed
+# import needs to continue right after that record.
+
+def _iter_lines(f, start):
+    """Yield decoded lines from a binary file, tracking the byte offset read so far."""
+    f.seek(start)
+    state = {"pos": start}
+
+    def lines():
+        for raw in iter(f.readline, b""):
+            state["pos"] += len(raw)
+            yield raw.decode("utf-8")
+    return lines(), state
+
+
+def iter_ndjson(path, start=0):
+    with open(path, "rb") as f:
+        lines, state = _iter_lines(f, start)
+        for line in lines:
+            if line.strip():
+                yield json.loads(line), state["pos"]
+
+
+def iter_csv(path, start=0):
+    with open(path, "rb") as f:
+        header = f.readline()
+        fieldnames = next(csv.reader([header.decode("utf-8-sig")]))
+        lines, state = _iter_lines(f, max(start, len(header)))
+        for row in csv.DictReader(lines, fieldnames=fieldnames):
+            yield row, state["pos"]
+
+
+def _needs_more_data(error, buf):
+    """Whether a decode error is the buffer ending mid-record rather than a malformed record."""
+    return error.msg.startswith("Unterminated string") or error.pos >= len(buf) - JSON_TAIL_SLACK
+
+
+def iter_json_array(path, start=0, chunk_size=1 << 20):
+    """Yield the elements of the first JSON array in ``path`` without loading the file.
+
+    ``start`` is a record count here: JSON offsets are not stable across
+    decoding, so resuming skips already imported elements by parsing them.
+    Records are decoded in place at an offset into the buffer, which is
+    trimmed only when the next chunk is read. A malformed record raises
+    ``json.JSONDecodeError`` as soon as it is found.
+    """
+    decoder = json.JSONDecoder()
+    with io.open(path, "r", encoding="utf-8") as f:
+        buf = ""
+        while "[" not in buf:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            buf += chunk
+        pos = buf.index("[") + 1
+        index = 0
+        eof = False
+        while True:
+            pos = _JSON_SEPARATOR.match(buf, pos).end()
+            if buf.startswith("]", pos):
+                return
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+                # Objects, arrays and strings end themselves; a number may continue in the next chunk
+                follows = _JSON_NEXT_CHAR.match(buf, end)
+                complete = eof or (follows is not None and (buf[pos] in '{["' or follows.group(1) in ",]"))
+            except json.JSONDecodeError as e:
+                if eof or not _needs_more_data(e, buf) or len(buf) - pos > MAX_JSON_RECORD_CHARS:
+                    raise
+                complete = False
+            if not complete:
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buf, pos = buf[pos:] + chunk, 0
+                continue
+            pos = end
+            index += 1
+            if index > start:
+                yield obj, index
+
+
+def iter_records(path, start=0):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".ndjson", ".jsonl"):
+        return iter_ndjson(path, start)
+    if ext == ".csv":
+        return iter_csv(path, start)
+    if ext == ".json":
+        return iter_json_array(path, start)
+    raise ValueError(f"Unsupported input format: {path}")
+
+
+# ------------------ Upsert ------------------
+def _upsert_statement(table, dialect_name, skip_existing):
+    pk = [c.name for c in table.primary_key.columns]
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+    stmt = insert(table)
+    if skip_existing:
+        return stmt.on_conflict_do_nothing(index_elements=pk)
+    return stmt.on_conflict_do_update(
+        index_elements=pk,
+        set_={c.name: stmt.excluded[c.name] for c in table.columns if c.name not in pk},
+    )
+
+
+def _write_batch(conn, model, rows, skip_existing):
+    table = model.__table__
+    stmt = _upsert_statement(table, conn.dialect.name, skip_existing)
+    if stmt is not None:
+        conn.execute(stmt, rows)
+        return
+
+    # Generic path: one IN query to split the batch, then executemany each half
+    pk = table.primary_key.columns[0]
+    ids = [r[pk.name] for r in rows]
+    existing = set(conn.execute(select(pk).where(pk.in_(ids))).scalars())
+    new_rows = [r for r in rows if r[pk.name] not in existing]
+    if new_rows:
+        conn.execute(table.insert(), new_rows)
+    if existing and not skip_existing:
+        conn.execute(update(table).where(pk == bindparam("_pk")),
+                     [dict(r, _pk=r[pk.name]) for r in rows if r[pk.name] in existing])
+
+
+# ------------------ Checkpoints ------------------
+def checkpoint_path(path):
+    return path + CHECKPOINT_SUFFIX
+
+
+def _load_checkpoint(path, kind):
+    try:
+        with open(checkpoint_path(path), "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    stat = os.stat(path)
+    if state.get("kind") != kind or state.get("size") != stat.st_size or state.get("mtime") != stat.st_mtime:
+        return None  # input changed since the checkpoint was written
+    return state
+
+
+def _save_checkpoint(path, kind, position, records):
+    stat = os.stat(path)
+    tmp = checkpoint_path(path) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"kind": kind, "size": stat.st_size, "mtime": stat.st_mtime,
+                   "position": position, "records": records}, f)
+    os.replace(tmp, checkpoint_path(path))
+
+
+# ------------------ Driver ------------------
+def import_records(kind, records, batch_size=5000, skip_existing=False, on_batch=None):
+    """Upsert an iterable of ``(record, position)`` pairs in batches.
+
+    ``on_batch(position, records_done)`` runs after each committed batch.
+    Returns the number of records processed.
+    """
+    model, to_row = KINDS[kind]
+    engine = db.engine
+    done = 0
+    batch = []
+    position = None
+
+    def flush():
+        nonlocal done, batch
+        with engine.begin() as conn:
+            _write_batch(conn, model, batch, skip_existing)
+        done += len(batch)
+        batch = []
+        if on_batch:
+            on_batch(position, done)
+
+    for record, position in records:
+        batch.append(to_row(record))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return done
+
+
+def import_file(kind, path, batch_size=5000, resume=False, skip_existing=False, progress=True):
+    """Import ``path`` into the ``kind`` table inside the current app context."""
+    if kind not in KINDS:
+        raise ValueError(f"Unknown kind {kind!r}; choose one of {', '.join(KINDS)}")
+
+    state = _load_checkpoint(path, kind) if resume else None
+    start, already = (state["position"], state["records"]) if state else (0, 0)
+    size = os.path.getsize(path)
+    byte_positions = not path.lower().endswith(".json")
+    started = time.monotonic()
+
+    def on_batch(position, done):
+        _save_checkpoint(path, kind, position, already + done)
+        if progress:
+            rate = done / max(time.monotonic() - started, 1e-9)
+            pct = f" ({position / size:.1%})" if byte_positions and size else ""
+            print(f"{kind}: {already + done:,} records{pct} - {rate:,.0f} records/s", file=sys.stderr)
+
+    if state and progress:
+        print(f"{kind}: resuming after {already:,} records", file=sys.stderr)
+
+    imported = import_records(kind, iter_records(path, start), batch_size, skip_existing, on_batch)
+
+    # Finished: the checkpoint is only useful for interrupted runs
+    if os.path.exists(checkpoint_path(path)):
+        os.remove(checkpoint_path(path))
+    return already + imported
+
+
+@click.command("import-data")
+@click.argument("kind", type=click.Choice(list(KINDS)))
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--batch-size", default=5000, show_default=True, help="Records per executemany/commit.")
+@click.option("--resume", is_flag=True, help="Continue from the last checkpoint for this file.")
+@click.option("--skip-existing", is_flag=True, help="Keep rows that already exist instead of updating them.")
+def import_command(kind, path, batch_size, resume, skip_existing):
+    """Bulk import flights or bookings from JSON, NDJSON or CSV."""
+    db.create_all()
+    total = import_file(kind, path, batch_size, resume, skip_existing)
+    click.echo(f"Imported {total:,} {kind}.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import flights or bookings")
+    parser.add_argument("kind", choices=list(KINDS))
+    parser.add_argument("path")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--resume", action="store_true")
+    parser.add_argument("--skip-existing", action="store_true")
+    args = parser.parse_args(argv)
+
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        total = import_file(args.kind, args.path, args.batch_size, args.resume, args.skip_existing)
+    print(f"Imported {total:,} {args.kind}.")
+
+
+if __name__ == "__main__":
+    main()
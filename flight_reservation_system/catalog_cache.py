@@ -0,0 +1,295 @@
+"""
+In-process cache of the flight catalogue, warmed before a worker takes traffic.
+
+Rendering ``/``, ``/search`` or ``/api/flights`` used to load and price every
+flight on every request, so a freshly started worker answered its first
+requests slowly and a rolling deploy showed up as a p99 cliff. Each worker
+now keeps:
+
+* the full catalogue (``Flight.to_dict()`` for every flight),
+* the dimension lists (origins, destinations, airports, airlines),
+* the flights of individual routes, the busiest ``CATALOG_WARM_ROUTES``
+  routes (by booking count) being loaded up front,
+* structures derived from the route network only (e.g. the airport
+  autocomplete index), kept until a flight is added, removed or re-routed.
+
+``warm(app)`` fills all of that and marks the worker ready; gunicorn calls it
+from ``post_worker_init`` (see gunicorn.conf.py) so a worker only accepts
+connections once it is warm, and ``/ready`` reports the state to load
+balancers. Entries expire after ``CATALOG_CACHE_TTL`` seconds; flights
+changed through the ORM in this process are invalidated as soon as the
+change commits. Writes from other workers show up within the TTL.
+"""
+
+import datetime
+import logging
+import os
+import threading
+import time
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, inspect, tuple_
+
+from models import db, Flight, Booking
+from pagination import PAGE_SIZE, encode_cursor, departure_key, keyset_page, sorted_by_departure
+from pricing import price_flights
+from projection import CatalogRow, needs_pricing
+from storage import RoutingSession
+
+logger = logging.getLogger(__name__)
+
+_DIRTY_ROUTES = "catalog_cache_dirty_routes"
+_NETWORK_CHANGED = "catalog_cache_network_changed"
+_ALL_ROUTES = object()
+
+
+class _Catalog:
+    """Cache entries and warm-up state for one application."""
+
+    def __init__(self, app):
+        self.app = app
+        self.lock = threading.Lock()
+        # key -> (expires_at, value). Keys starting ("route", origin, destination)
+        # are dropped when that route changes, ("network", ...) keys when the
+        # set of routes changes, everything else on any flight change.
+        self.entries = {}
+        self.generation = 0     # bumped on every invalidation
+        self.ready = False
+        self.status = {"state": "cold"}
+
+    def get(self, key, loader):
+        ttl = self.app.config["CATALOG_CACHE_TTL"]
+        now = time.monotonic()
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        generation = self.generation
+        value = loader()
+        if ttl > 0:
+            with self.lock:
+                # Don't store what was read before a concurrent write committed
+                if generation == self.generation:
+                    self.entries[key] = (now + ttl, value)
+        return value
+
+    def invalidate(self, routes, network_changed):
+        with self.lock:
+            self.generation += 1
+            for key in list(self.entries):
+                if key[0] == "route":
+                    stale = routes is _ALL_ROUTES or key[1:3] in routes
+                elif key[0] == "network":
+                    stale = network_changed
+                else:
+                    stale = True
+                if stale:
+                    del self.entries[key]
+
+
+# ------------------ Loaders ------------------
+def priced_dicts(flights, fields=None):
+    """``to_dict(fields=fields)`` for a list of flights, priced in one batch if any price field is wanted."""
+    prices = price_flights(flights) if needs_pricing(fields) else [None] * len(flights)
+    return [f.to_dict(price, fields) for f, price in zip(flights, prices)]
+
+
+def _load_catalogue():
+    return [CatalogRow(row) for row in priced_dicts(Flight.query.all())]
+
+
+def _load_route(origin, destination):
+    flights = Flight.query.filter_by(origin=origin, destination=destination).all()
+    return [CatalogRow(row) for row in priced_dicts(flights)]
+
+
+def _route_query(origin, destination, start=None, end=None):
+    query = Flight.query
+    if start:
+        query = query.filter(Flight.date >= start, Flight.date <= end)
+    if origin:
+        query = query.filter(Flight.origin == origin)
+    if destination:
+        query = query.filter(Flight.destination == destination)
+    return query
+
+
+def _load_dimensions():
+    def distinct(column):
+        return sorted(value for (value,) in db.session.query(column).distinct())
+
+    origins = distinct(Flight.origin)
+    destinations = distinct(Flight.destination)
+    return {
+        "origins": origins,
+        "destinations": destinations,
+        "airports": sorted(set(origins) | set(destinations)),
+        "airlines": distinct(Flight.airline),
+    }
+
+
+def top_routes(limit):
+    """Return the ``limit`` routes with the most bookings as ``(origin, destination)`` pairs."""
+    bookings = func.count(Booking.pnr)
+    rows = (db.session.query(Flight.origin, Flight.destination)
+            .join(Booking, Booking.flight_id == Flight.id)
+            .group_by(Flight.origin, Flight.destination)
+            .order_by(bookings.desc())
+            .limit(limit)
+            .all())
+    return [(origin, destination) for origin, destination in rows]
+
+
+# ------------------ Invalidation ------------------
+@event.listens_for(RoutingSession, "after_flush")
+def _collect_dirty_routes(session, flush_context):
+    dirty = session.info.setdefault(_DIRTY_ROUTES, set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, Flight):
+            continue
+        # A re-routed flight leaves its old route stale, and the old value is not
+        # loaded if the attribute was expired when it was set: drop every route.
+        state = inspect(obj)
+        rerouted = state.attrs.origin.history.has_changes() or state.attrs.destination.history.has_changes()
+        if rerouted and obj not in session.new:
+            session.info[_DIRTY_ROUTES] = dirty = {_ALL_ROUTES}
+        if obj in session.new or obj in session.deleted or _ALL_ROUTES in dirty:
+            session.info[_NETWORK_CHANGED] = True
+        dirty.add((obj.origin, obj.destination))
+
+
+# Routes touched by a rolled back flush stay in the set and are invalidated
+# by the next commit, which costs a reload but is never stale.
+@event.listens_for(RoutingSession, "after_commit")
+def _invalidate_committed(session):
+    dirty = session.info.pop(_DIRTY_ROUTES, None)
+    network_changed = session.info.pop(_NETWORK_CHANGED, False)
+    if dirty and has_app_context():
+        catalog = current_app.extensions.get("catalog_cache")
+        if catalog is not None:
+            catalog.invalidate(_ALL_ROUTES if _ALL_ROUTES in dirty else dirty, network_changed)
+
+
+class CatalogCache:
+    """Flask extension exposing the cached catalogue and the warm-up phase."""
+
+    def __init__(self, app=None):
+        self.warmups = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("CATALOG_CACHE_TTL", float(os.environ.get("FRS_CATALOG_CACHE_TTL", 30)))
+        app.config.setdefault("CATALOG_WARM_ROUTES", int(os.environ.get("FRS_CATALOG_WARM_ROUTES", 20)))
+        app.extensions["catalog_cache"] = _Catalog(app)
+
+    def _catalog(self, app=None):
+        return (app or current_app).extensions["catalog_cache"]
+
+    def catalogue(self):
+        """All flights as ``to_dict()`` results."""
+        return self._catalog().get(("catalogue",), _load_catalogue)
+
+    def departures_page(self, after=None, limit=PAGE_SIZE):
+        """A page of all flights in departure order after cursor key ``after``, and the next cursor.
+
+        Served by bisecting the cached catalogue in departure order; with the
+        cache disabled, one keyset query on ``ix_flights_departure``.
+        """
+        if self._catalog().app.config["CATALOG_CACHE_TTL"] <= 0:
+            query = Flight.query.order_by(Flight.date, Flight.dep_time, Flight.id)
+            if after is not None:
+                query = query.filter(tuple_(Flight.date, Flight.dep_time, Flight.id) > after)
+            flights = priced_dicts(query.limit(limit + 1).all())
+            more = len(flights) > limit
+            return flights[:limit], (encode_cursor(departure_key(flights[limit - 1])) if more else None)
+        flights, keys = self._catalog().get(("catalogue", "by_departure"),
+                                            lambda: sorted_by_departure(self.catalogue()))
+        return keyset_page(flights, keys, after, limit)
+
+    def dimensions(self):
+        """Sorted ``origins``, ``destinations``, ``airports`` and ``airlines``."""
+        return self._catalog().get(("dimensions",), _load_dimensions)
+
+    def flights(self, origin="", destination=""):
+        """Flights filtered by route, served from the route or catalogue entry."""
+        if origin and destination:
+            return self._catalog().get(("route", origin, destination),
+                                       lambda: _load_route(origin, destination))
+        flights = self.catalogue()
+        if origin:
+            return [f for f in flights if f["origin"] == origin]
+        if destination:
+            return [f for f in flights if f["destination"] == destination]
+        return flights
+
+    def flights_between(self, origin, destination, start, end, fields=None):
+        """Flights departing on dates ``start``..``end`` (inclusive, ``YYYY-MM-DD``), optionally by route.
+
+        A full route comes from its cached entry; anything else is one
+        indexed range query, priced in one batch and built with only
+        ``fields`` (cached entries always have every field).
+        """
+        if origin and destination:
+            return [f for f in self.flights(origin, destination) if start <= f["date"] <= end]
+        return priced_dicts(_route_query(origin, destination, start, end).order_by(Flight.date).all(), fields)
+
+    def flights_where(self, condition, origin="", destination="", start=None, end=None, fields=None):
+        """Flights matching an extra SQL ``condition`` (e.g. an amenity filter), optionally by route and dates.
+
+        Not cached: one query on the route/date indexes, priced in one batch.
+        """
+        query = _route_query(origin, destination, start, end).filter(condition)
+        return priced_dicts(query.order_by(Flight.date).all() if start else query.all(), fields)
+
+    def route_entry(self, origin, destination, name, loader):
+        """Cache ``loader()`` under ``name`` for a route; dropped whenever a flight on the route changes."""
+        return self._catalog().get(("route", origin, destination, name), loader)
+
+    def network_entry(self, name, loader):
+        """Cache ``loader()`` until the set of routes changes."""
+        return self._catalog().get(("network", name), loader)
+
+    def register_warmup(self, fn):
+        """Also call ``fn()`` (inside an app context) when a worker warms up."""
+        self.warmups.append(fn)
+        return fn
+
+    def warm(self, app):
+        """Load the catalogue, dimension lists, the busiest routes and registered
+        warm-ups, then mark ``app`` ready."""
+        catalog = self._catalog(app)
+        catalog.status = {"state": "warming"}
+        started = time.monotonic()
+        try:
+            with app.app_context():
+                flights = self.catalogue()
+                self.dimensions()
+                routes = top_routes(app.config["CATALOG_WARM_ROUTES"])
+                for origin, destination in routes:
+                    self.flights(origin, destination)
+                for fn in self.warmups:
+                    fn()
+                db.session.remove()
+        except Exception as e:
+            logger.exception("Catalogue warm-up failed")
+            catalog.status = {"state": "failed", "error": str(e)}
+            return False
+
+        catalog.ready = True
+        catalog.status = {
+            "state": "warm",
+            "flights": len(flights),
+            "routes_warmed": [f"{origin}-{destination}" for origin, destination in routes],
+            "warm_duration_ms": round((time.monotonic() - started) * 1000, 1),
+            "warmed_at": datetime.datetime.now().isoformat(),
+        }
+        return True
+
+    def readiness(self):
+        """Return ``(ready, status)`` for the current app."""
+        catalog = self._catalog()
+        return catalog.ready, catalog.status
+
+
+catalog_cache = CatalogCache()
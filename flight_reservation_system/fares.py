@@ -0,0 +1,79 @@
+"""
+Fare calendar: the cheapest current dynamic price per day for one route.
+
+One range query on ``ix_flights_route_date`` loads only the columns pricing
+needs for the whole month, ``price_flights`` prices them in a single pass
+and the minimum is kept per day. Results are cached per route and month in
+the catalogue cache, so they are dropped as soon as a flight on the route
+changes in this worker.
+"""
+
+import calendar
+from datetime import datetime
+
+from catalog_cache import catalog_cache
+from models import db, Flight
+from pricing import price_flights
+
+_PRICING_COLUMNS = (Flight.id, Flight.airline, Flight.origin, Flight.destination, Flight.date,
+                    Flight.dep_time, Flight.price, Flight.seat_rows, Flight.seat_cols, Flight.booked_seats,
+                    Flight.departs_at, Flight.dep_hour, Flight.weekday, Flight.route_key)
+
+
+def parse_month(month):
+    """Parse ``YYYY-MM``; raises ValueError otherwise."""
+    try:
+        return datetime.strptime(month, "%Y-%m")
+    except (TypeError, ValueError):
+        raise ValueError("month must be YYYY-MM")
+
+
+def _build_calendar(origin, destination, first):
+    days_in_month = calendar.monthrange(first.year, first.month)[1]
+    start = first.strftime("%Y-%m-01")
+    end = (datetime(first.year + 1, 1, 1) if first.month == 12
+           else datetime(first.year, first.month + 1, 1)).strftime("%Y-%m-%d")
+
+    rows = (db.session.query(*_PRICING_COLUMNS)
+            .filter(Flight.origin == origin, Flight.destination == destination,
+                    Flight.date >= start, Flight.date < end)
+            .all())
+
+    cheapest = {}
+    counts = {}
+    for row, dynamic_price in zip(rows, price_flights(rows)):
+        counts[row.date] = counts.get(row.date, 0) + 1
+        best = cheapest.get(row.date)
+        if best is None or dynamic_price < best["dynamic_price"]:
+            cheapest[row.date] = {
+                "flight_id": row.id,
+                "airline": row.airline,
+                "dep_time": row.dep_time,
+                "price": row.price,
+                "dynamic_price": dynamic_price,
+            }
+
+    days = []
+    for day in range(1, days_in_month + 1):
+        date = f"{first.year:04d}-{first.month:02d}-{day:02d}"
+        fare = cheapest.get(date)
+        days.append({
+            "date": date,
+            "min_price": fare["dynamic_price"] if fare else None,
+            "flights": counts.get(date, 0),
+            "cheapest_flight": fare,
+        })
+
+    lowest = min((d for d in days if d["min_price"] is not None), key=lambda d: d["min_price"], default=None)
+    return {
+        "days": days,
+        "cheapest_date": lowest["date"] if lowest else None,
+        "cheapest_price": lowest["min_price"] if lowest else None,
+    }
+
+
+def fare_calendar(origin, destination, month):
+    """Cheapest dynamic fare for each day of ``month`` (``YYYY-MM``) on a route."""
+    first = parse_month(month)
+    return catalog_cache.route_entry(origin, destination, ("fare_calendar", month),
+                                     lambda: _build_calendar(origin, destination, first))
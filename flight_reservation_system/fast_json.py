@@ -0,0 +1,107 @@
+"""
+Fast JSON provider for API responses.
+
+``FastJSONProvider`` replaces Flask's default provider: it encodes with
+orjson when it is installed and falls back to the standard library
+otherwise. Either way responses are written compactly, without sorting
+keys (dicts keep the order they were built in) and straight to UTF-8
+bytes. Datetimes, UUIDs and dataclasses serialize exactly as with Flask's
+default provider.
+
+``raw_json(data)`` wraps already encoded JSON so it is embedded in a
+response as is. orjson 3.9+ does that natively (``orjson.Fragment``); with
+older orjson or the standard library the provider splices the bytes in
+after encoding, in place of placeholders that carry a per-response nonce.
+``projection.encoded_flights`` uses this to splice the per-row encodings
+kept by the catalogue cache into ``/api/flights`` responses.
+"""
+
+import json
+import re
+import secrets
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+_NATIVE_FRAGMENT = getattr(orjson, "Fragment", None)
+# Placeholders carry a random per-response nonce, so strings from the request
+# that merely look like one (e.g. an echoed filter value) are never spliced.
+_RAW_TOKEN = "\x00RAW{}:{}\x00"
+_RAW_PATTERN = re.compile(rb'"\\u0000RAW([0-9a-f]{16}):(\d+)\\u0000"')
+
+
+class RawJSON:
+    """Pre-encoded JSON embedded verbatim by ``FastJSONProvider``."""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data
+
+
+def raw_json(data):
+    """Wrap encoded JSON (``bytes``) for embedding in a response."""
+    return _NATIVE_FRAGMENT(data) if _NATIVE_FRAGMENT is not None else RawJSON(data)
+
+
+def encode(obj, default=None):
+    """Compact UTF-8 JSON for ``obj`` (no raw fragments)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    sort_keys = False
+    ensure_ascii = False
+
+    def _encode(self, obj, indent=False):
+        while True:
+            nonce = secrets.token_hex(8)
+            fragments = []
+
+            def default(value):
+                if isinstance(value, RawJSON):
+                    fragments.append(value.data)
+                    return _RAW_TOKEN.format(nonce, len(fragments) - 1)
+                return self.default(value)
+
+            data = self._dumps(obj, default, indent)
+            if not fragments:
+                return data
+            # Only splice when the nonce occurs nowhere but in the placeholders
+            token = nonce.encode("ascii")
+            if data.count(token) == len(fragments):
+                return _RAW_PATTERN.sub(
+                    lambda m: fragments[int(m.group(2))] if m.group(1) == token else m.group(0), data)
+
+    def _dumps(self, obj, default, indent):
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=default, option=option)
+        return json.dumps(obj, default=default, ensure_ascii=self.ensure_ascii, sort_keys=self.sort_keys,
+                          indent=2 if indent else None,
+                          separators=None if indent else (",", ":")).encode("utf-8")
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:  # e.g. the tojson template filter passing json.dumps options
+            return super().dumps(obj, **kwargs)
+        return self._encode(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._encode(obj, indent) + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,81 @@
+"""
+Cache of rendered flight cards for the home and search pages.
+
+Rendering a card (``templates/_flight_card.html``) per flight per request
+dominated the CPU time of ``/`` and ``/search``. Each worker now keeps the
+HTML of every card it has rendered, keyed by the values the card shows:
+the flight's schedule fields (its version) and its pricing bucket - current
+price, trend, occupancy and days to departure. A page is assembled from the
+cached cards and only cards whose flight or price changed are re-rendered.
+
+Templates call ``flight_cards(flights, classes="")`` to render a list of
+``to_dict()`` results. Set ``FRAGMENT_CACHE_SIZE`` to ``0`` to render every
+card on every request.
+"""
+
+import os
+import threading
+
+from markupsafe import Markup
+
+CARD_TEMPLATE = "_flight_card.html"
+# Everything the card template reads from a flight
+CARD_FIELDS = ("id", "airline", "origin", "destination", "date", "dep_time", "arr_time", "status", "price",
+               "dynamic_price", "price_trend", "occupancy_rate", "days_until_departure")
+
+
+class _Cards:
+    """Per-app card store: ``(flight id, classes)`` -> (card key, HTML)."""
+
+    def __init__(self, app):
+        self.app = app
+        self.max_size = app.config["FRAGMENT_CACHE_SIZE"]
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def _macro(self):
+        # Template.module is built once per (re)loaded template
+        return self.app.jinja_env.get_template(CARD_TEMPLATE).module.flight_card
+
+    def render(self, flights, classes):
+        if self.max_size <= 0:
+            macro = self._macro()
+            return Markup("").join(macro(f, classes) for f in flights)
+
+        macro = None
+        parts = []
+        for flight in flights:
+            slot = (flight["id"], classes)
+            key = tuple(flight[name] for name in CARD_FIELDS)
+            entry = self.entries.get(slot)
+            if entry is not None and entry[0] == key:
+                parts.append(entry[1])
+                continue
+            macro = macro or self._macro()
+            html = macro(flight, classes)
+            with self.lock:
+                if slot not in self.entries and len(self.entries) >= self.max_size:
+                    self.entries.clear()
+                self.entries[slot] = (key, html)
+            parts.append(html)
+        return Markup("").join(parts)
+
+
+class FragmentCache:
+    """Flask extension rendering flight cards through a per-worker cache."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("FRAGMENT_CACHE_SIZE", int(os.environ.get("FRS_FRAGMENT_CACHE_SIZE", 5000)))
+        cards = app.extensions["fragment_cache"] = _Cards(app)
+
+        @app.template_global()
+        def flight_cards(flights, classes=""):
+            """HTML of the cards for ``flights`` (``to_dict()`` results)."""
+            return cards.render(flights, classes)
+
+
+fragment_cache = FragmentCache()
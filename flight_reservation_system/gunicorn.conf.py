@@ -0,0 +1,14 @@
+"""
+gunicorn settings used by start.sh.
+
+Each worker builds its route graph and warms its catalogue cache before it
+starts accepting connections, so a rolling deploy never routes traffic to
+a cold worker.
+"""
+
+
+def post_worker_init(worker):
+    from catalog_cache import catalog_cache
+    from itineraries import itinerary_planner
+    itinerary_planner.warm(worker.wsgi)
+    catalog_cache.warm(worker.wsgi)
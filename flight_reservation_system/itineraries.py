@@ -0,0 +1,270 @@
+"""
+Connecting-flight itinerary search over an in-memory route graph.
+
+The graph holds only schedule data: for every airport, the flights leaving
+it sorted by departure time, so the onward connections of a leg are one
+``bisect`` away. A search is best-first on total elapsed time (first
+departure to current arrival), which never decreases as legs are added, so
+complete itineraries come out shortest first. It is bounded by
+``max_legs`` and by the number of partial itineraries expanded.
+
+Each worker builds its graph once (gunicorn's ``post_worker_init`` or the
+first search) and keeps it current: flights added, edited or removed
+through the ORM in this process are applied to the graph when the change
+commits. Changes made by other workers are picked up when the graph is
+rebuilt after ``ROUTE_GRAPH_MAX_AGE`` seconds.
+
+Prices are not part of the graph; the legs of the returned itineraries are
+loaded in one query and priced together with ``pricing.price_flights``.
+"""
+
+import bisect
+import heapq
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+
+from models import db, Flight
+from pricing import parse_date, price_flights
+from storage import RoutingSession
+
+Leg = namedtuple("Leg", "id airline origin destination dep arr")
+
+MINUTES_PER_DAY = 24 * 60
+_EPOCH = datetime(1970, 1, 1)
+_PENDING_LEGS = "route_graph_pending_legs"
+_SCHEDULE_FIELDS = ("airline", "origin", "destination", "date", "dep_time", "arr_time")
+
+
+def _minutes(date, hhmm):
+    """Minutes since 1970-01-01 for a flight date and ``HH:MM`` time, or None."""
+    day = parse_date(date)
+    try:
+        hours, minutes = hhmm.split(":")
+        return (day - _EPOCH).days * MINUTES_PER_DAY + int(hours) * 60 + int(minutes)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _format(minutes):
+    return (_EPOCH + timedelta(minutes=minutes)).strftime("%Y-%m-%d %H:%M")
+
+
+def make_leg(flight_id, airline, origin, destination, date, dep_time, arr_time):
+    """Build a graph leg; None for flights without a usable schedule."""
+    dep = _minutes(date, dep_time)
+    arr = _minutes(date, arr_time)
+    if dep is None or arr is None:
+        return None
+    if arr < dep:
+        arr += MINUTES_PER_DAY  # overnight flight lands the next day
+    return Leg(flight_id, airline, origin, destination, dep, arr)
+
+
+class RouteGraph:
+    """Flights indexed by origin airport and departure time."""
+
+    def __init__(self, legs=()):
+        self.legs = {}
+        self.departures = {}   # origin -> sorted [(dep, flight_id)]
+        self.built_at = time.monotonic()
+        self.lock = threading.Lock()
+        for leg in legs:
+            self.legs[leg.id] = leg
+            self.departures.setdefault(leg.origin, []).append((leg.dep, leg.id))
+        for departures in self.departures.values():
+            departures.sort()
+
+    @classmethod
+    def from_database(cls):
+        rows = db.session.query(Flight.id, Flight.airline, Flight.origin, Flight.destination,
+                                Flight.date, Flight.dep_time, Flight.arr_time)
+        return cls(leg for leg in (make_leg(*row) for row in rows) if leg is not None)
+
+    # Updates replace the per-airport list instead of mutating it, so searches
+    # running in other threads never see a half-updated list.
+    def remove(self, flight_id):
+        with self.lock:
+            leg = self.legs.pop(flight_id, None)
+            if leg is not None:
+                departures = list(self.departures[leg.origin])
+                departures.remove((leg.dep, leg.id))
+                self.departures[leg.origin] = departures
+
+    def upsert(self, leg):
+        self.remove(leg.id)
+        with self.lock:
+            self.legs[leg.id] = leg
+            departures = list(self.departures.get(leg.origin, ()))
+            bisect.insort(departures, (leg.dep, leg.id))
+            self.departures[leg.origin] = departures
+
+    def departing(self, origin, start, end):
+        """Legs leaving ``origin`` with ``start <= dep < end``."""
+        departures = self.departures.get(origin, ())
+        lo = bisect.bisect_left(departures, (start, ""))
+        hi = bisect.bisect_left(departures, (end, ""))
+        return [self.legs[flight_id] for _, flight_id in departures[lo:hi]]
+
+    def search(self, origin, destination, start, end, min_layover=45, max_layover=360,
+               max_legs=3, limit=10, max_expansions=20000):
+        """Return up to ``limit`` itineraries (tuples of legs), shortest total time first."""
+        heap = []
+        counter = 0
+        for leg in self.departing(origin, start, end):
+            heap.append((leg.arr - leg.dep, counter, (leg,)))
+            counter += 1
+        heapq.heapify(heap)
+
+        results = []
+        expansions = 0
+        while heap and len(results) < limit and expansions < max_expansions:
+            elapsed, _, path = heapq.heappop(heap)
+            last = path[-1]
+            if last.destination == destination:
+                results.append(path)
+                continue
+            if len(path) >= max_legs:
+                continue
+            expansions += 1
+            visited = {origin}.union(leg.destination for leg in path)
+            for leg in self.departing(last.destination, last.arr + min_layover, last.arr + max_layover + 1):
+                if leg.destination in visited:
+                    continue
+                heapq.heappush(heap, (leg.arr - path[0].dep, counter, path + (leg,)))
+                counter += 1
+        return results
+
+
+# ------------------ Incremental updates ------------------
+@event.listens_for(RoutingSession, "after_flush")
+def _collect_schedule_changes(session, flush_context):
+    pending = session.info.setdefault(_PENDING_LEGS, {})
+    for obj in session.deleted:
+        if isinstance(obj, Flight):
+            pending[obj.id] = None
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Flight) or obj in session.deleted:
+            continue
+        # Bookings only touch booked_seats; skip flights whose schedule is unchanged
+        state = inspect(obj)
+        if obj in session.new or any(state.attrs[name].history.has_changes() for name in _SCHEDULE_FIELDS):
+            pending[obj.id] = make_leg(obj.id, obj.airline, obj.origin, obj.destination,
+                                       obj.date, obj.dep_time, obj.arr_time)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _apply_schedule_changes(session):
+    pending = session.info.pop(_PENDING_LEGS, None)
+    if not pending or not has_app_context():
+        return
+    planner = current_app.extensions.get("itineraries")
+    graph = planner.graph if planner is not None else None
+    if graph is None:
+        return
+    for flight_id, leg in pending.items():
+        if leg is None:
+            graph.remove(flight_id)
+        else:
+            graph.upsert(leg)
+
+
+class _Planner:
+    def __init__(self, app):
+        self.app = app
+        self.graph = None
+        self.lock = threading.Lock()
+
+    def current_graph(self):
+        graph = self.graph
+        if graph is None or time.monotonic() - graph.built_at > self.app.config["ROUTE_GRAPH_MAX_AGE"]:
+            with self.lock:
+                if self.graph is graph:
+                    self.graph = RouteGraph.from_database()
+                graph = self.graph
+        return graph
+
+
+def _leg_summary(flight, dynamic_price):
+    return {
+        "id": flight.id,
+        "airline": flight.airline,
+        "origin": flight.origin,
+        "destination": flight.destination,
+        "date": flight.date,
+        "dep_time": flight.dep_time,
+        "arr_time": flight.arr_time,
+        "price": flight.price,
+        "dynamic_price": dynamic_price,
+        "status": flight.status,
+    }
+
+
+class ItineraryPlanner:
+    """Flask extension owning the per-app route graph."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("ROUTE_GRAPH_MAX_AGE", float(os.environ.get("FRS_ROUTE_GRAPH_MAX_AGE", 300)))
+        app.extensions["itineraries"] = _Planner(app)
+
+    def _planner(self, app=None):
+        return (app or current_app).extensions["itineraries"]
+
+    def warm(self, app):
+        """Build the route graph for ``app`` ahead of the first search."""
+        with app.app_context():
+            self._planner(app).current_graph()
+            db.session.remove()
+
+    def search(self, origin, destination, date=None, min_layover=45, max_layover=360,
+               max_legs=3, limit=10):
+        """Find and price itineraries from ``origin`` to ``destination``.
+
+        ``date`` (``YYYY-MM-DD``) restricts the first departure to that day.
+        Returns a list of itinerary dicts, shortest total travel time first.
+        """
+        graph = self._planner().current_graph()
+        if date:
+            start = _minutes(date, "00:00")
+            if start is None:
+                raise ValueError("date must be YYYY-MM-DD")
+            end = start + MINUTES_PER_DAY
+        else:
+            start, end = float("-inf"), float("inf")
+
+        paths = graph.search(origin, destination, start, end, min_layover, max_layover, max_legs, limit)
+
+        # Price every leg of every itinerary in one query and one batch
+        flight_ids = {leg.id for path in paths for leg in path}
+        flights = {f.id: f for f in Flight.query.filter(Flight.id.in_(flight_ids)).all()} if flight_ids else {}
+        ordered = list(flights.values())
+        prices = dict(zip((f.id for f in ordered), price_flights(ordered)))
+
+        itineraries = []
+        for path in paths:
+            if any(leg.id not in flights for leg in path):
+                continue  # removed by another worker since the graph was built
+            legs = [_leg_summary(flights[leg.id], prices[leg.id]) for leg in path]
+            itineraries.append({
+                "legs": legs,
+                "stops": len(path) - 1,
+                "layovers_minutes": [b.dep - a.arr for a, b in zip(path, path[1:])],
+                "departure": _format(path[0].dep),
+                "arrival": _format(path[-1].arr),
+                "duration_minutes": path[-1].arr - path[0].dep,
+                "total_price": sum(leg["price"] for leg in legs),
+                "total_dynamic_price": sum(leg["dynamic_price"] for leg in legs),
+            })
+        return itineraries
+
+
+itinerary_planner = ItineraryPlanner()
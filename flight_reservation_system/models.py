@@ -1,12 +1,25 @@
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import and_, event, inspect, insert, select
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 import json
-import math
+import pricing
+from amenities import AmenityTable
+from storage import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 class Flight(db.Model):
     __tablename__ = 'flights'
+    __table_args__ = (
+        # Route + date range lookups (fare calendar, flexible dates)
+        db.Index('ix_flights_route_date', 'origin', 'destination', 'date'),
+        # Date range lookups without a route
+        db.Index('ix_flights_date', 'date'),
+        # Departure order (keyset pagination of the home page)
+        db.Index('ix_flights_departure', 'date', 'dep_time', 'id'),
+    )
     
     id = db.Column(db.String(50), primary_key=True)
     airline = db.Column(db.String(100), nullable=False)
@@ -25,18 +38,35 @@ class Flight(db.Model):
     seat_cols = db.Column(db.Integer, default=6)
     booked_seats = db.Column(db.Text)  # JSON string to store list of booked seats
     
-    # Amenities as JSON string
-    amenities = db.Column(db.Text)  # JSON string to store list of amenities
+    # Amenities as a bitmask over the ``amenities`` dictionary table
+    amenity_mask = db.Column(db.BigInteger, nullable=False, default=0)
+    
+    # Derived from date, dep_time and route whenever they are written
+    # (pricing.schedule_columns); None when the date or time is malformed
+    departs_at = db.Column(db.Integer)      # seconds since 1970-01-01, local clock
+    dep_hour = db.Column(db.Integer)
+    weekday = db.Column(db.Integer)         # Monday = 0
+    route_key = db.Column(db.String(21))    # "DEL-BOM"
     
     # Relationship with bookings
     bookings = db.relationship('Booking', backref='flight_details', lazy=True)
     
     def __init__(self, **kwargs):
+        amenities = kwargs.pop('amenities', None)
         super(Flight, self).__init__(**kwargs)
         if self.booked_seats is None:
             self.booked_seats = json.dumps([])
-        if self.amenities is None:
-            self.amenities = json.dumps([])
+        if amenities is not None:
+            self.set_amenities(json.loads(amenities) if isinstance(amenities, str) else amenities)
+        elif self.amenity_mask is None:
+            self.amenity_mask = 0
+        self.update_schedule()
+    
+    def update_schedule(self):
+        """Recompute the stored schedule fields from date, dep_time and route"""
+        for name, value in pricing.schedule_columns(self.date, self.dep_time,
+                                                    self.origin, self.destination).items():
+            setattr(self, name, value)
     
     def get_booked_seats(self):
         """Return booked seats as a Python list"""
@@ -50,13 +80,11 @@ class Flight(db.Model):
     
     def get_amenities(self):
         """Return amenities as a Python list"""
-        if self.amenities:
-            return json.loads(self.amenities)
-        return []
+        return amenity_names(self.amenity_mask or 0)
     
     def set_amenities(self, amenities_list):
         """Set amenities from a Python list"""
-        self.amenities = json.dumps(amenities_list)
+        self.amenity_mask = amenity_mask(amenities_list)
     
     def add_booked_seat(self, seat):
         """Add a single seat to booked seats"""
@@ -81,205 +109,153 @@ class Flight(db.Model):
 
     def get_days_until_departure(self):
         """Calculate days until departure from current date"""
-        try:
-            flight_date = datetime.strptime(self.date, '%Y-%m-%d')
-            current_date = datetime.now()
-            days_diff = (flight_date - current_date).days
-            return max(0, days_diff)  # Return 0 if flight is today or past
-        except:
-            return 30  # Default to 30 days if date parsing fails
+        return pricing.days_until_departure(self.departs_at, pricing.epoch_seconds(datetime.now()))
     
     def calculate_dynamic_price(self):
         """Calculate dynamic price based on demand, availability, time, and market factors"""
-        base_price = self.price
-        
-        # Factor 1: Occupancy-based pricing (demand)
-        # Higher occupancy = higher price (up to 60% increase for high demand)
-        occupancy_rate = self.get_occupancy_rate()
-        if occupancy_rate >= 0.8:  # 80%+ occupied - very high demand
-            occupancy_multiplier = 1.6  
-        elif occupancy_rate >= 0.6:  # 60-80% occupied - high demand
-            occupancy_multiplier = 1.4
-        elif occupancy_rate >= 0.4:  # 40-60% occupied - moderate demand
-            occupancy_multiplier = 1.2
-        elif occupancy_rate >= 0.2:  # 20-40% occupied - low demand
-            occupancy_multiplier = 1.1
-        else:  # <20% occupied - very low demand (discounts)
-            occupancy_multiplier = 0.95
-        
-        # Factor 2: Time-based pricing (urgency)
-        # Prices increase as departure approaches
-        days_until_departure = self.get_days_until_departure()
-        
-        if days_until_departure >= 45:
-            time_multiplier = 0.75  # Super early bird discount
-        elif days_until_departure >= 30:
-            time_multiplier = 0.8   # Early bird discount
-        elif days_until_departure >= 21:
-            time_multiplier = 0.9   # Advance booking discount
-        elif days_until_departure >= 14:
-            time_multiplier = 1.0   # Base price
-        elif days_until_departure >= 7:
-            time_multiplier = 1.25  # 25% increase
-        elif days_until_departure >= 3:
-            time_multiplier = 1.5   # 50% increase
-        elif days_until_departure >= 1:
-            time_multiplier = 1.75  # 75% increase
-        else:
-            time_multiplier = 2.0   # 100% increase (same day/last minute)
-        
-        # Factor 3: Peak hour pricing
-        # Morning rush (6-9 AM) and evening rush (6-9 PM) flights
-        try:
-            dep_hour = int(self.dep_time.split(':')[0])
-            if (6 <= dep_hour <= 9) or (18 <= dep_hour <= 21):
-                peak_multiplier = 1.15  # 15% increase for peak hours
-            elif (22 <= dep_hour <= 5):  # Red-eye flights
-                peak_multiplier = 0.9   # 10% discount for inconvenient hours
-            else:
-                peak_multiplier = 1.0
-        except:
-            peak_multiplier = 1.0
-        
-        # Factor 4: Day of week pricing (weekends vs weekdays)
-        try:
-            flight_date = datetime.strptime(self.date, '%Y-%m-%d')
-            day_of_week = flight_date.weekday()  # 0=Monday, 6=Sunday
-            if day_of_week >= 5:  # Weekend (Saturday/Sunday)
-                weekend_multiplier = 1.1
-            elif day_of_week == 4:  # Friday
-                weekend_multiplier = 1.05
-            else:  # Monday-Thursday
-                weekend_multiplier = 1.0
-        except:
-            weekend_multiplier = 1.0
-            
-        # Factor 5: Route popularity (premium routes cost more)
-        premium_routes = ['DEL-BOM', 'BOM-DEL', 'BLR-DEL', 'DEL-BLR']
-        route_key = f"{self.origin}-{self.destination}"
-        if route_key in premium_routes:
-            route_multiplier = 1.1
-        else:
-            route_multiplier = 1.0
-        
-        # Calculate final dynamic price
-        dynamic_price = (base_price * occupancy_multiplier * time_multiplier * 
-                        peak_multiplier * weekend_multiplier * route_multiplier)
-        
-        # Add some randomness for market fluctuation (±3%)
-        import random
-        market_fluctuation = random.uniform(0.97, 1.03)
-        dynamic_price *= market_fluctuation
-        
-        # Round to nearest 50 for cleaner pricing
-        dynamic_price = math.ceil(dynamic_price / 50) * 50
-        
-        # Ensure minimum price (never go below 70% of base price)
-        min_price = int(base_price * 0.7)
-        dynamic_price = max(min_price, int(dynamic_price))
-        
-        return dynamic_price
+        return pricing.price_flights([self])[0]
     
     def get_price_trend(self):
         """Get price trend indication for display"""
-        base_price = self.price
-        dynamic_price = self.calculate_dynamic_price()
-        
-        change_percent = ((dynamic_price - base_price) / base_price) * 100
-        
-        if change_percent > 30:
-            return "high"        # High demand - 30%+ price increase
-        elif change_percent > 10:
-            return "moderate"    # Rising prices - 10-30% increase
-        elif change_percent > -5:
-            return "stable"      # Stable prices - ±5% change
-        else:
-            return "low"         # Great deals - more than 5% discount
+        return pricing.price_trend(self.price, self.calculate_dynamic_price())
     
     def get_pricing_factors(self):
         """Get detailed breakdown of pricing factors for analysis"""
-        occupancy_rate = self.get_occupancy_rate()
-        days_until_departure = self.get_days_until_departure()
-        
-        # Calculate individual multipliers
-        if occupancy_rate >= 0.8:
-            occupancy_multiplier = 1.6
-        elif occupancy_rate >= 0.6:
-            occupancy_multiplier = 1.4
-        elif occupancy_rate >= 0.4:
-            occupancy_multiplier = 1.2
-        elif occupancy_rate >= 0.2:
-            occupancy_multiplier = 1.1
-        else:
-            occupancy_multiplier = 0.95
-            
-        if days_until_departure >= 45:
-            time_multiplier = 0.75
-        elif days_until_departure >= 30:
-            time_multiplier = 0.8
-        elif days_until_departure >= 21:
-            time_multiplier = 0.9
-        elif days_until_departure >= 14:
-            time_multiplier = 1.0
-        elif days_until_departure >= 7:
-            time_multiplier = 1.25
-        elif days_until_departure >= 3:
-            time_multiplier = 1.5
-        elif days_until_departure >= 1:
-            time_multiplier = 1.75
-        else:
-            time_multiplier = 2.0
-            
-        try:
-            dep_hour = int(self.dep_time.split(':')[0])
-            if (6 <= dep_hour <= 9) or (18 <= dep_hour <= 21):
-                peak_multiplier = 1.15
-            elif (22 <= dep_hour <= 5):
-                peak_multiplier = 0.9
-            else:
-                peak_multiplier = 1.0
-        except:
-            peak_multiplier = 1.0
-            
-        return {
-            "occupancy_factor": round(occupancy_multiplier, 2),
-            "time_factor": round(time_multiplier, 2),
-            "peak_hour_factor": round(peak_multiplier, 2),
-            "occupancy_rate": round(occupancy_rate * 100, 1),
-            "days_until_departure": days_until_departure,
-            "peak_hours": (6 <= int(self.dep_time.split(':')[0]) <= 9) or (18 <= int(self.dep_time.split(':')[0]) <= 21) if ':' in self.dep_time else False
-        }
+        return pricing.pricing_factors(self)
     
-    def to_dict(self):
-        """Convert flight to dictionary (similar to JSON structure)"""
-        dynamic_price = self.calculate_dynamic_price()
-        pricing_factors = self.get_pricing_factors()
-        
-        return {
-            'id': self.id,
-            'airline': self.airline,
-            'origin': self.origin,
-            'destination': self.destination,
-            'date': self.date,
-            'dep_time': self.dep_time,
-            'arr_time': self.arr_time,
-            'price': self.price,
-            'dynamic_price': dynamic_price,
-            'price_trend': self.get_price_trend(),
-            'price_change_percent': round(((dynamic_price - self.price) / self.price) * 100, 1),
-            'occupancy_rate': round(self.get_occupancy_rate(), 2),
-            'days_until_departure': self.get_days_until_departure(),
-            'pricing_factors': pricing_factors,
-            'status': self.status,
-            'gate': self.gate,
-            'terminal': self.terminal,
-            'seats': {
-                'rows': self.seat_rows,
-                'cols': self.seat_cols,
-                'booked': self.get_booked_seats()
-            },
-            'amenities': self.get_amenities()
-        }
+    def to_dict(self, dynamic_price=None, fields=None):
+        """Convert flight to dictionary (similar to JSON structure)
+
+        Pass ``dynamic_price`` when the flight was already priced in a batch.
+        ``fields`` limits the result to those keys (see ``FLIGHT_FIELDS``);
+        fields that are not requested are not computed, so the flight is
+        only priced when a price field is requested.
+        """
+        fields = FLIGHT_FIELDS if fields is None else fields
+        if dynamic_price is None and not PRICE_FIELDS.isdisjoint(fields):
+            dynamic_price = self.calculate_dynamic_price()
+        return {name: _FLIGHT_GETTERS[name](self, dynamic_price) for name in fields}
+
+
+SCHEDULE_SOURCE_FIELDS = ("date", "dep_time", "origin", "destination")
+
+
+@event.listens_for(Flight, "before_insert")
+def _insert_schedule(mapper, connection, flight):
+    flight.update_schedule()
+
+
+@event.listens_for(Flight, "before_update")
+def _update_schedule(mapper, connection, flight):
+    state = inspect(flight)
+    if any(state.attrs[name].history.has_changes() for name in SCHEDULE_SOURCE_FIELDS):
+        flight.update_schedule()
+
+
+# Flight.to_dict() keys in output order: name -> getter(flight, dynamic_price)
+_FLIGHT_GETTERS = {
+    'id': lambda f, price: f.id,
+    'airline': lambda f, price: f.airline,
+    'origin': lambda f, price: f.origin,
+    'destination': lambda f, price: f.destination,
+    'date': lambda f, price: f.date,
+    'dep_time': lambda f, price: f.dep_time,
+    'arr_time': lambda f, price: f.arr_time,
+    'price': lambda f, price: f.price,
+    'dynamic_price': lambda f, price: price,
+    'price_trend': lambda f, price: pricing.price_trend(f.price, price),
+    'price_change_percent': lambda f, price: round(((price - f.price) / f.price) * 100, 1),
+    'occupancy_rate': lambda f, price: round(f.get_occupancy_rate(), 2),
+    'days_until_departure': lambda f, price: f.get_days_until_departure(),
+    'pricing_factors': lambda f, price: f.get_pricing_factors(),
+    'status': lambda f, price: f.status,
+    'gate': lambda f, price: f.gate,
+    'terminal': lambda f, price: f.terminal,
+    'seats': lambda f, price: {
+        'rows': f.seat_rows,
+        'cols': f.seat_cols,
+        'booked': f.get_booked_seats()
+    },
+    'amenities': lambda f, price: f.get_amenities(),
+}
+FLIGHT_FIELDS = tuple(_FLIGHT_GETTERS)
+PRICE_FIELDS = frozenset({'dynamic_price', 'price_trend', 'price_change_percent'})
+
+
+class Amenity(db.Model):
+    __tablename__ = 'amenities'
+
+    bit = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+
+
+class PriceHistory(db.Model):
+    """Recorded dynamic prices of one flight, packed by ``price_history``"""
+    __tablename__ = 'price_history'
+
+    flight_id = db.Column(db.String(50), primary_key=True)
+    points = db.Column(db.LargeBinary, nullable=False)   # little-endian (uint32 time, uint32 price) pairs
+    updated_at = db.Column(db.Integer, nullable=False)
+
+
+# ------------------ Amenity dictionary ------------------
+def _amenity_rows():
+    # Always read the primary: a name registered a moment ago must be visible
+    with db.engine.connect() as conn:
+        return conn.execute(select(Amenity.bit, Amenity.name)).all()
+
+
+def amenity_table():
+    """This app's amenity dictionary, loaded from the ``amenities`` table on first use."""
+    table = current_app.extensions.get("amenity_table")
+    if table is None:
+        table = current_app.extensions["amenity_table"] = AmenityTable(_amenity_rows())
+    return table
+
+
+def amenity_names(mask):
+    """Amenity names for a flight's ``amenity_mask``."""
+    table = amenity_table()
+    if not table.covers(mask):
+        table.load(_amenity_rows())  # registered by another worker
+    return table.names_for(mask)
+
+
+def amenity_mask(names):
+    """Bitmask for a list of amenity names, adding new names to the dictionary.
+
+    New names are committed in their own short transaction so bulk imports
+    and admin edits can reference them right away.
+    """
+    names = [str(name).strip() for name in names if name and str(name).strip()]
+    table = amenity_table()
+    for _ in range(3):
+        missing = table.missing(names)
+        if not missing:
+            break
+        table.load(_amenity_rows())
+        missing = table.missing(names)
+        if not missing:
+            break
+        rows = [{"bit": bit, "name": name} for bit, name in zip(table.free_bits(len(missing)), missing)]
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(insert(Amenity), rows)
+        except IntegrityError:
+            pass  # another worker took the bit or the name; reload and retry
+        table.load(_amenity_rows())
+    return table.mask_of(names)
+
+
+def amenity_filter(terms):
+    """SQL condition: flights having every amenity in ``terms`` (e.g. ``["wifi", "meals"]``)."""
+    table = amenity_table()
+    try:
+        masks = table.filter_masks(terms)
+    except ValueError:
+        table.load(_amenity_rows())
+        masks = table.filter_masks(terms)
+    return and_(*(Flight.amenity_mask.op("&")(mask) != 0 for mask in masks))
 
 
 class Booking(db.Model):
@@ -0,0 +1,51 @@
+"""
+Keyset pagination of flight lists for the home and search pages.
+
+Pages are in departure order, ``(date, dep_time, id)``, and a page is
+addressed by the key of the last flight before it (the cursor, e.g.
+``2025-03-14,06:30,AI101``) rather than by an offset: fetching the next page
+is a bisect into a cached sorted list or one indexed range query, however
+deep the page, and a flight added or removed meanwhile does not shift
+later pages.
+"""
+
+from bisect import bisect_right
+
+PAGE_SIZE = 24
+
+
+def departure_key(flight):
+    """Sort key of a ``to_dict()`` result; also the cursor of the page after it."""
+    return (flight["date"], flight["dep_time"], flight["id"])
+
+
+def encode_cursor(key):
+    return ",".join(str(part) for part in key)
+
+
+def parse_cursor(value):
+    """The departure key encoded in a cursor, None for the first page.
+
+    The date and time may be empty (a flight not scheduled yet sorts first);
+    the id may not. Raises ValueError for a malformed cursor.
+    """
+    if not value:
+        return None
+    parts = value.split(",", 2)
+    if len(parts) != 3 or not parts[2]:
+        raise ValueError(f"Invalid page cursor: {value}")
+    return tuple(parts)
+
+
+def sorted_by_departure(flights):
+    """``(flights, keys)`` with both lists in departure order, ready for ``keyset_page``."""
+    flights = sorted(flights, key=departure_key)
+    return flights, [departure_key(f) for f in flights]
+
+
+def keyset_page(flights, keys, after, limit=PAGE_SIZE):
+    """The ``limit`` flights following cursor key ``after`` and the cursor of the next page (None on the last)."""
+    start = bisect_right(keys, after) if after is not None else 0
+    page = flights[start:start + limit]
+    more = start + limit < len(flights)
+    return page, (encode_cursor(keys[start + limit - 1]) if more else None)
@@ -0,0 +1,81 @@
+"""
+What-if price curves for revenue analysts.
+
+The pricing model is evaluated over a grid of occupancy levels × days to
+departure, for one flight or a whole set of flights, in one NumPy pass:
+the occupancy and days factors are looked up for the whole grid axis at
+once (``searchsorted`` on the compiled rule breakpoints), the departure
+hour, weekday and route factors for the whole batch of flights at once
+(indexing the compiled hour and weekday tables, ``isin`` on the premium
+routes), and the three are broadcast against each other.
+
+Curve prices are expected prices: the model without its random market
+fluctuation. Each point equals ``pricing.finalize_price`` for that
+occupancy and day count with a fluctuation of 1.
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+import pricing_rules
+from pricing import days_until_departure, epoch_seconds, occupancy_rate
+
+DEFAULT_OCCUPANCY_STEPS = 11    # 0%, 10%, ... 100%
+DEFAULT_MAX_DAYS = 60
+MAX_OCCUPANCY_STEPS = 101
+MAX_DAYS = 365
+MAX_CELLS = 2_000_000           # flights × occupancy steps × days per request
+
+
+def curve_grid(occupancy_steps=DEFAULT_OCCUPANCY_STEPS, max_days=DEFAULT_MAX_DAYS):
+    """Grid axes: occupancy rates from 0 to 1 and days to departure from 0 to ``max_days``.
+
+    Raises ValueError for sizes outside the supported range.
+    """
+    if not 2 <= occupancy_steps <= MAX_OCCUPANCY_STEPS:
+        raise ValueError(f"occupancy_steps must be between 2 and {MAX_OCCUPANCY_STEPS}")
+    if not 0 <= max_days <= MAX_DAYS:
+        raise ValueError(f"max_days must be between 0 and {MAX_DAYS}")
+    return np.linspace(0.0, 1.0, occupancy_steps), np.arange(max_days + 1)
+
+
+def flight_factors(flights, rules):
+    """Departure hour × weekday × route factor of each flight, looked up for the whole batch at once."""
+    count = len(flights)
+    hours = np.fromiter((-1 if f.dep_hour is None else f.dep_hour for f in flights), np.int64, count)
+    weekdays = np.fromiter((7 if f.weekday is None else f.weekday for f in flights), np.int64, count)
+    routes = np.array([f.route_key for f in flights], dtype=object)
+
+    # One extra table slot for flights without a known hour / weekday
+    hour_table = np.append(rules.hour_factors, rules.hour_base)
+    weekday_table = np.append(rules.weekday_factors, 1.0)
+    peak = hour_table[np.where((hours >= 0) & (hours < 24), hours, 24)]
+    weekday = weekday_table[weekdays]
+    route = np.where(np.isin(routes, list(rules.premium_routes)), rules.premium_factor, 1.0)
+    return peak, weekday, route
+
+
+def price_curves(flights, occupancy, days, rules=None):
+    """Expected prices of each flight over the grid, as an int array ``[flight, occupancy, day]``."""
+    rules = rules or pricing_rules.current()
+    if len(flights) * len(occupancy) * len(days) > MAX_CELLS:
+        raise ValueError(f"Grid too large: at most {MAX_CELLS:,} prices per request")
+
+    occupancy_factors = np.asarray(rules.occupancy_factors)[
+        np.searchsorted(rules.occupancy_bounds, occupancy, side="right")]
+    time_factors = np.asarray(rules.days_factors)[np.searchsorted(rules.days_bounds, days, side="right")]
+    base = np.fromiter((f.price for f in flights), float, len(flights))[:, None, None]
+    peak, weekday, route = (factor[:, None, None] for factor in flight_factors(flights, rules))
+
+    # Same operation order as pricing.price_flights, so every point matches it exactly
+    multiplier = occupancy_factors[None, :, None] * time_factors[None, None, :] * peak * weekday * route
+    prices = np.ceil(base * multiplier / rules.round_to) * rules.round_to
+    return np.maximum(prices, np.trunc(base * rules.floor)).astype(np.int64)
+
+
+def current_points(flights, now=None):
+    """Where each flight sits on its curve today: occupancy rate and days to departure."""
+    now = epoch_seconds(now or datetime.now())
+    return [{"occupancy_rate": round(occupancy_rate(f), 2),
+             "days_until_departure": days_until_departure(f.departs_at, now)} for f in flights]
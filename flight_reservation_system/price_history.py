@@ -0,0 +1,257 @@
+"""
+Append-only price history per flight, downsampled as it ages.
+
+Every live ``pricing.price_flights`` batch is offered to the recorder, which
+keeps at most one point per flight every ``PRICE_HISTORY_INTERVAL`` seconds
+(the catalogue is repriced every ``CATALOG_CACHE_TTL`` seconds, so every
+flight is sampled at that rate). Points are buffered in memory and a
+background thread per worker appends them every
+``PRICE_HISTORY_FLUSH_SECONDS`` on its own connection to the primary.
+
+A flight's history is one row: fixed-width ``(time, price)`` pairs of
+32-bit unsigned integers, times in epoch seconds on the schedule clock.
+A flush only appends the new pairs to the row (``points || :new``), so it
+writes a few bytes per flight however long the history is. Every
+``PRICE_HISTORY_COMPACT_SECONDS`` the same thread compacts the rows
+appended to since its last pass:
+
+* points from the last ``RAW_WINDOW`` are kept as recorded,
+* older ones are averaged per hour, then after ``HOURLY_WINDOW`` per day,
+* at most ``MAX_DAILY_POINTS`` daily points are kept.
+
+Buckets are aligned to whole hours and days, so a bucket is averaged only
+once all its points are in. A flight therefore holds a few hundred points
+(about 4 KB) plus what was appended since the last compaction, however
+long it is on sale, which keeps storage bounded for hundreds of thousands
+of flights. A compaction only replaces a row nothing was appended to
+while it ran; one that lost that race is compacted on the next pass.
+"""
+
+import logging
+import os
+import struct
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app, has_app_context
+from sqlalchemy import LargeBinary, bindparam, cast, func, select
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from models import db, PriceHistory
+from pricing import epoch_seconds, observe_prices
+
+logger = logging.getLogger(__name__)
+
+POINT = struct.Struct("<II")
+HOUR = 60 * 60
+DAY = 24 * HOUR
+RAW_WINDOW = 6 * HOUR
+HOURLY_WINDOW = 3 * DAY
+MAX_DAILY_POINTS = 365
+WRITE_CHUNK = 500
+WRITE_ATTEMPTS = 3
+_EPOCH = datetime(1970, 1, 1)
+
+
+# ------------------ Series encoding ------------------
+def pack(points):
+    return b"".join(POINT.pack(t, price) for t, price in points)
+
+
+def unpack(data):
+    return list(POINT.iter_unpack(data)) if data else []
+
+
+def _average(points, size):
+    buckets = {}
+    for t, price in points:
+        buckets.setdefault(t - t % size, []).append(price)
+    return [(start, round(sum(prices) / len(prices))) for start, prices in sorted(buckets.items())]
+
+
+def downsample(points, now):
+    """``points`` (sorted by time) compacted for their age at ``now``."""
+    hourly_from = (now - RAW_WINDOW) // HOUR * HOUR
+    daily_from = (now - HOURLY_WINDOW) // DAY * DAY
+    daily = _average([p for p in points if p[0] < daily_from], DAY)[-MAX_DAILY_POINTS:]
+    hourly = _average([p for p in points if daily_from <= p[0] < hourly_from], HOUR)
+    return daily + hourly + [p for p in points if p[0] >= hourly_from]
+
+
+def to_datetime(t):
+    return _EPOCH + timedelta(seconds=t)
+
+
+# ------------------ Recorder ------------------
+class _Recorder:
+    """Sampling state, write buffer and flush thread for one application."""
+
+    def __init__(self, app):
+        self.app = app
+        self.interval = app.config["PRICE_HISTORY_INTERVAL"]
+        self.flush_seconds = app.config["PRICE_HISTORY_FLUSH_SECONDS"]
+        self.lock = threading.Lock()
+        self.last_recorded = {}   # flight id -> time of its last buffered point
+        self.pending = []         # (flight id, time, price)
+        self.compact_seconds = app.config["PRICE_HISTORY_COMPACT_SECONDS"]
+        self.thread = None
+        self.points_written = 0
+        self.compacted_at = time.monotonic()   # when this worker last compacted
+        self.compacted_since = 0                # histories appended to from then on (schedule clock)
+
+    def record(self, flights, prices, now):
+        now = int(now)
+        with self.lock:
+            for flight, price in zip(flights, prices):
+                last = self.last_recorded.get(flight.id)
+                if last is None or now - last >= self.interval:
+                    self.last_recorded[flight.id] = now
+                    self.pending.append((flight.id, now, price))
+        if self.pending:
+            self.ensure_running()
+
+    def ensure_running(self):
+        # Started lazily, like the write queue, so each forked worker gets its own
+        if self.thread is not None and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="frs-price-history", daemon=True)
+                self.thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            try:
+                with self.app.app_context():
+                    self.flush()
+                    if time.monotonic() - self.compacted_at >= self.compact_seconds:
+                        self.compact()
+            except Exception:
+                logger.exception("Price history flush failed")
+
+    def flush(self):
+        """Append the buffered points to their flights' histories; returns the number written.
+
+        Points that could not be written go back into the buffer for the next flush.
+        """
+        with self.lock:
+            pending, self.pending = self.pending, []
+        if not pending:
+            return 0
+        by_flight = {}
+        for flight_id, t, price in pending:
+            by_flight.setdefault(flight_id, []).append((t, price))
+        now = max(t for _, t, _ in pending)
+        flight_ids = list(by_flight)
+        written, failed = 0, []
+        for start in range(0, len(flight_ids), WRITE_CHUNK):
+            chunk = {fid: by_flight[fid] for fid in flight_ids[start:start + WRITE_CHUNK]}
+            count = sum(map(len, chunk.values()))
+            if self._append(chunk, now):
+                written += count
+            else:
+                failed.extend((fid, t, price) for fid, points in chunk.items() for t, price in points)
+        if failed:
+            with self.lock:
+                self.pending[:0] = failed
+        self.points_written += written
+        return written
+
+    def _append(self, by_flight, now):
+        table = PriceHistory.__table__
+        appended = cast(table.c.points.concat(bindparam("data", type_=LargeBinary)), LargeBinary)
+        for attempt in range(WRITE_ATTEMPTS):
+            try:
+                # Always the primary: history is written from GET requests too
+                with db.engine.begin() as conn:
+                    existing = set(conn.execute(select(table.c.flight_id)
+                                                .where(table.c.flight_id.in_(list(by_flight)))).scalars())
+                    inserts, updates = [], []
+                    for flight_id, points in by_flight.items():
+                        row = {"fid": flight_id, "data": pack(points), "now": now}
+                        (updates if flight_id in existing else inserts).append(row)
+                    if updates:
+                        conn.execute(table.update().where(table.c.flight_id == bindparam("fid"))
+                                     .values(points=appended, updated_at=bindparam("now")), updates)
+                    if inserts:
+                        conn.execute(table.insert().values(flight_id=bindparam("fid"), points=bindparam("data"),
+                                                           updated_at=bindparam("now")), inserts)
+                return True
+            except (IntegrityError, OperationalError):
+                # Another worker added the same flights first: re-read and retry
+                if attempt == WRITE_ATTEMPTS - 1:
+                    logger.exception("Could not append %d price history points; retrying on the next flush",
+                                     sum(map(len, by_flight.values())))
+        return False
+
+    def compact(self, now=None):
+        """Downsample the histories appended to since the last compaction; returns the rows rewritten."""
+        now = int(now if now is not None else epoch_seconds(datetime.now()))
+        # Points still buffered now reach the database with their own, slightly older, times
+        since, self.compacted_since = self.compacted_since, now - self.flush_seconds
+        self.compacted_at = time.monotonic()
+        table = PriceHistory.__table__
+        rewritten = 0
+        with db.engine.connect() as conn:
+            flight_ids = list(conn.execute(select(table.c.flight_id).where(table.c.updated_at >= since)).scalars())
+        for start in range(0, len(flight_ids), WRITE_CHUNK):
+            with db.engine.begin() as conn:
+                rows = conn.execute(select(table.c.flight_id, table.c.points)
+                                    .where(table.c.flight_id.in_(flight_ids[start:start + WRITE_CHUNK]))).all()
+                updates = []
+                for flight_id, data in rows:
+                    compacted = pack(downsample(sorted(unpack(data)), now))
+                    if compacted != data:
+                        updates.append({"fid": flight_id, "old_size": len(data), "data": compacted})
+                if updates:
+                    # Skip rows a flush appended to since they were read
+                    result = conn.execute(table.update()
+                                          .where(table.c.flight_id == bindparam("fid"),
+                                                 func.length(table.c.points) == bindparam("old_size"))
+                                          .values(points=bindparam("data")), updates)
+                    rewritten += max(result.rowcount, 0)
+        return rewritten
+
+
+class PriceHistoryRecorder:
+    """Flask extension recording live prices into the price history."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("PRICE_HISTORY_INTERVAL", int(os.environ.get("FRS_PRICE_HISTORY_INTERVAL", 300)))
+        app.config.setdefault("PRICE_HISTORY_FLUSH_SECONDS",
+                              float(os.environ.get("FRS_PRICE_HISTORY_FLUSH_SECONDS", 30)))
+        app.config.setdefault("PRICE_HISTORY_COMPACT_SECONDS",
+                              float(os.environ.get("FRS_PRICE_HISTORY_COMPACT_SECONDS", HOUR)))
+        app.extensions["price_history"] = _Recorder(app)
+
+    def flush(self, app=None):
+        """Write this worker's buffered points now."""
+        return (app or current_app).extensions["price_history"].flush()
+
+    def compact(self, app=None, now=None):
+        """Downsample the histories this worker has not compacted yet."""
+        return (app or current_app).extensions["price_history"].compact(now)
+
+    def series(self, flight_id):
+        """A flight's recorded ``(time, price)`` points, oldest first."""
+        row = db.session.get(PriceHistory, flight_id)
+        # Workers append independently, so points since the last compaction may interleave
+        return sorted(unpack(row.points)) if row is not None else []
+
+
+@observe_prices
+def _record_prices(flights, prices, now):
+    if not has_app_context():
+        return
+    recorder = current_app.extensions.get("price_history")
+    if recorder is not None and recorder.interval > 0:
+        recorder.record(flights, prices, now)
+
+
+price_history = PriceHistoryRecorder()
@@ -0,0 +1,181 @@
+"""
+Dynamic pricing for one flight or many at once.
+
+The factor tables used to live twice in ``Flight`` (once in
+``calculate_dynamic_price`` and again in ``get_pricing_factors``). They are
+now data: ``pricing_rules.json``, compiled and hot-reloaded by
+``pricing_rules``. ``price_flights`` prices a batch of flights against a
+single clock reading, which is what search results, itineraries and
+calendars need.
+
+Pricing reads the schedule fields stored with each flight
+(``schedule_columns``: departure time, hour, weekday and route key, derived
+when the flight is written) instead of parsing its date and time strings.
+"""
+
+import json
+import math
+import random
+from datetime import datetime
+from functools import lru_cache
+
+import pricing_rules
+
+SECONDS_PER_DAY = 24 * 60 * 60
+_EPOCH = datetime(1970, 1, 1)
+
+
+@lru_cache(maxsize=4096)
+def parse_date(value):
+    """Parse a ``YYYY-MM-DD`` flight date; ``None`` if it is malformed."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+
+
+def occupancy_rate(flight):
+    total_seats = flight.seat_rows * flight.seat_cols
+    booked = json.loads(flight.booked_seats) if flight.booked_seats else []
+    return len(booked) / total_seats if total_seats > 0 else 0.0
+
+
+def epoch_seconds(moment):
+    """Seconds since 1970-01-01 on the same (naive, local) clock as flight schedules."""
+    return (moment - _EPOCH).total_seconds()
+
+
+def days_until_departure(departs_at, now):
+    """Whole days from ``now`` (epoch seconds) to the departure day of a flight."""
+    if departs_at is None:
+        return 30  # Default to 30 days if the flight has no valid date
+    departure_day = departs_at - departs_at % SECONDS_PER_DAY
+    return max(0, int((departure_day - now) // SECONDS_PER_DAY))
+
+
+def departure_hour(dep_time):
+    try:
+        return int(dep_time.split(":")[0])
+    except (AttributeError, ValueError):
+        return None
+
+
+def departure_minute(dep_time):
+    try:
+        return int(dep_time.split(":")[1])
+    except (AttributeError, IndexError, ValueError):
+        return 0
+
+
+def schedule_columns(date, dep_time, origin, destination):
+    """The stored schedule fields of a flight, derived from its date, time and route."""
+    day = parse_date(date)
+    hour = departure_hour(dep_time)
+    departs_at = None
+    if day is not None:
+        departs_at = int(epoch_seconds(day)) + ((hour or 0) * 60 + departure_minute(dep_time)) * 60
+    return {
+        "departs_at": departs_at,
+        "dep_hour": hour,
+        "weekday": day.weekday() if day is not None else None,
+        "route_key": f"{origin}-{destination}",
+    }
+
+
+# ------------------ Pricing factors ------------------
+# Thresholds and factors come from the pricing rules file (pricing_rules.py);
+# ``rules`` defaults to the version currently in force.
+def occupancy_factor(rate, rules=None):
+    """Higher occupancy = higher price"""
+    return (rules or pricing_rules.current()).occupancy_factor(rate)
+
+
+def time_factor(days, rules=None):
+    """Prices increase as departure approaches"""
+    return (rules or pricing_rules.current()).time_factor(days)
+
+
+def peak_factor(hour, rules=None):
+    """Rush-hour departures cost more"""
+    return (rules or pricing_rules.current()).peak_factor(hour)
+
+
+def weekday_factor(day_of_week, rules=None):
+    """Weekends cost more than weekdays"""
+    return (rules or pricing_rules.current()).weekday_factor(day_of_week)
+
+
+def route_factor(route_key, rules=None):
+    """Premium routes cost more"""
+    return (rules or pricing_rules.current()).route_factor(route_key)
+
+
+def finalize_price(base_price, multiplier, fluctuation, rules=None):
+    """Apply market fluctuation, round up and never go below the floor share of base"""
+    rules = rules or pricing_rules.current()
+    dynamic_price = math.ceil(base_price * multiplier * fluctuation / rules.round_to) * rules.round_to
+    return max(int(base_price * rules.floor), int(dynamic_price))
+
+
+def price_trend(base_price, dynamic_price):
+    """Price trend indication for display"""
+    change_percent = ((dynamic_price - base_price) / base_price) * 100
+    if change_percent > 30:
+        return "high"        # High demand - 30%+ price increase
+    elif change_percent > 10:
+        return "moderate"    # Rising prices - 10-30% increase
+    elif change_percent > -5:
+        return "stable"      # Stable prices - ±5% change
+    return "low"             # Great deals - more than 5% discount
+
+
+# ------------------ Entry points ------------------
+_observers = []
+
+
+def observe_prices(fn):
+    """Call ``fn(flights, prices, now)`` after each live ``price_flights`` batch (``now`` in epoch seconds)."""
+    _observers.append(fn)
+    return fn
+
+
+def price_flights(flights, now=None, rng=random):
+    """Return the current dynamic price of each flight, in order.
+
+    Prices computed for the current time (no ``now``) are passed to the
+    ``observe_prices`` observers, e.g. the price history recorder.
+    """
+    live = now is None
+    now = epoch_seconds(now or datetime.now())
+    rules = pricing_rules.current()
+    low, high = 1 - rules.fluctuation, 1 + rules.fluctuation
+    prices = []
+    for flight in flights:
+        multiplier = (rules.occupancy_factor(occupancy_rate(flight))
+                      * rules.time_factor(days_until_departure(flight.departs_at, now))
+                      * rules.peak_factor(flight.dep_hour)
+                      * rules.weekday_factor(flight.weekday)
+                      * rules.route_factor(flight.route_key))
+        # Market fluctuation
+        prices.append(finalize_price(flight.price, multiplier, rng.uniform(low, high), rules))
+    if live and prices:
+        for observer in _observers:
+            observer(flights, prices, now)
+    return prices
+
+
+def pricing_factors(flight, now=None):
+    """Breakdown of the pricing factors for one flight"""
+    now = epoch_seconds(now or datetime.now())
+    rules = pricing_rules.current()
+    rate = occupancy_rate(flight)
+    days = days_until_departure(flight.departs_at, now)
+    hour = flight.dep_hour
+    return {
+        "occupancy_factor": round(rules.occupancy_factor(rate), 2),
+        "time_factor": round(rules.time_factor(days), 2),
+        "peak_hour_factor": round(rules.peak_factor(hour), 2),
+        "occupancy_rate": round(rate * 100, 1),
+        "days_until_departure": days,
+        "peak_hours": rules.is_peak(hour),
+    }
@@ -0,0 +1,147 @@
+"""
+Pricing rules loaded from a versioned JSON file (``pricing_rules.json``).
+
+Revenue management edits the file; workers pick the change up without a
+restart. ``current()`` checks the file's modification time at most every
+``FRS_PRICING_RULES_CHECK`` seconds and recompiles it when it changed. A
+file that fails to load or validate is logged and the previous rules stay
+in force.
+
+Rules are compiled once per version into lookup structures:
+
+* occupancy and days to departure: ascending breakpoints searched with
+  ``bisect`` (``at_least`` pairs: from this value on, use this factor),
+* departure hour and weekday: one factor per hour / per day of the week,
+* premium routes: a frozenset of ``"ORIGIN-DESTINATION"`` keys.
+
+Hour ranges are inclusive and may wrap midnight (``{"from": 22, "to": 5}``).
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_right
+
+logger = logging.getLogger(__name__)
+
+RULES_PATH = os.environ.get("FRS_PRICING_RULES",
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)), "pricing_rules.json"))
+CHECK_INTERVAL = float(os.environ.get("FRS_PRICING_RULES_CHECK", 5))
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+def _breakpoints(section):
+    pairs = sorted((float(at), float(factor)) for at, factor in section.get("at_least", []))
+    return [at for at, _ in pairs], [float(section["base"])] + [factor for _, factor in pairs]
+
+
+class PricingRules:
+    """One version of the pricing rules, compiled for lookups."""
+
+    def __init__(self, config):
+        self.version = str(config.get("version", "unversioned"))
+        self.occupancy_bounds, self.occupancy_factors = _breakpoints(config["occupancy"])
+        self.days_bounds, self.days_factors = _breakpoints(config["days_to_departure"])
+
+        hours = config["departure_hour"]
+        self.hour_factors = [float(hours["base"])] * 24
+        for span in hours.get("ranges", []):
+            start, end = int(span["from"]), int(span["to"])
+            if not (0 <= start < 24 and 0 <= end < 24):
+                raise ValueError(f"Hour range out of bounds: {start}-{end}")
+            for hour in range(start, end + 1 if start <= end else end + 25):
+                self.hour_factors[hour % 24] = float(span["factor"])
+        self.hour_base = float(hours["base"])
+
+        weekdays = config["weekday"]
+        self.weekday_factors = [float(weekdays["base"])] * 7
+        for day, factor in weekdays.get("days", {}).items():
+            if day not in WEEKDAYS:
+                raise ValueError(f"Unknown weekday: {day}. Use one of: {', '.join(WEEKDAYS)}")
+            self.weekday_factors[WEEKDAYS.index(day)] = float(factor)
+
+        routes = config["routes"]
+        self.premium_routes = frozenset(routes.get("premium", []))
+        self.premium_factor = float(routes["premium_factor"])
+
+        market = config["market"]
+        self.fluctuation = float(market["fluctuation"])
+        self.round_to = int(market["round_to"])
+        self.floor = float(market["floor"])
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def occupancy_factor(self, rate):
+        return self.occupancy_factors[bisect_right(self.occupancy_bounds, rate)]
+
+    def time_factor(self, days):
+        return self.days_factors[bisect_right(self.days_bounds, days)]
+
+    def peak_factor(self, hour):
+        return self.hour_factors[hour] if hour is not None and 0 <= hour < 24 else self.hour_base
+
+    def is_peak(self, hour):
+        return self.peak_factor(hour) > self.hour_base
+
+    def weekday_factor(self, day_of_week):
+        return self.weekday_factors[day_of_week] if day_of_week is not None else 1.0
+
+    def route_factor(self, route_key):
+        return self.premium_factor if route_key in self.premium_routes else 1.0
+
+
+class _RulesFile:
+    """The rules compiled from ``path``, reloaded when the file changes."""
+
+    def __init__(self, path, check_interval):
+        self.path = path
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.rules = None
+        self.mtime = None
+        self.checked_at = 0.0
+
+    def get(self):
+        now = time.monotonic()
+        if self.rules is not None and now - self.checked_at < self.check_interval:
+            return self.rules
+        with self.lock:
+            if self.rules is None or now - self.checked_at >= self.check_interval:
+                self._refresh()
+                self.checked_at = now
+        return self.rules
+
+    def _refresh(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            if self.rules is None:
+                raise
+            logger.error("Pricing rules file %s is unavailable; keeping version %s", self.path, self.rules.version)
+            return
+        if mtime == self.mtime:
+            return
+        try:
+            rules = PricingRules.load(self.path)
+        except Exception:
+            if self.rules is None:
+                raise
+            logger.exception("Invalid pricing rules in %s; keeping version %s", self.path, self.rules.version)
+            self.mtime = mtime  # don't retry until the file changes again
+            return
+        if self.rules is not None:
+            logger.info("Pricing rules %s -> %s", self.rules.version, rules.version)
+        self.rules, self.mtime = rules, mtime
+
+
+_rules_file = _RulesFile(RULES_PATH, CHECK_INTERVAL)
+
+
+def current():
+    """The pricing rules in force."""
+    return _rules_file.get()
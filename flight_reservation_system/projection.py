@@ -0,0 +1,87 @@
+"""
+Field projection for flight API responses (``?fields=``).
+
+``fields`` is a comma-separated list of ``Flight.to_dict()`` keys and/or
+named views:
+
+* ``summary`` - identity, route and schedule, base price and status
+* ``card``    - what a search result card shows (summary + current price)
+* ``full``    - every field (the default)
+
+Flights built for a projection only compute what it needs: no pricing
+without a price field, no seat-list parsing without ``seats`` or
+``occupancy_rate``. Full rows from the catalogue cache are encoded once
+per cached version of the row (``CatalogRow``, ``encoded_flights``).
+"""
+
+from fast_json import encode, raw_json
+from models import FLIGHT_FIELDS, PRICE_FIELDS
+
+FLIGHT_VIEWS = {
+    "summary": ("id", "airline", "origin", "destination", "date", "dep_time", "arr_time", "price", "status"),
+    "card": ("id", "airline", "origin", "destination", "date", "dep_time", "arr_time", "price",
+             "dynamic_price", "price_trend", "occupancy_rate", "days_until_departure", "status"),
+    "full": FLIGHT_FIELDS,
+}
+
+
+def parse_fields(value):
+    """Field names selected by a ``fields`` parameter, in output order; None for all.
+
+    Raises ValueError for names that are neither a field nor a view.
+    """
+    if not value:
+        return None
+    selected = set()
+    for name in (part.strip() for part in value.split(",")):
+        if not name:
+            continue
+        if name in FLIGHT_VIEWS:
+            selected.update(FLIGHT_VIEWS[name])
+        elif name in FLIGHT_FIELDS:
+            selected.add(name)
+        else:
+            raise ValueError(f"Unknown field: {name}. Use flight fields or one of: {', '.join(FLIGHT_VIEWS)}")
+    if not selected:
+        return None
+    return tuple(name for name in FLIGHT_FIELDS if name in selected)
+
+
+def needs_pricing(fields):
+    return fields is None or not PRICE_FIELDS.isdisjoint(fields)
+
+
+def project(record, fields):
+    """``record`` reduced to ``fields`` (None keeps everything)."""
+    if fields is None:
+        return record
+    return {name: record[name] for name in fields if name in record}
+
+
+# ------------------ Pre-encoded rows ------------------
+class CatalogRow(dict):
+    """A ``to_dict()`` row owned by the catalogue cache.
+
+    Cached rows are shared and never modified (a changed flight gets a new
+    row), so the row keeps its own JSON encoding once a response needed it.
+    """
+
+    __slots__ = ("encoded",)
+
+
+def encoded_flights(records):
+    """A JSON array of full ``to_dict()`` rows for a response, spliced from per-row encodings.
+
+    Only ``CatalogRow`` rows keep their encoding; rows built for one request
+    are encoded each time.
+    """
+    parts = []
+    for record in records:
+        if type(record) is CatalogRow:
+            data = getattr(record, "encoded", None)
+            if data is None:
+                data = record.encoded = encode(record)
+        else:
+            data = encode(record)
+        parts.append(data)
+    return raw_json(b"[" + b",".join(parts) + b"]")
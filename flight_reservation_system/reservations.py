@@ -0,0 +1,144 @@
+"""
+Booking mutations shared by the HTML routes and the REST API.
+
+Every function here changes rows through ``db.session`` but never commits:
+the caller (usually the write queue) owns the transaction, so the same
+function can run inline in a request or batched on the writer thread.
+Results are returned as plain dictionaries because ORM instances do not
+survive being handed back across threads.
+"""
+
+import datetime
+import random
+import string
+
+from models import db, Flight, Booking
+
+
+class BookingError(Exception):
+    """Base class for booking mutations that cannot be applied."""
+
+
+class FlightNotFound(BookingError):
+    pass
+
+
+class BookingNotFound(BookingError):
+    pass
+
+
+class SeatUnavailable(BookingError):
+    pass
+
+
+class InvalidBookingState(BookingError):
+    pass
+
+
+def generate_pnr(prefix="IN"):
+    code = "".join(random.choices(string.ascii_uppercase + string.digits, k=4))
+    return f"{prefix}-{code}"
+
+
+def _get_flight(fid):
+    flight = db.session.get(Flight, fid)
+    if not flight:
+        raise FlightNotFound("Flight not found")
+    return flight
+
+
+def _get_booking(pnr):
+    booking = db.session.get(Booking, pnr)
+    if not booking:
+        raise BookingNotFound("Booking not found")
+    return booking
+
+
+def reserve_seats(flight_id, seats, fullname, email, phone, pnr_prefix=None,
+                  amount=None, status="PENDING", created_at_format="%d-%m-%Y %H:%M"):
+    """Mark seats as booked and create the booking that holds them.
+
+    When ``amount`` is not given it is the dynamic price after the seats
+    have been reserved, multiplied by the number of seats.
+    """
+    flight = _get_flight(flight_id)
+
+    booked_seats = set(flight.get_booked_seats())
+    for seat in seats:
+        if seat in booked_seats:
+            raise SeatUnavailable(f"Seat {seat} already booked!")
+
+    for seat in seats:
+        flight.add_booked_seat(seat)
+
+    prefix = pnr_prefix or flight_id
+    pnr = generate_pnr(prefix)
+    while db.session.get(Booking, pnr):  # Ensure PNR is unique
+        pnr = generate_pnr(prefix)
+
+    if amount is None:
+        amount = flight.calculate_dynamic_price() * len(seats)
+
+    booking = Booking(
+        pnr=pnr,
+        flight_id=flight_id,
+        fullname=fullname,
+        email=email,
+        phone=phone,
+        amount=amount,
+        status=status,
+        created_at=datetime.datetime.now().strftime(created_at_format)
+    )
+    booking.set_seats(seats)
+    db.session.add(booking)
+    return booking.to_dict()
+
+
+def confirm_booking(pnr):
+    """Simulate a successful payment for a booking."""
+    booking = _get_booking(pnr)
+    booking.status = "CONFIRMED"
+    return booking.to_dict()
+
+
+def _release_seats(booking):
+    flight = db.session.get(Flight, booking.flight_id)
+    if flight:
+        for seat in booking.get_seats():
+            flight.remove_booked_seat(seat)
+
+
+def cancel_booking(pnr, required_status=None):
+    """Cancel a booking and release its seats.
+
+    ``required_status`` restricts cancellation to bookings currently in
+    that state (the customer-facing page only cancels confirmed bookings).
+    """
+    booking = _get_booking(pnr)
+    if booking.status == "CANCELLED":
+        raise InvalidBookingState("Booking already cancelled")
+    if required_status and booking.status != required_status:
+        raise InvalidBookingState("Only confirmed bookings can be cancelled.")
+
+    _release_seats(booking)
+    booking.status = "CANCELLED"
+    return booking.to_dict()
+
+
+def update_booking(pnr, changes):
+    """Apply a partial update coming from ``PUT /api/bookings/<pnr>``."""
+    booking = _get_booking(pnr)
+
+    if 'status' in changes:
+        old_status = booking.status
+        booking.status = changes['status']
+
+        # Handle seat management for status changes
+        if old_status == 'PENDING' and changes['status'] == 'CANCELLED':
+            _release_seats(booking)
+
+    for field in ('fullname', 'email', 'phone'):
+        if field in changes:
+            setattr(booking, field, changes[field])
+
+    return booking.to_dict()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo revenue simulation of the pricing rules against stochastic demand.
+
+Every flight still on sale is played forward from today to departure many
+times (``--scenarios``). Each simulated day the flight is priced exactly as
+``pricing.price_flights`` would price it (occupancy, days to departure,
+departure hour, weekday, route, market fluctuation, rounding and floor),
+then booking requests arrive:
+
+* the booking window is ``--window`` days; a flight's expected demand over
+  the whole window is ``--demand`` × its seat count, spread over the days
+  with weight ``exp(-days / --decay)`` (most requests come late),
+* the day's arrivals are Poisson with that mean scaled by
+  ``(price / base price) ** -elasticity``, so a higher price sells less,
+* at most the remaining seats are sold.
+
+Seats already booked count towards occupancy but not towards revenue: the
+result is the revenue still to be earned. Scenarios are vectorized with
+NumPy (arrays of flights × scenarios, one step per day) and chunks of
+flights are simulated in parallel on a process pool; runs too small to
+repay starting one (under ``POOL_MIN_STEPS`` simulated flight-days) stay
+in this process. With the same seed the results are reproducible,
+whatever the number of processes.
+
+``--rules`` simulates an alternative rules file on the same demand draws,
+so a pricing change can be compared against the rules in force before it
+is rolled out.
+
+NumPy is imported by the simulation functions, not with the module, so
+registering the CLI command does not load it into every web worker.
+
+Usage:
+    python revenue_simulator.py --scenarios 5000 --processes 4
+    flask --app app simulate-revenue --rules candidate_rules.json --json report.json
+"""
+
+import argparse
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import click
+
+import pricing_rules
+from models import Flight
+from pricing import days_until_departure, epoch_seconds, occupancy_rate
+
+DEFAULT_SCENARIOS = 2000
+DEFAULT_WINDOW = 60         # days before departure in which flights sell
+DEFAULT_DEMAND = 1.2        # expected requests over the window, per seat
+DEFAULT_DECAY = 14.0        # days; demand weight exp(-days / decay)
+DEFAULT_ELASTICITY = 1.5
+CHUNK_FLIGHTS = 64          # flights per pool task (and per random stream)
+POOL_MIN_STEPS = 50_000_000  # flight × scenario × day steps worth starting a pool for
+PERCENTILES = (5, 50, 95)
+
+SimFlight = namedtuple("SimFlight", "id base_price seats booked dep_hour weekday route_key days_left")
+
+
+def sim_flights(flights, now=None):
+    """Plain, picklable snapshots of flights still on sale at ``now``."""
+    now = epoch_seconds(now or datetime.now())
+    snapshots = []
+    for f in flights:
+        seats = f.seat_rows * f.seat_cols
+        if seats <= 0 or f.departs_at is None or f.departs_at < now:
+            continue
+        snapshots.append(SimFlight(f.id, f.price, seats, round(occupancy_rate(f) * seats), f.dep_hour,
+                                   f.weekday, f.route_key, days_until_departure(f.departs_at, now)))
+    return snapshots
+
+
+def demand_weights(window, decay):
+    """Share of the window's demand arriving on each day to departure, index 0 to ``window``."""
+    import numpy as np
+    weights = np.exp(-np.arange(window + 1) / decay)
+    return weights / weights.sum()
+
+
+def _simulate_chunk(task):
+    """Revenue and seats sold by departure of each flight in a chunk: two arrays ``[flight, scenario]``."""
+    import numpy as np
+
+    chunk, rules, params, seed = task
+    scenarios, window, demand, decay, elasticity = params
+    rng = np.random.default_rng(seed)
+    weights = demand_weights(window, decay)
+
+    base = np.array([f.base_price for f in chunk], dtype=float)[:, None]
+    seats = np.array([f.seats for f in chunk])[:, None]
+    days_left = np.array([min(f.days_left, window) for f in chunk])[:, None]
+    peak = np.array([rules.peak_factor(f.dep_hour) for f in chunk])[:, None]
+    weekday = np.array([rules.weekday_factor(f.weekday) for f in chunk])[:, None]
+    route = np.array([rules.route_factor(f.route_key) for f in chunk])[:, None]
+    expected = demand * seats
+    occupancy_bounds = np.asarray(rules.occupancy_bounds)
+    occupancy_factors = np.asarray(rules.occupancy_factors)
+    low, high = 1 - rules.fluctuation, 1 + rules.fluctuation
+
+    sold = np.broadcast_to(np.array([f.booked for f in chunk])[:, None], (len(chunk), scenarios)).copy()
+    revenue = np.zeros((len(chunk), scenarios))
+    for day in range(int(days_left.max()), -1, -1):
+        on_sale = days_left >= day
+        occupancy = occupancy_factors[np.searchsorted(occupancy_bounds, sold / seats, side="right")]
+        # Same operation order as pricing.price_flights
+        multiplier = occupancy * rules.time_factor(day) * peak * weekday * route
+        fluctuation = rng.uniform(low, high, size=sold.shape)
+        prices = np.ceil(base * multiplier * fluctuation / rules.round_to) * rules.round_to
+        prices = np.maximum(prices, np.trunc(base * rules.floor))
+
+        arrivals = rng.poisson(np.where(on_sale, expected * weights[day] * (prices / base) ** -elasticity, 0.0))
+        sales = np.minimum(arrivals, seats - sold)
+        sold += sales
+        revenue += sales * prices
+    return revenue, sold
+
+
+def _pool_size(tasks, processes, scenarios, window):
+    """Worker processes worth starting for ``tasks``; 1 runs them in this process."""
+    workers = min(processes or os.cpu_count() or 1, len(tasks))
+    steps = scenarios * sum(min(f.days_left, window) + 1 for chunk, _, _, _ in tasks for f in chunk)
+    return workers if steps >= POOL_MIN_STEPS else 1
+
+
+def _run_tasks(tasks, processes):
+    """``(chunk, result)`` pairs in task order, simulated in-process or on a process pool."""
+    if processes <= 1:
+        for task in tasks:
+            yield task[0], _simulate_chunk(task)
+        return
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        yield from zip((task[0] for task in tasks), pool.map(_simulate_chunk, tasks))
+
+
+def _summary(values, digits):
+    import numpy as np
+    summary = {"mean": round(float(values.mean()), digits)}
+    for p, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        summary[f"p{p}"] = round(float(value), digits)
+    return summary
+
+
+def simulate(flights, rules=None, scenarios=DEFAULT_SCENARIOS, window=DEFAULT_WINDOW, demand=DEFAULT_DEMAND,
+             decay=DEFAULT_DECAY, elasticity=DEFAULT_ELASTICITY, seed=0, processes=None):
+    """Simulate ``sim_flights`` snapshots under ``rules``; per-flight and total revenue and load factor.
+
+    Raises ValueError for invalid parameters.
+    """
+    import numpy as np
+
+    if scenarios < 1:
+        raise ValueError("scenarios must be at least 1")
+    if window < 0 or decay <= 0 or demand < 0:
+        raise ValueError("window and demand must not be negative and decay must be positive")
+    rules = rules or pricing_rules.current()
+    params = (scenarios, window, demand, decay, elasticity)
+    # One random stream per chunk, so results do not depend on the number of processes
+    tasks = [(flights[start:start + CHUNK_FLIGHTS], rules, params, [seed, start])
+             for start in range(0, len(flights), CHUNK_FLIGHTS)]
+    report = []
+    total_revenue = np.zeros(scenarios)
+    total_sold = np.zeros(scenarios)
+    for chunk, (revenue, sold) in _run_tasks(tasks, _pool_size(tasks, processes, scenarios, window)):
+        load = sold / np.array([f.seats for f in chunk])[:, None]
+        for f, flight_revenue, flight_load in zip(chunk, revenue, load):
+            report.append({
+                "id": f.id,
+                "days_until_departure": f.days_left,
+                "revenue": _summary(flight_revenue, 0),
+                "load_factor": _summary(flight_load, 3),
+                "sellout_probability": round(float((flight_load >= 1).mean()), 3),
+            })
+        total_revenue += revenue.sum(axis=0)
+        total_sold += sold.sum(axis=0)
+    seats = sum(f.seats for f in flights)
+
+    return {
+        "rules_version": rules.version,
+        "scenarios": scenarios,
+        "parameters": {"window": window, "demand": demand, "decay": decay, "elasticity": elasticity, "seed": seed},
+        "total": {
+            "flights": len(flights),
+            "revenue": _summary(total_revenue, 0),
+            "load_factor": _summary(total_sold / seats, 3) if seats else None,
+        },
+        "flights": report,
+    }
+
+
+def run(flight_ids=None, route=None, limit=None, candidate_rules=None, now=None, **options):
+    """Simulate the flights on sale (optionally only ``flight_ids`` / one ``route``) in the current app.
+
+    With ``candidate_rules`` (a rules file path) both the rules in force and
+    the candidate are simulated; returns ``{"current": ..., "candidate": ...}``.
+    """
+    now = now or datetime.now()
+    # Departed flights are filtered out before the limit, so it counts flights still on sale
+    query = Flight.query.filter(Flight.departs_at >= epoch_seconds(now)).order_by(Flight.departs_at, Flight.id)
+    if flight_ids:
+        query = query.filter(Flight.id.in_(flight_ids))
+    if route:
+        query = query.filter(Flight.route_key == route)
+    if limit:
+        query = query.limit(limit)
+    flights = sim_flights(query.all(), now)
+    result = {"current": simulate(flights, pricing_rules.current(), **options)}
+    if candidate_rules:
+        result["candidate"] = simulate(flights, pricing_rules.PricingRules.load(candidate_rules), **options)
+    return result
+
+
+def format_report(result, top=10):
+    lines = []
+    for label, report in result.items():
+        total = report["total"]
+        lines.append(f"{label}: rules {report['rules_version']}, {total['flights']:,} flights, "
+                     f"{report['scenarios']:,} scenarios")
+        if total["load_factor"] is None:
+            continue
+        revenue, load = total["revenue"], total["load_factor"]
+        lines.append(f"  revenue      mean {revenue['mean']:>14,.0f}   p5 {revenue['p5']:>14,.0f}   "
+                     f"p95 {revenue['p95']:>14,.0f}")
+        lines.append(f"  load factor  mean {load['mean']:>14.1%}   p5 {load['p5']:>14.1%}   p95 {load['p95']:>14.1%}")
+        for flight in sorted(report["flights"], key=lambda f: -f["revenue"]["mean"])[:top]:
+            lines.append(f"    {flight['id']:<10}{flight['revenue']['mean']:>12,.0f}"
+                         f"{flight['load_factor']['mean']:>9.1%}  sellout {flight['sellout_probability']:.0%}")
+    if "candidate" in result and result["current"]["flights"]:
+        current, candidate = result["current"]["total"]["revenue"], result["candidate"]["total"]["revenue"]
+        change = (candidate["mean"] - current["mean"]) / current["mean"] if current["mean"] else 0.0
+        lines.append(f"candidate vs current: mean revenue {candidate['mean'] - current['mean']:+,.0f} ({change:+.1%})")
+    return "\n".join(lines)
+
+
+@click.command("simulate-revenue")
+@click.option("--scenarios", default=DEFAULT_SCENARIOS, show_default=True, help="Simulated demand scenarios per flight.")
+@click.option("--processes", type=int, default=None, help="Worker processes for large runs (default: one per CPU).")
+@click.option("--flight", "flight_ids", multiple=True, help="Only this flight id (repeatable).")
+@click.option("--route", help="Only flights on this route, e.g. DEL-BOM.")
+@click.option("--limit", type=int, help="At most this many flights, earliest departures first.")
+@click.option("--rules", "candidate_rules", type=click.Path(exists=True, dir_okay=False),
+              help="Candidate pricing rules file to compare with the rules in force.")
+@click.option("--window", default=DEFAULT_WINDOW, show_default=True, help="Booking window in days.")
+@click.option("--demand", default=DEFAULT_DEMAND, show_default=True, help="Expected requests per seat over the window.")
+@click.option("--decay", default=DEFAULT_DECAY, show_default=True, help="Days over which demand builds up.")
+@click.option("--elasticity", default=DEFAULT_ELASTICITY, show_default=True, help="Price elasticity of demand.")
+@click.option("--seed", default=0, show_default=True)
+@click.option("--json", "json_path", help="Write the full report to this file as JSON.")
+def simulate_command(json_path, **options):
+    """Monte Carlo simulation of revenue and load factor under the pricing rules."""
+    try:
+        result = run(**options)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    click.echo(format_report(result))
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo revenue simulation")
+    parser.add_argument("--scenarios", type=int, default=DEFAULT_SCENARIOS)
+    parser.add_argument("--processes", type=int)
+    parser.add_argument("--flight", dest="flight_ids", action="append")
+    parser.add_argument("--route")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--rules", dest="candidate_rules")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW)
+    parser.add_argument("--demand", type=float, default=DEFAULT_DEMAND)
+    parser.add_argument("--decay", type=float, default=DEFAULT_DECAY)
+    parser.add_argument("--elasticity", type=float, default=DEFAULT_ELASTICITY)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path")
+    args = vars(parser.parse_args(argv))
+    json_path = args.pop("json_path")
+
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        result = run(**args)
+    print(format_report(result))
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Seat maps for the seats API.
+
+The availability of a flight is computed once per version of its booked
+seat list: one string per row with ``.`` for a free seat and ``x`` for a
+booked one, columns lettered from ``A``. The compact wire format sends
+exactly that plus the layout; the full format (one object per seat) is
+expanded from the same rows.
+"""
+
+import json
+from functools import lru_cache
+
+SEAT_LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+AVAILABLE = "."
+BOOKED = "x"
+FORMATS = ("full", "compact")
+
+
+@lru_cache(maxsize=4096)
+def availability_rows(rows, cols, booked_json):
+    """Per-row availability strings; cached by the flight's raw booked-seat JSON."""
+    booked = set(json.loads(booked_json)) if booked_json else set()
+    letters = SEAT_LETTERS[:cols]
+    return tuple("".join(BOOKED if f"{row}{letter}" in booked else AVAILABLE for letter in letters)
+                 for row in range(1, rows + 1))
+
+
+def seat_map(flight, format="full"):
+    """The ``seats`` object of the seats API for ``flight`` in ``format``."""
+    rows = availability_rows(flight.seat_rows, flight.seat_cols, flight.booked_seats)
+    total = flight.seat_rows * flight.seat_cols
+    booked_count = sum(row.count(BOOKED) for row in rows)
+    seats = {
+        "total": total,
+        "booked": booked_count,
+        "available": total - booked_count,
+        "occupancy_rate": round(booked_count / total, 2) if total > 0 else 0.0,
+    }
+
+    if format == "compact":
+        seats["layout"] = {"rows": flight.seat_rows, "cols": flight.seat_cols,
+                           "columns": SEAT_LETTERS[:flight.seat_cols]}
+        seats["rows"] = list(rows)
+        return seats
+
+    seats["booked_seats"] = flight.get_booked_seats()
+    seats["seat_map"] = [
+        {"seat": f"{row}{letter}", "row": row, "column": letter, "available": state == AVAILABLE}
+        for row, states in enumerate(rows, start=1)
+        for letter, state in zip(SEAT_LETTERS, states)
+    ]
+    return seats
@@ -1,3 +1,6 @@
 #!/bin/bash
-python migrate_json_to_db.py
-gunicorn app:app
\ No newline at end of file
+set -e
+# Create and seed the database once, before any worker starts
+flask --app app bootstrap
+# Workers warm their caches before accepting connections (gunicorn.conf.py)
+gunicorn -c gunicorn.conf.py app:app
@@ -857,3 +857,254 @@ document.addEventListener('DOMContentLoaded', () => {
     }
   }
 });
+
+// ------------------ Airport autocomplete ------------------
+// Adds a "city or code" box in front of each airport <select>; suggestions
+// come from /api/airports/suggest and picking one selects that airport.
+// Destination lists are narrowed to airports reachable from the origin.
+document.addEventListener('DOMContentLoaded', () => {
+  const selects = document.querySelectorAll('select[data-airport-suggest]');
+  if (!selects.length) return;
+
+  function fetchSuggestions(q, origin, limit) {
+    const params = new URLSearchParams({ q, limit: String(limit || 8) });
+    if (origin) params.set('origin', origin);
+    return fetch(`/api/airports/suggest?${params}`)
+      .then(res => res.json())
+      .then(data => (data.success ? data.suggestions : []))
+      .catch(() => []);
+  }
+
+  function originOf(select) {
+    const field = select.dataset.originField;
+    const origin = field && select.form ? select.form.elements[field] : null;
+    return origin ? origin.value : '';
+  }
+
+  selects.forEach((select, i) => {
+    const list = document.createElement('datalist');
+    list.id = `airport-suggestions-${i}`;
+    const input = document.createElement('input');
+    input.type = 'search';
+    input.className = 'airport-suggest';
+    input.placeholder = 'City or code';
+    input.autocomplete = 'off';
+    input.setAttribute('list', list.id);
+    select.before(input, list);
+
+    let timer = null;
+    input.addEventListener('input', () => {
+      const code = input.value.trim().toUpperCase();
+      if (Array.from(select.options).some(o => o.value === code && code)) {
+        select.value = code;
+        select.dispatchEvent(new Event('change'));
+        return;
+      }
+      clearTimeout(timer);
+      timer = setTimeout(() => {
+        fetchSuggestions(input.value, originOf(select)).then(suggestions => {
+          list.innerHTML = '';
+          suggestions.forEach(s => {
+            const option = document.createElement('option');
+            option.value = s.code;
+            option.label = `${s.label} – ${s.name}`;
+            list.appendChild(option);
+          });
+        });
+      }, 150);
+    });
+  });
+
+  // Hide destinations with no flight from the chosen origin
+  selects.forEach(select => {
+    const field = select.dataset.originField;
+    const origin = field && select.form ? select.form.elements[field] : null;
+    if (!origin) return;
+    const narrow = () => {
+      if (!origin.value) {
+        Array.from(select.options).forEach(o => { o.hidden = false; });
+        return;
+      }
+      fetchSuggestions('', origin.value, 50).then(suggestions => {
+        const reachable = new Set(suggestions.map(s => s.code));
+        Array.from(select.options).forEach(o => {
+          o.hidden = Boolean(o.value) && !reachable.has(o.value) && o.value !== select.value;
+        });
+      });
+    };
+    origin.addEventListener('change', narrow);
+    narrow();
+  });
+});
+
+// ------------------ Seat map refresh ------------------
+// Decodes the compact seat-map format of /api/flights/<id>/seats?format=compact:
+// layout plus one string per row, "." free and "x" booked.
+const SeatMap = {
+  decode(seats) {
+    const { rows, cols, columns } = seats.layout;
+    const booked = [];
+    seats.rows.forEach((states, i) => {
+      for (let c = 0; c < states.length; c++) {
+        if (states[c] === 'x') booked.push(`${i + 1}${columns[c]}`);
+      }
+    });
+    return { rows, cols, booked };
+  },
+
+  fetch(flightId) {
+    return fetch(`/api/flights/${encodeURIComponent(flightId)}/seats?format=compact`)
+      .then(res => res.json())
+      .then(data => (data.success ? SeatMap.decode(data.seats) : null));
+  }
+};
+
+// Mark seats booked by other passengers while this page is open
+document.addEventListener('DOMContentLoaded', () => {
+  const grid = document.getElementById('seat-grid');
+  if (!grid || !grid.dataset.fid || !window.__SEAT_SETUP__) return;
+
+  const refresh = () => SeatMap.fetch(grid.dataset.fid).then(map => {
+    if (!map) return;
+    map.booked.forEach(seat => {
+      grid.querySelectorAll(`.seat[data-seat="${seat}"]`).forEach(el => {
+        if (el.classList.contains('booked')) return;
+        if (el.classList.contains('selected')) el.click();  // let the builder drop it from the selection
+        el.classList.add('booked');
+        el.title = 'Just booked';
+      });
+    });
+  }).catch(() => {});
+
+  setInterval(refresh, 30000);
+});
+
+// ------------------ Load more ------------------
+// "Load more" links point at the next keyset page of the home page or a
+// search. With partial=1 the page answers {html, next_url}; the cards are
+// appended (merged into their day when results are grouped by date) and the
+// next page is fetched as soon as the link scrolls into view.
+document.addEventListener('DOMContentLoaded', () => {
+  const link = document.querySelector('[data-load-more]');
+  const results = document.querySelector('[data-flight-results]');
+  if (!link || !results) return;
+  let loading = false;
+  let observer = null;
+
+  const append = html => {
+    const template = document.createElement('template');
+    template.innerHTML = html;
+    Array.from(template.content.children).forEach(node => {
+      const day = node.dataset.day;
+      const target = day
+        ? results.querySelector(`[data-day="${day}"] .grid`)
+        : results.querySelector(':scope > .grid:last-child');
+      const grid = node.classList.contains('grid') ? node : node.querySelector('.grid');
+      if (target && grid) target.append(...grid.children);
+      else results.appendChild(node);
+    });
+  };
+
+  const loadMore = () => {
+    if (loading || !link.isConnected) return;
+    loading = true;
+    const url = new URL(link.href, window.location.href);
+    url.searchParams.set('partial', '1');
+    fetch(url)
+      .then(r => r.json())
+      .then(data => {
+        if (!data.success) throw new Error(data.error);
+        append(data.html);
+        if (data.next_url) link.href = data.next_url;
+        else link.closest('.load-more').remove();
+      })
+      .catch(() => { window.location.href = link.href; })
+      .finally(() => {
+        loading = false;
+        // Re-arm the observer: fires again right away if the link is still in view
+        if (observer && link.isConnected) { observer.unobserve(link); observer.observe(link); }
+      });
+  };
+
+  link.addEventListener('click', event => {
+    event.preventDefault();
+    loadMore();
+  });
+  if ('IntersectionObserver' in window) {
+    observer = new IntersectionObserver(entries => {
+      if (entries.some(entry => entry.isIntersecting)) loadMore();
+    }, { rootMargin: '400px' });
+    observer.observe(link);
+  }
+});
+
+// ------------------ Price curve what-if (admin) ------------------
+// Heatmap of /api/pricing/curve/<id>: occupancy on the vertical axis (0% at
+// the bottom), days to departure on the horizontal axis (departure day at
+// the right), cheap prices blue and expensive ones red.
+document.addEventListener('DOMContentLoaded', () => {
+  const canvas = document.getElementById('priceCurveCanvas');
+  const flightSelect = document.getElementById('priceCurveFlight');
+  const daysSelect = document.getElementById('priceCurveDays');
+  const readout = document.getElementById('priceCurveReadout');
+  if (!canvas || !flightSelect || !daysSelect) return;
+  const ctx = canvas.getContext('2d');
+  let curve = null;
+
+  const cell = (data) => ({
+    w: canvas.width / data.days.length,
+    h: canvas.height / data.occupancy.length,
+  });
+  // Days run right to left so the departure day is at the right edge
+  const column = (data, dayIndex) => data.days.length - 1 - dayIndex;
+
+  const draw = (data) => {
+    const flat = data.prices.flat();
+    const min = Math.min(...flat);
+    const span = Math.max(...flat) - min || 1;
+    const { w, h } = cell(data);
+    data.prices.forEach((row, i) => {
+      row.forEach((price, j) => {
+        const hue = 220 - 220 * (price - min) / span;
+        ctx.fillStyle = `hsl(${hue}, 75%, 50%)`;
+        ctx.fillRect(column(data, j) * w, canvas.height - (i + 1) * h, Math.ceil(w), Math.ceil(h));
+      });
+    });
+    const { occupancy_rate: rate, days_until_departure: days } = data.current;
+    if (days < data.days.length) {
+      ctx.fillStyle = '#fff';
+      ctx.beginPath();
+      ctx.arc((column(data, days) + 0.5) * w, canvas.height - (rate * (data.occupancy.length - 1) + 0.5) * h, 5, 0, 2 * Math.PI);
+      ctx.fill();
+    }
+  };
+
+  const load = () => {
+    const params = new URLSearchParams({ occupancy_steps: 21, max_days: daysSelect.value });
+    fetch(`/api/pricing/curve/${encodeURIComponent(flightSelect.value)}?${params}`)
+      .then(r => r.json())
+      .then(data => {
+        if (!data.success) throw new Error(data.error);
+        curve = data;
+        draw(data);
+      })
+      .catch(error => { readout.textContent = `Could not load price curve: ${error.message}`; });
+  };
+
+  canvas.addEventListener('mousemove', event => {
+    if (!curve) return;
+    const rect = canvas.getBoundingClientRect();
+    const { w, h } = cell(curve);
+    const x = (event.clientX - rect.left) * canvas.width / rect.width;
+    const y = (event.clientY - rect.top) * canvas.height / rect.height;
+    const j = curve.days.length - 1 - Math.floor(x / w);
+    const i = curve.occupancy.length - 1 - Math.floor(y / h);
+    if (i < 0 || j < 0 || i >= curve.occupancy.length || j >= curve.days.length) return;
+    readout.textContent = `${Math.round(curve.occupancy[i] * 100)}% booked, ${curve.days[j]} days out: ` +
+      `₹${curve.prices[i][j].toLocaleString()} (base ₹${curve.base_price.toLocaleString()})`;
+  });
+
+  flightSelect.addEventListener('change', load);
+  daysSelect.addEventListener('change', load);
+  if (flightSelect.value) load();
+});
@@ -0,0 +1,133 @@
+"""
+Named SQLite storage profiles and read-only connection routing.
+
+A profile is a set of PRAGMAs applied to every new connection. ``compat``
+leaves SQLite at its defaults (rollback journal, synchronous=FULL), which
+is what the app always used. The WAL profiles additionally open a second,
+read-only pool (the ``readonly`` bind) that serves GET/HEAD requests, so
+searches never queue behind the writer and the writer never waits on
+readers.
+
+Selected with ``FRS_STORAGE_PROFILE``; the database location comes from
+``FRS_DATABASE_URL`` (defaults to ``sqlite:///database.db``).
+"""
+
+import os
+
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+DEFAULT_DATABASE_URL = "sqlite:///database.db"
+READONLY_BIND = "readonly"
+
+PROFILES = {
+    "compat": {
+        "pragmas": {},
+        "read_pool": False,
+    },
+    "durable": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "FULL",
+            "busy_timeout": 10000,
+            "cache_size": -16000,      # KiB (negative = size, not pages)
+            "mmap_size": 0,
+        },
+        "read_pool": True,
+    },
+    "high-throughput": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",   # fsync on checkpoint, not on every commit
+            "busy_timeout": 5000,
+            "cache_size": -65536,
+            "mmap_size": 268435456,
+            "temp_store": "MEMORY",
+        },
+        "read_pool": True,
+    },
+}
+
+# PRAGMAs that change the database file and so cannot run on a read-only connection
+_WRITE_PRAGMAS = {"journal_mode"}
+
+
+class RoutingSession(Session):
+    """Session that sends reads made while serving GET/HEAD to the read-only pool.
+
+    Flushes always go to the primary engine, so a read-only request that
+    still ends up writing is not broken, only routed less efficiently.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context() and g.get("db_read_only"):
+            engine = self._db.engines.get(READONLY_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def get_profile(name):
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown storage profile {name!r}; choose one of {', '.join(PROFILES)}")
+
+
+def _readonly_url(url):
+    """Turn ``sqlite:///path`` into the URI form SQLite opens with ``mode=ro``."""
+    url = make_url(url)
+    return url.set(database=f"file:{url.database}").update_query_dict({"mode": "ro", "uri": "true"})
+
+
+def configure_database(app, profile=None):
+    """Fill in database config for ``profile``. Call before ``db.init_app(app)``."""
+    app.config.setdefault("SQLALCHEMY_DATABASE_URI", os.environ.get("FRS_DATABASE_URL", DEFAULT_DATABASE_URL))
+    app.config.setdefault("SQLALCHEMY_TRACK_MODIFICATIONS", False)
+    app.config["STORAGE_PROFILE"] = profile or app.config.get("STORAGE_PROFILE") \
+        or os.environ.get("FRS_STORAGE_PROFILE", "compat")
+    settings = get_profile(app.config["STORAGE_PROFILE"])
+
+    url = make_url(app.config["SQLALCHEMY_DATABASE_URI"])
+    is_file_sqlite = url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+    if settings["read_pool"] and is_file_sqlite:
+        binds = app.config.setdefault("SQLALCHEMY_BINDS", {})
+        binds.setdefault(READONLY_BIND, {
+            "url": _readonly_url(url),
+            "pool_size": int(os.environ.get("FRS_READ_POOL_SIZE", 10)),
+            "max_overflow": 20,
+        })
+
+
+def _pragma_listener(pragmas, read_only):
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            if read_only and name in _WRITE_PRAGMAS:
+                continue
+            cursor.execute(f"PRAGMA {name}={value}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+    return set_pragmas
+
+
+def install_storage_profile(app, db):
+    """Attach the profile's PRAGMAs and read routing. Call after ``db.init_app(app)``."""
+    settings = get_profile(app.config["STORAGE_PROFILE"])
+
+    # Engines are created by db.init_app but connect lazily; the persistent
+    # journal_mode switch happens on the primary's first connection, which
+    # the bootstrap command makes before any worker serves a read.
+    with app.app_context():
+        for key, engine in db.engines.items():
+            if engine.dialect.name != "sqlite":
+                continue
+            event.listen(engine, "connect", _pragma_listener(settings["pragmas"], key == READONLY_BIND))
+
+    if READONLY_BIND in app.config.get("SQLALCHEMY_BINDS", {}):
+        @app.before_request
+        def route_reads_to_readonly_pool():
+            g.db_read_only = request.method in ("GET", "HEAD")
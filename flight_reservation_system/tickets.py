@@ -0,0 +1,45 @@
+"""
+PDF e-ticket rendering.
+
+reportlab, qrcode and Pillow add noticeably to process start-up, and only
+the ticket download route needs them, so app.py imports this module
+lazily inside that route.
+"""
+
+from io import BytesIO
+
+import qrcode
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+
+
+def render_ticket_pdf(booking, flight_data):
+    """Return a BytesIO holding the e-ticket PDF for ``booking``."""
+    # generate QR (PNG in memory)
+    qr_img = qrcode.make(booking.pnr)
+    qr_io = BytesIO()
+    qr_img.save(qr_io, format="PNG")
+    qr_io.seek(0)
+
+    # create PDF
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    w, h = A4
+    c.setFont("Helvetica-Bold", 20)
+    c.drawString(40, h - 80, "FlightCraft Studio ✈️ — E-Ticket")
+    c.setFont("Helvetica", 12)
+    c.drawString(40, h - 120, f"PNR: {booking.pnr}")
+    c.drawString(40, h - 140, f"Passenger: {booking.fullname}")
+    c.drawString(40, h - 160, f"Phone: {booking.phone}")
+    c.drawString(40, h - 180, f"Flight: {flight_data.get('airline','')} ({flight_data.get('id','')})")
+    c.drawString(40, h - 200, f"Route: {flight_data.get('origin','')} → {flight_data.get('destination','')}")
+    c.drawString(40, h - 220, f"Date/Time: {flight_data.get('date','')} {flight_data.get('dep_time','')}-{flight_data.get('arr_time','')}")
+    c.drawString(40, h - 240, f"Seats: {', '.join(booking.get_seats())}")
+    # place QR
+    img = ImageReader(qr_io)
+    c.drawImage(img, w - 180, h - 260, width=120, height=120)
+    c.showPage()
+    c.save()
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,173 @@
+"""
+Single-writer group commit for booking mutations.
+
+SQLite allows one writer at a time and every commit pays for an fsync, so
+under load request threads pile up on the write lock and fail with
+"database is locked". When the queue is enabled, request threads hand
+their mutation to one writer thread per process and block on a future.
+The writer drains up to ``WRITE_QUEUE_MAX_BATCH`` jobs, runs each inside
+its own SAVEPOINT (a failing job only rolls back itself) and commits the
+whole batch at once, so N bookings cost one fsync instead of N.
+
+When the queue is disabled (the default) ``submit`` runs the mutation
+inline in the request session and commits immediately, exactly like the
+routes used to do.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from flask import current_app
+from sqlalchemy import text
+
+from models import db
+
+
+class _Job:
+    __slots__ = ("fn", "args", "kwargs", "future")
+
+    def __init__(self, fn, args, kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+
+
+class _Writer:
+    """Queue, writer thread and counters for one application."""
+
+    def __init__(self, app):
+        self.app = app
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.batches_committed = 0
+        self.jobs_committed = 0
+
+    def ensure_running(self):
+        # Started lazily so that forking servers (gunicorn --preload) get one
+        # writer per worker process rather than a dead thread copied at fork.
+        if self.thread is not None and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="frs-write-queue", daemon=True)
+                self.thread.start()
+
+    def _collect_batch(self):
+        batch = [self.queue.get()]
+        max_batch = self.app.config["WRITE_QUEUE_MAX_BATCH"]
+        deadline = time.monotonic() + self.app.config["WRITE_QUEUE_MAX_WAIT_MS"] / 1000.0
+        while len(batch) < max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self.queue.get(timeout=remaining))
+                else:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        with self.app.app_context():
+            while True:
+                batch = self._collect_batch()
+                try:
+                    self._commit_batch(batch)
+                finally:
+                    db.session.close()
+
+    def _commit_batch(self, batch):
+        outcomes = []
+        try:
+            if db.engine.dialect.name == "sqlite":
+                # pysqlite only opens a transaction before DML, which would let
+                # the first SAVEPOINT start (and its RELEASE commit) the whole
+                # batch. Open it explicitly and take the write lock up front.
+                db.session.execute(text("BEGIN IMMEDIATE"))
+
+            for job in batch:
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    with db.session.begin_nested():
+                        result = job.fn(*job.args, **job.kwargs)
+                except Exception as exc:
+                    outcomes.append((job, None, exc))
+                else:
+                    outcomes.append((job, result, None))
+
+            db.session.commit()
+        except Exception as exc:
+            db.session.rollback()
+            for job in batch:
+                if not job.future.done():
+                    job.future.set_exception(exc)
+            return
+
+        self.batches_committed += 1
+        self.jobs_committed += sum(1 for _, _, error in outcomes if error is None)
+        for job, result, error in outcomes:
+            if error is not None:
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(result)
+
+
+class WriteQueue:
+    """Flask extension that serialises writes through a group-commit thread."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("WRITE_QUEUE_ENABLED",
+                              os.environ.get("FRS_WRITE_QUEUE", "0").lower() in ("1", "true", "yes"))
+        app.config.setdefault("WRITE_QUEUE_MAX_BATCH", int(os.environ.get("FRS_WRITE_QUEUE_BATCH", 64)))
+        app.config.setdefault("WRITE_QUEUE_MAX_WAIT_MS", float(os.environ.get("FRS_WRITE_QUEUE_WAIT_MS", 2)))
+        app.config.setdefault("WRITE_QUEUE_TIMEOUT", 30)
+        app.extensions["write_queue"] = _Writer(app)
+
+    def writer(self, app=None):
+        """Return the per-app writer (exposes ``batches_committed``/``jobs_committed``)."""
+        return (app or current_app).extensions["write_queue"]
+
+    def submit(self, fn, *args, **kwargs):
+        """Run ``fn(*args, **kwargs)`` in a committed transaction and return its result.
+
+        Exceptions raised by ``fn`` are re-raised in the caller after the
+        job's changes have been rolled back.
+        """
+        writer = self.writer()
+        if not writer.app.config["WRITE_QUEUE_ENABLED"]:
+            try:
+                result = fn(*args, **kwargs)
+                db.session.commit()
+                return result
+            except Exception:
+                db.session.rollback()
+                raise
+
+        # Hand the request's pooled connection back before blocking, otherwise
+        # enough waiting callers starve the writer of a connection.
+        db.session.close()
+
+        writer.ensure_running()
+        job = _Job(fn, args, kwargs)
+        writer.queue.put(job)
+        try:
+            return job.future.result(timeout=writer.app.config["WRITE_QUEUE_TIMEOUT"])
+        except FutureTimeout:
+            # Drop the job if the writer has not picked it up yet; once it runs,
+            # its outcome is the caller's (a booking may already be committed)
+            if job.future.cancel():
+                raise
+            return job.future.result()
+
+
+write_queue = WriteQueue()
@@ -143,6 +143,26 @@ def api_headers():
         "Accept": "application/json"
     }
 
+# ==================== In-process Application Fixtures ====================
+
+@pytest.fixture
+def test_app(tmp_path):
+    """Application on a throwaway, seeded SQLite file (no server needed)"""
+    from app import create_app
+    from bootstrap import bootstrap_database
+    from models import db
+
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'test.db'}", "TESTING": True})
+    bootstrap_database(app)
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+@pytest.fixture
+def client(test_app):
+    """Flask test client for the in-process application"""
+    return test_app.test_client()
+
 # ==================== Utility Functions ====================
 
 def wait_for_element(page, selector, timeout=10000):
@@ -0,0 +1,89 @@
+"""
+Amenity Dictionary Tests (in-process)
+"""
+
+import json
+from itertools import combinations
+
+import pytest
+from sqlalchemy import text
+
+from amenities import AmenityTable, amenity_key
+from models import db, Flight, amenity_filter
+
+ROWS = [(0, "WiFi"), (1, "Meals"), (2, "Wi-Fi"), (3, "Cabin Bag"), (5, "Extra Legroom")]
+
+
+def test_amenity_key():
+    assert amenity_key("Wi-Fi") == amenity_key("wifi") == "wifi"
+    assert amenity_key("Meals") == amenity_key("meal") == "meal"
+    assert amenity_key("s") == "s"
+
+
+@pytest.mark.parametrize("term", ["meal", "Meals", "MEAL"])
+def test_plurals_match_both_ways(term):
+    """A singular term finds a plural name and the other way round"""
+    table = AmenityTable(ROWS)
+    assert table.filter_masks([term]) == [1 << 1]
+    assert AmenityTable([(0, "Meal")]).filter_masks([term]) == [1]
+
+
+def test_filter_masks_cover_spellings():
+    table = AmenityTable(ROWS)
+    assert table.filter_masks(["wifi", "cabin bags"]) == [1 << 0 | 1 << 2, 1 << 3]
+    with pytest.raises(ValueError):
+        table.filter_masks(["lounge"])
+
+
+def test_mask_round_trip():
+    """Every combination of names comes back from its mask in dictionary order"""
+    table = AmenityTable(ROWS)
+    names = [name for _, name in ROWS]
+    for size in range(len(names) + 1):
+        for combo in combinations(names, size):
+            mask = table.mask_of(combo)
+            assert table.covers(mask)
+            assert table.names_for(mask) == [name for name in names if name in combo]
+    assert not table.covers(1 << 4)
+
+
+def test_amenity_filter_query(test_app):
+    """The SQL condition requires every term, each matched in any spelling"""
+    with test_app.app_context():
+        def matching(*terms):
+            return {f.id for f in Flight.query.filter(amenity_filter(list(terms)))}
+
+        assert matching("wifi", "meals") == {"AI202", "AI301", "121212aabc"}
+        assert matching("cabin bag") == {"SG404", "QP555", "AI202", "SG909", "AI301", "6E450"}
+        assert matching("2 cabin bag") == {"UK887"}
+        with pytest.raises(ValueError):
+            amenity_filter(["lounge"])
+
+
+@pytest.mark.api
+def test_amenities_api_filter(client):
+    response = client.get("/api/flights?amenities=meal,wifi&fields=id")
+
+    assert response.status_code == 200
+    assert {f["id"] for f in response.get_json()["flights"]} == {"AI202", "AI301", "121212aabc"}
+
+
+def test_migrate_amenity_masks(test_app):
+    """A database with the JSON amenities column gets the bitmask column filled from it"""
+    from bootstrap import _migrate_amenity_masks
+
+    with test_app.app_context():
+        expected = {f.id: f.to_dict()["amenities"] for f in Flight.query.all()}
+        with db.engine.begin() as conn:
+            conn.execute(text("ALTER TABLE flights ADD COLUMN amenities TEXT"))
+            for fid, names in expected.items():
+                conn.execute(text("UPDATE flights SET amenities = :a WHERE id = :fid"),
+                             {"a": json.dumps(names), "fid": fid})
+            conn.execute(text("ALTER TABLE flights DROP COLUMN amenity_mask"))
+        db.session.remove()
+
+        _migrate_amenity_masks()
+
+        db.session.remove()
+        assert {f.id: f.to_dict()["amenities"] for f in Flight.query.all()} == expected
+        assert Flight.query.filter(amenity_filter(["wifi"])).count() == 3
@@ -199,4 +199,33 @@ def test_api_content_type(api_client):
     response = api_client.get(f"{BASE_URL}/api/flights")
     
     assert response.status_code == 200
-    assert "application/json" in response.headers.get("Content-Type", "")
\ No newline at end of file
+    assert "application/json" in response.headers.get("Content-Type", "")
+
+@pytest.mark.api
+@pytest.mark.booking
+def test_api_concurrent_booking_creation(api_client, api_headers, sample_passenger):
+    """Test concurrent bookings for different seats all succeed without lock errors"""
+    from concurrent.futures import ThreadPoolExecutor
+    import requests
+
+    seats_flight = api_client.get(f"{BASE_URL}/api/flights", headers=api_headers).json()["flights"][0]
+    seats_response = api_client.get(f"{BASE_URL}/api/flights/{seats_flight['id']}/seats", headers=api_headers)
+    free_seats = [s["seat"] for s in seats_response.json()["seats"]["seat_map"] if s["available"]][:6]
+    if len(free_seats) < 2:
+        pytest.skip("Not enough free seats for concurrency test")
+
+    def book(seat):
+        return requests.post(f"{BASE_URL}/api/bookings", headers=api_headers, json={
+            "flight_id": seats_flight["id"],
+            "fullname": sample_passenger["name"],
+            "email": sample_passenger["email"],
+            "phone": sample_passenger["phone"],
+            "seats": [seat]
+        })
+
+    with ThreadPoolExecutor(max_workers=len(free_seats)) as pool:
+        responses = list(pool.map(book, free_seats))
+
+    for response in responses:
+        assert response.status_code == 201, response.text
+        assert response.json()["booking"]["pnr"]
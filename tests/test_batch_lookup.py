@@ -0,0 +1,71 @@
+"""
+Batch Flight Lookup Tests (in-process)
+"""
+
+import pytest
+
+TOO_MANY_IDS = ",".join(f"X{i}" for i in range(101))
+
+
+@pytest.mark.api
+def test_flights_by_ids(client):
+    response = client.get("/api/flights?ids=AI101,NOPE,6E212,AI101&sort_by=date")
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [f["id"] for f in data["flights"]] == ["AI101", "6E212"]
+    assert data["meta"]["missing_ids"] == ["NOPE"]
+
+
+@pytest.mark.api
+@pytest.mark.parametrize("filters, returned, missing", [
+    ("origin=DEL", ["AI101", "AI202"], ["SG404"]),
+    ("amenities=wifi", ["AI202"], ["AI101", "SG404"]),
+    ("airline=indigo", [], ["AI101", "AI202", "SG404"]),
+])
+def test_ids_combine_with_filters(client, filters, returned, missing):
+    """ids narrow the other filters; ids they exclude are reported missing"""
+    response = client.get(f"/api/flights?ids=AI101,AI202,SG404&{filters}&sort_by=date&fields=id")
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [f["id"] for f in data["flights"]] == returned
+    assert data["meta"]["missing_ids"] == missing
+
+
+@pytest.mark.api
+def test_empty_ids_means_no_id_filter(client):
+    everything = client.get("/api/flights?fields=id").get_json()["flights"]
+
+    assert client.get("/api/flights?ids=,,&fields=id").get_json()["flights"] == everything
+
+
+@pytest.mark.api
+@pytest.mark.parametrize("path", ["/api/flights", "/api/flights/seats"])
+def test_too_many_ids(client, path):
+    response = client.get(f"{path}?ids={TOO_MANY_IDS}")
+
+    assert response.status_code == 400
+    assert "At most 100 ids" in response.get_json()["error"]
+
+
+@pytest.mark.api
+def test_seats_by_ids(client):
+    response = client.get("/api/flights/seats?ids=6E212,NOPE,AI101&format=compact")
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert list(data["seat_maps"]) == ["6E212", "AI101"]
+    assert data["missing_ids"] == ["NOPE"]
+    assert data["meta"] == {**data["meta"], "requested": 3, "found": 2}
+    single = client.get("/api/flights/AI101/seats?format=compact").get_json()["seats"]
+    assert data["seat_maps"]["AI101"] == single
+
+
+@pytest.mark.api
+@pytest.mark.parametrize("query", ["", "ids=", "ids=AI101&format=grid"])
+def test_seats_by_ids_invalid(client, query):
+    response = client.get(f"/api/flights/seats?{query}")
+
+    assert response.status_code == 400
+    assert response.get_json()["success"] is False
@@ -0,0 +1,94 @@
+"""
+Bulk Import Tests (in-process)
+"""
+
+import io
+import json
+import types
+
+import pytest
+
+import bulk_import
+from bulk_import import import_file, iter_csv, iter_json_array, iter_ndjson
+
+RECORDS = [{"id": f"BI{i}", "airline": "Bulk Air", "origin": "DEL", "destination": "BOM", "date": "2030-02-01",
+            "dep_time": "10:00", "arr_time": "12:00", "price": 3000 + i, "amenities": ["wifi"],
+            "note": "escaped \"quote\" \\ and , comma ]"} for i in range(40)]
+
+
+@pytest.fixture
+def json_file(tmp_path):
+    path = tmp_path / "flights.json"
+    path.write_text(json.dumps(RECORDS, indent=1))
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+def test_json_array_across_chunk_boundaries(json_file, chunk_size):
+    """Records split anywhere by a chunk decode the same as json.load"""
+    records = list(iter_json_array(json_file, chunk_size=chunk_size))
+
+    assert [r for r, _ in records] == RECORDS
+    assert [i for _, i in records] == list(range(1, len(RECORDS) + 1))
+
+
+def test_json_array_in_wrapper_object(tmp_path):
+    path = tmp_path / "wrapped.json"
+    path.write_text(json.dumps({"flights": [1, 2.5, "three", None, True, []]}))
+
+    assert [r for r, _ in iter_json_array(str(path), chunk_size=3)] == [1, 2.5, "three", None, True, []]
+
+
+def test_json_array_resume(json_file):
+    """``start`` skips the records a previous run imported"""
+    assert [r["id"] for r, _ in iter_json_array(json_file, start=38, chunk_size=64)] == ["BI38", "BI39"]
+
+
+def test_json_array_malformed_record_fails_fast(tmp_path, monkeypatch):
+    """A broken record raises once enough of it is buffered instead of reading to EOF"""
+    path = tmp_path / "broken.json"
+    path.write_text('[{"id": "ok"}, {"id": oops}, ' + ", ".join(json.dumps(r) for r in RECORDS * 50) + "]")
+    reads = []
+
+    class CountingFile(io.TextIOWrapper):
+        def read(self, size=-1):
+            reads.append(size)
+            return super().read(size)
+
+    def counting_open(file, mode="r", encoding=None):
+        return CountingFile(open(file, "rb"), encoding=encoding)
+    monkeypatch.setattr(bulk_import, "io", types.SimpleNamespace(open=counting_open))
+
+    records = iter_json_array(str(path), chunk_size=64)
+    assert next(records)[0] == {"id": "ok"}
+    with pytest.raises(json.JSONDecodeError):
+        next(records)
+    assert len(reads) <= 3
+
+
+def test_ndjson_and_csv_positions(tmp_path):
+    """Line formats report byte offsets that resume right after a record"""
+    ndjson = tmp_path / "flights.ndjson"
+    ndjson.write_text("".join(json.dumps(r) + "\n" for r in RECORDS[:3]) + "\n")
+    rows = list(iter_ndjson(str(ndjson)))
+    assert [r["id"] for r, _ in rows] == ["BI0", "BI1", "BI2"]
+    assert [r["id"] for r, _ in iter_ndjson(str(ndjson), rows[0][1])] == ["BI1", "BI2"]
+
+    csv_path = tmp_path / "flights.csv"
+    csv_path.write_text("id,price\nC1,100\nC2,200\n")
+    rows = list(iter_csv(str(csv_path)))
+    assert [r for r, _ in rows] == [{"id": "C1", "price": "100"}, {"id": "C2", "price": "200"}]
+    assert [r["id"] for r, _ in iter_csv(str(csv_path), rows[0][1])] == ["C2"]
+
+
+def test_import_file(test_app, json_file):
+    """A JSON import upserts every record and removes its checkpoint"""
+    with test_app.app_context():
+        from models import Flight, db
+
+        assert import_file("flights", json_file, batch_size=16, progress=False) == len(RECORDS)
+        flight = db.session.get(Flight, "BI5")
+        assert flight.price == 3005
+        assert flight.route_key == "DEL-BOM"
+
+    assert not (bulk_import.os.path.exists(bulk_import.checkpoint_path(json_file)))
@@ -0,0 +1,46 @@
+"""
+Fare Calendar Tests (in-process)
+"""
+
+import pytest
+
+
+@pytest.mark.api
+def test_fare_calendar_month(client):
+    """Cheapest fare per day for a route with two flights in the month"""
+    response = client.get("/api/fares/calendar?origin=DEL&destination=BOM&month=2025-09")
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["success"] is True
+    assert len(data["days"]) == 30
+    by_date = {d["date"]: d for d in data["days"]}
+    assert by_date["2025-09-08"]["flights"] == 1
+    assert by_date["2025-09-08"]["cheapest_flight"]["flight_id"] == "AI101"
+    assert by_date["2025-09-17"]["cheapest_flight"]["flight_id"] == "AI202"
+    assert by_date["2025-09-01"]["min_price"] is None
+    assert data["cheapest_date"] in ("2025-09-08", "2025-09-17")
+    assert data["cheapest_price"] == min(by_date["2025-09-08"]["min_price"], by_date["2025-09-17"]["min_price"])
+
+
+@pytest.mark.api
+def test_fare_calendar_empty_route(client):
+    """A route without flights has a calendar with no fares"""
+    response = client.get("/api/fares/calendar?origin=XXX&destination=YYY&month=2025-02")
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert len(data["days"]) == 28
+    assert data["cheapest_date"] is None
+    assert all(d["min_price"] is None for d in data["days"])
+
+
+@pytest.mark.api
+@pytest.mark.parametrize("query", ["origin=DEL&month=2025-09", "origin=DEL&destination=BOM&month=2025-13",
+                                   "origin=DEL&destination=BOM"])
+def test_fare_calendar_invalid_input(client, query):
+    """Missing route or malformed month is a 400"""
+    response = client.get(f"/api/fares/calendar?{query}")
+
+    assert response.status_code == 400
+    assert response.get_json()["success"] is False
@@ -0,0 +1,27 @@
+"""
+Fast JSON Provider Tests (in-process)
+"""
+
+import json
+
+import pytest
+
+from fast_json import raw_json
+
+
+def test_raw_fragments_are_spliced(test_app):
+    data = {"a": raw_json(b'[1,{"b":2}]'), "c": [raw_json(b'"x"'), "\x00RAW0\x00"]}
+
+    assert json.loads(test_app.json.dumps(data)) == {"a": [1, {"b": 2}], "c": ["x", "\x00RAW0\x00"]}
+
+
+@pytest.mark.api
+@pytest.mark.parametrize("airline", ["%00RAW0%00", "%00RAW9%00", "%00RAW0000000000000000:0%00"])
+def test_placeholder_like_input_is_not_spliced(client, airline):
+    """A filter value echoed in the response stays a plain string next to the spliced flights"""
+    response = client.get(f"/api/flights?airline={airline}")
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["flights"] == []
+    assert data["meta"]["filters_applied"]["airline"].startswith("\x00RAW")
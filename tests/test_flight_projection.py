@@ -0,0 +1,141 @@
+"""
+Flight Field Projection Tests (in-process)
+"""
+
+import json
+
+import pytest
+
+import projection
+from fast_json import encode
+from projection import FLIGHT_VIEWS, CatalogRow, encoded_flights, parse_fields, project
+
+# Filters that load flights outside the catalogue cache, built with only the requested fields
+PARTIAL_FILTERS = ["", "date=2025-09-08", "amenities=wifi", "ids=AI101,6E212", "origin=DEL&destination=BOM"]
+
+
+@pytest.mark.api
+@pytest.mark.parametrize("filters", PARTIAL_FILTERS)
+@pytest.mark.parametrize("sort_by", ["price", "date", "departure_time"])
+def test_fields_with_every_sort(client, filters, sort_by):
+    """?fields= works with every sort order and filter path"""
+    response = client.get(f"/api/flights?{filters}&fields=id&sort_by={sort_by}")
+
+    assert response.status_code == 200, response.get_json()
+    data = response.get_json()
+    assert data["success"] is True
+    assert all(list(f) == ["id"] for f in data["flights"])
+
+
+@pytest.mark.api
+@pytest.mark.parametrize("sort_by", ["price", "date", "departure_time"])
+def test_fields_with_price_filter(client, sort_by):
+    """Price filters still apply when dynamic_price is not a requested field"""
+    full = client.get("/api/flights?min_price=0&dynamic_pricing=false").get_json()["flights"]
+    cheap = sorted(f["price"] for f in full)[len(full) // 2]
+
+    response = client.get(f"/api/flights?fields=id&dynamic_pricing=false&max_price={cheap}&sort_by={sort_by}")
+
+    assert response.status_code == 200
+    expected = {f["id"] for f in full if f["price"] <= cheap}
+    assert {f["id"] for f in response.get_json()["flights"]} == expected
+
+
+@pytest.mark.api
+def test_fields_view(client):
+    """Named views expand to their fields"""
+    response = client.get("/api/flights?fields=card")
+
+    assert response.status_code == 200
+    flight = response.get_json()["flights"][0]
+    assert set(flight) <= set(FLIGHT_VIEWS["card"])
+
+
+@pytest.mark.api
+def test_unknown_field(client):
+    response = client.get("/api/flights?fields=id,nope")
+
+    assert response.status_code == 400
+    assert "Unknown field: nope" in response.get_json()["error"]
+
+
+def test_parse_fields():
+    assert parse_fields("") is None
+    assert parse_fields(" , ") is None
+    assert parse_fields("price,id") == ("id", "price")  # output order follows the flight fields
+    with pytest.raises(ValueError):
+        parse_fields("bogus")
+
+
+def test_project():
+    record = {"id": "AI101", "price": 5000, "airline": "Air India"}
+    assert project(record, None) is record
+    assert project(record, ("id", "price", "missing")) == {"id": "AI101", "price": 5000}
+
+
+def _fragment_bytes(fragment):
+    return fragment.contents if hasattr(fragment, "contents") else fragment.data
+
+
+def test_encoded_flights_caches_catalog_rows_only(monkeypatch):
+    """Catalogue rows are encoded once; rows built for a request every time"""
+    calls = []
+    monkeypatch.setattr(projection, "encode", lambda obj: calls.append(obj) or encode(obj))
+    cached = CatalogRow(id="AI101", price=5000)
+    fresh = {"id": "6E212", "price": 4000}
+
+    first = _fragment_bytes(encoded_flights([cached, fresh]))
+    fresh["price"] = 4100
+    second = _fragment_bytes(encoded_flights([cached, fresh]))
+
+    assert json.loads(first) == [{"id": "AI101", "price": 5000}, {"id": "6E212", "price": 4000}]
+    assert json.loads(second) == [{"id": "AI101", "price": 5000}, {"id": "6E212", "price": 4100}]
+    assert [c["id"] for c in calls] == ["AI101", "6E212", "6E212"]
+
+
+@pytest.mark.api
+def test_full_rows_follow_flight_changes(client, test_app):
+    """Pre-encoded catalogue rows are replaced when their flight changes"""
+    def prices():
+        flights = client.get("/api/flights?origin=DEL&destination=BOM&dynamic_pricing=false").get_json()["flights"]
+        return {f["id"]: f["price"] for f in flights}
+
+    before = prices()
+    with test_app.app_context():
+        from models import Flight, db
+        db.session.get(Flight, "AI101").price += 1000
+        db.session.commit()
+
+    assert prices() == {**before, "AI101": before["AI101"] + 1000}
+
+
+@pytest.mark.api
+@pytest.mark.parametrize("limit", ["abc", "0", "-3", "1.5"])
+def test_invalid_limit(client, limit):
+    response = client.get(f"/api/flights?limit={limit}")
+
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "limit must be a positive integer"
+
+
+@pytest.mark.api
+def test_limit(client):
+    response = client.get("/api/flights?limit=2&sort_by=date")
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert len(data["flights"]) == 2 and data["meta"]["limit"] == 2
+
+
+@pytest.mark.api
+def test_ids_filtered_out_by_price_are_missing(client):
+    """An id that exists but fails a price filter is reported missing, not silently dropped"""
+    full = {f["id"]: f["price"] for f in client.get("/api/flights?ids=AI101,6E212&dynamic_pricing=false")
+            .get_json()["flights"]}
+    cheaper = min(full, key=full.get)
+
+    response = client.get(f"/api/flights?ids=AI101,6E212&dynamic_pricing=false&max_price={full[cheaper]}")
+
+    data = response.get_json()
+    assert [f["id"] for f in data["flights"]] == [cheaper]
+    assert data["meta"]["missing_ids"] == [fid for fid in ("AI101", "6E212") if fid != cheaper]
@@ -0,0 +1,58 @@
+"""
+Flight Card Fragment Cache Tests (in-process)
+"""
+
+import json
+import re
+
+import pytest
+
+from models import db, Flight
+
+
+def card(html, flight_id):
+    """The rendered card of ``flight_id`` in a page"""
+    cards = re.findall(r'<div class="card hover.*?(?=<div class="card hover|\Z)', html, re.S)
+    return next(c for c in cards if f"#{flight_id}<" in c)
+
+
+def flight_dict(**changes):
+    flight = {"id": "FC1", "airline": "Cache Air", "origin": "DEL", "destination": "BOM", "date": "2030-01-01",
+              "dep_time": "08:00", "arr_time": "10:00", "status": "On Time", "price": 5000, "dynamic_price": 5500,
+              "price_trend": "moderate", "occupancy_rate": 0.25, "days_until_departure": 30}
+    return {**flight, **changes}
+
+
+@pytest.mark.parametrize("changes, shown", [
+    ({"dynamic_price": 6150}, "₹6,150"),
+    ({"occupancy_rate": 0.5}, "50.0% booked"),
+    ({"status": "Delayed"}, "Delayed"),
+    ({"days_until_departure": 29}, "29 days left"),
+])
+def test_changed_card_is_rendered_again(test_app, changes, shown):
+    cards = test_app.extensions["fragment_cache"]
+    with test_app.test_request_context():
+        first = cards.render([flight_dict()], "")
+        assert cards.render([flight_dict()], "") == first   # unchanged: served from the cache
+
+        second = cards.render([flight_dict(**changes)], "")
+
+    assert shown not in first and shown in second
+
+
+@pytest.mark.search
+def test_home_page_shows_flight_changes(client, test_app):
+    """Price, seats and status edited through the ORM show up on the next page view"""
+    before = card(client.get("/").get_data(as_text=True), "AI101")
+    with test_app.app_context():
+        flight = db.session.get(Flight, "AI101")
+        flight.price = 12345
+        flight.status = "Boarding"
+        flight.booked_seats = json.dumps([f"{row}{col}" for row in range(1, 7) for col in "ABCDEF"])
+        db.session.commit()
+        rate = round(36 / (flight.seat_rows * flight.seat_cols) * 100)
+
+    after = card(client.get("/").get_data(as_text=True), "AI101")
+    assert "Boarding" not in before
+    assert "Boarding" in after and "₹12,345" in after
+    assert f"{rate}.0% booked" in after
@@ -0,0 +1,73 @@
+"""
+HTTP Load Harness Report Tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from bench_http_load import (BUCKET_BOUNDS_MS, PERCENTILES, Recorder, histogram, parse_mix,  # noqa: E402
+                             print_table, results)
+
+
+@pytest.fixture
+def recorder():
+    recorder = Recorder()
+    for ms in range(1, 101):
+        recorder.record("GET /api/flights", float(ms), 200, True)
+    for ms, status in ((5.0, 201), (7.0, 400), (9.0, 500)):
+        recorder.record("POST /api/bookings", ms, status, status != 500)
+    return recorder
+
+
+def test_parse_mix():
+    assert parse_mix("flights=2,home,search=0") == {"flights": 2.0, "home": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("flights=1,nope=1")
+    with pytest.raises(ValueError):
+        parse_mix("flights=0")
+
+
+def test_histogram_buckets():
+    counts = histogram([0.05, 0.1, 0.11, BUCKET_BOUNDS_MS[-1] + 1])
+
+    assert len(counts) == len(BUCKET_BOUNDS_MS) + 1 and sum(counts) == 4
+    assert counts[0] == 2 and counts[1] == 1 and counts[-1] == 1
+
+
+def test_results(recorder):
+    report = results(recorder, duration=10)
+
+    flights = report["endpoints"]["GET /api/flights"]
+    assert flights["requests"] == 100 and flights["per_sec"] == 10.0 and flights["errors"] == 0
+    assert [flights[f"p{p}_ms"] for p in PERCENTILES] == [float(p) for p in PERCENTILES]
+    assert flights["mean_ms"] == 50.5 and flights["max_ms"] == 100.0
+    assert sum(flights["histogram"]) == 100
+
+    bookings = report["endpoints"]["POST /api/bookings"]
+    assert bookings["statuses"] == {"201": 1, "400": 1, "500": 1}
+    assert bookings["errors"] == 1
+    assert report["total"]["requests"] == 103 and report["total"]["errors"] == 1
+    assert report["histogram_bounds_ms"] == BUCKET_BOUNDS_MS
+
+
+def test_results_without_samples():
+    assert results(Recorder(), duration=1) == {"total": None, "histogram_bounds_ms": BUCKET_BOUNDS_MS,
+                                               "endpoints": {}}
+
+
+def test_print_table_with_baseline(recorder, capsys):
+    report = results(recorder, duration=10)
+    baseline = {**results(recorder, duration=20), "commit": "abc1234"}
+
+    print_table(report, baseline)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split()[:4] == ["endpoint", "requests", "req/s", "errors"]
+    assert [line.split()[0] for line in lines[1::2]] == ["all", "GET", "POST"]
+    comparisons = lines[2::2]
+    assert all(line.strip().startswith("vs abc1234") for line in comparisons)
+    assert comparisons[1].split()[2:] == ["+100%", "+0%", "+0%", "+0%", "+0%"]   # twice the rate, same latency
@@ -0,0 +1,82 @@
+"""
+Connecting Itinerary Tests (in-process)
+"""
+
+import pytest
+
+from models import db, Flight
+
+
+def add_flight(flight_id, origin, destination, dep_time, arr_time, date="2030-01-01"):
+    db.session.add(Flight(id=flight_id, airline="Test Air", origin=origin, destination=destination, date=date,
+                          dep_time=dep_time, arr_time=arr_time, price=4000, seat_rows=10, seat_cols=6))
+
+
+@pytest.fixture
+def connections(test_app):
+    """DEL -> BOM -> GOI with a 90 minute layover, plus a connection that leaves too soon"""
+    with test_app.app_context():
+        add_flight("IT1", "DEL", "BOM", "08:00", "10:00")
+        add_flight("IT2", "BOM", "GOI", "11:30", "13:00")
+        add_flight("IT3", "BOM", "GOI", "10:15", "11:45")
+        db.session.commit()
+    return test_app
+
+
+@pytest.mark.api
+def test_connecting_itinerary(client, connections):
+    response = client.get("/api/itineraries?origin=DEL&destination=GOI&date=2030-01-01")
+
+    assert response.status_code == 200
+    itineraries = response.get_json()["itineraries"]
+    assert [[leg["id"] for leg in i["legs"]] for i in itineraries] == [["IT1", "IT2"]]
+    assert itineraries[0]["stops"] == 1
+    assert itineraries[0]["layovers_minutes"] == [90]
+    assert itineraries[0]["duration_minutes"] == 300
+
+
+@pytest.mark.api
+def test_layover_bounds(client, connections):
+    """A shorter minimum layover admits the tight connection"""
+    response = client.get("/api/itineraries?origin=DEL&destination=GOI&date=2030-01-01&min_layover=10")
+
+    legs = [[leg["id"] for leg in i["legs"]] for i in response.get_json()["itineraries"]]
+    assert legs == [["IT1", "IT3"], ["IT1", "IT2"]]
+
+
+@pytest.mark.api
+def test_graph_follows_schedule_changes(client, connections):
+    """Flights removed through the ORM leave the route graph"""
+    client.get("/api/itineraries?origin=DEL&destination=GOI")
+    with connections.app_context():
+        db.session.delete(db.session.get(Flight, "IT2"))
+        db.session.commit()
+
+    response = client.get("/api/itineraries?origin=DEL&destination=GOI&date=2030-01-01")
+    assert response.get_json()["itineraries"] == []
+
+
+@pytest.mark.api
+@pytest.mark.parametrize("query", ["origin=DEL", "origin=DEL&destination=GOI&date=garbage",
+                                   "origin=DEL&destination=GOI&max_legs=x"])
+def test_itineraries_invalid_input(client, query):
+    response = client.get(f"/api/itineraries?{query}")
+
+    assert response.status_code == 400
+
+
+@pytest.mark.search
+def test_search_page_with_malformed_date(client, connections):
+    """A bad date is reported on the page instead of failing the itinerary search"""
+    response = client.get("/search?origin=DEL&destination=GOI&date=garbage")
+
+    assert response.status_code == 200
+    assert b"date must be YYYY-MM-DD" in response.data
+
+
+@pytest.mark.search
+def test_search_page_shows_connections(client, connections):
+    response = client.get("/search?origin=DEL&destination=GOI&date=2030-01-01")
+
+    assert response.status_code == 200
+    assert b"IT1" in response.data and b"IT2" in response.data
@@ -0,0 +1,65 @@
+"""
+Keyset Pagination Tests (in-process)
+"""
+
+import pytest
+
+from pagination import departure_key, encode_cursor, keyset_page, parse_cursor, sorted_by_departure
+
+FLIGHTS = [
+    {"id": "B2", "date": "2025-09-08", "dep_time": "09:00"},
+    {"id": "A1", "date": "", "dep_time": "15:15"},  # not scheduled yet, like UK777
+    {"id": "C3", "date": "2025-09-08", "dep_time": "09:00"},
+    {"id": "D4", "date": "2025-09-09", "dep_time": ""},
+]
+
+
+def test_cursor_round_trip():
+    for flight in FLIGHTS:
+        key = departure_key(flight)
+        assert parse_cursor(encode_cursor(key)) == key
+
+
+@pytest.mark.parametrize("value", ["2025-09-08,09:00", "2025-09-08,09:00,", ",,", "garbage"])
+def test_malformed_cursor(value):
+    with pytest.raises(ValueError):
+        parse_cursor(value)
+
+
+def test_keyset_pages():
+    """Following next cursors visits every flight once, in departure order"""
+    flights, keys = sorted_by_departure(FLIGHTS)
+    seen, after = [], None
+    while True:
+        page, cursor = keyset_page(flights, keys, after, limit=1)
+        seen.extend(f["id"] for f in page)
+        if cursor is None:
+            break
+        after = parse_cursor(cursor)
+
+    assert seen == ["A1", "B2", "C3", "D4"]
+
+
+@pytest.mark.search
+def test_home_after_unscheduled_flight(client):
+    """A cursor at a flight with an empty date continues after it"""
+    response = client.get("/?after=,15:15,UK777&partial=1")
+
+    assert response.status_code == 200
+    assert b"UK777" not in response.data and b"AI101" in response.data
+
+
+@pytest.mark.search
+def test_home_invalid_cursor(client):
+    response = client.get("/?after=nonsense&partial=1")
+
+    assert response.status_code == 400
+    assert response.get_json()["success"] is False
+
+
+@pytest.mark.search
+def test_search_after_unscheduled_flight(client):
+    response = client.get("/search?origin=BOM&after=,15:15,UK777&partial=1")
+
+    assert response.status_code == 200
+    assert b"UK777" not in response.data and b"121212aabc" in response.data
@@ -0,0 +1,91 @@
+"""
+Price Curve Tests (in-process)
+"""
+
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+import pricing_rules
+from pricing import finalize_price
+
+APP_DIR = os.path.join(os.path.dirname(__file__), '..', 'flight_reservation_system')
+
+
+@pytest.mark.api
+def test_price_curve_matches_pricing(client, test_app):
+    """Every grid point equals the pricing model without market fluctuation"""
+    response = client.get("/api/pricing/curve/AI101?occupancy_steps=6&max_days=10")
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert len(data["prices"]) == 6 and all(len(row) == 11 for row in data["prices"])
+
+    rules = pricing_rules.current()
+    with test_app.app_context():
+        from models import Flight, db
+        flight = db.session.get(Flight, "AI101")
+        for i, occupancy in enumerate(data["occupancy"]):
+            for day in data["days"]:
+                multiplier = (rules.occupancy_factor(occupancy) * rules.time_factor(day)
+                              * rules.peak_factor(flight.dep_hour) * rules.weekday_factor(flight.weekday)
+                              * rules.route_factor(flight.route_key))
+                assert data["prices"][i][day] == finalize_price(flight.price, multiplier, 1, rules)
+
+
+@pytest.mark.api
+def test_price_curves_batch(client):
+    response = client.get("/api/pricing/curves?ids=AI101,NOPE,6E212&occupancy_steps=3&max_days=2")
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [c["flight_id"] for c in data["curves"]] == ["AI101", "6E212"]
+    assert data["missing_ids"] == ["NOPE"]
+
+
+@pytest.mark.api
+@pytest.mark.parametrize("query", ["occupancy_steps=1", "occupancy_steps=x", "max_days=400", "max_days=-1"])
+def test_price_curve_invalid_grid(client, query):
+    response = client.get(f"/api/pricing/curve/AI101?{query}")
+
+    assert response.status_code == 400
+
+
+@pytest.mark.api
+def test_price_curve_unknown_flight(client):
+    assert client.get("/api/pricing/curve/NOPE").status_code == 404
+
+
+def test_batch_factors_match_rules():
+    """Batch lookups give each flight the factors the scalar rules give it, edge values included"""
+    from price_curves import curve_grid, flight_factors, price_curves
+
+    rules = pricing_rules.current()
+    flights = [SimpleNamespace(price=price, dep_hour=hour, weekday=weekday, route_key=route)
+               for price, hour, weekday, route in [(5000, None, None, None), (3700, -1, 0, "DEL-BOM"),
+                                                   (4200, 0, 4, "BOM-GOI"), (9999, 6, 5, "BLR-DEL"),
+                                                   (2500, 9, 6, ""), (6100, 23, 3, "DEL-BLR")]]
+    peak, weekday, route = flight_factors(flights, rules)
+    assert peak.tolist() == [rules.peak_factor(f.dep_hour) for f in flights]
+    assert weekday.tolist() == [rules.weekday_factor(f.weekday) for f in flights]
+    assert route.tolist() == [rules.route_factor(f.route_key) for f in flights]
+
+    occupancy, days = curve_grid(5, 50)
+    prices = price_curves(flights, occupancy, days, rules)
+    for f, curve in zip(flights, prices):
+        for i, rate in enumerate(occupancy):
+            for day in days:
+                multiplier = (rules.occupancy_factor(rate) * rules.time_factor(day) * rules.peak_factor(f.dep_hour)
+                              * rules.weekday_factor(f.weekday) * rules.route_factor(f.route_key))
+                assert curve[i][day] == finalize_price(f.price, multiplier, 1, rules)
+
+
+def test_app_import_does_not_load_numpy():
+    """NumPy is loaded by the curve routes, not by every worker at startup"""
+    probe = "import sys, app; print('numpy' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", probe], cwd=APP_DIR, capture_output=True, text=True, check=True)
+
+    assert out.stdout.strip().splitlines()[-1] == "False"
@@ -0,0 +1,109 @@
+"""
+Price History Tests (in-process)
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from models import db, PriceHistory
+from price_history import DAY, HOUR, MAX_DAILY_POINTS, POINT, downsample, pack, price_history, unpack
+
+FLIGHT = SimpleNamespace(id="AI101")
+
+
+def test_pack_round_trip():
+    points = [(0, 5000), (HOUR, 5100), (2 ** 32 - 1, 0)]
+    assert unpack(pack(points)) == points
+    assert unpack(b"") == []
+
+
+def test_downsample_by_age():
+    """Recent points are kept as is, older ones averaged per hour, then per day"""
+    now = 10 * DAY
+    daily = [(2 * DAY, 100), (2 * DAY + HOUR, 200)]
+    hourly = [(8 * DAY, 300), (8 * DAY + 600, 500)]
+    recent = [(now - 600, 700), (now - 300, 800)]
+
+    assert downsample(daily + hourly + recent, now) == [(2 * DAY, 150), (8 * DAY, 400)] + recent
+
+
+def test_downsample_keeps_bounded_daily_points():
+    points = [(day * DAY, day) for day in range(MAX_DAILY_POINTS + 50)]
+
+    series = downsample(points, (MAX_DAILY_POINTS + 60) * DAY)
+    assert len(series) == MAX_DAILY_POINTS
+    assert series[-1] == points[-1]
+
+
+@pytest.mark.api
+def test_prices_are_recorded(client, test_app):
+    """Served prices are sampled at most once per interval and exposed per flight"""
+    client.get("/api/flights")
+    client.get("/api/flights?ids=AI101")
+    with test_app.app_context():
+        assert price_history.flush() == 11
+
+    response = client.get("/api/flights/AI101/price-history")
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["meta"]["points"] == 1 and len(data["times"]) == 1
+    assert data["prices"][0] > 0
+
+
+@pytest.mark.api
+def test_price_history_unknown_flight(client):
+    assert client.get("/api/flights/NOPE/price-history").status_code == 404
+
+
+def stored(app, flight_id="AI101"):
+    with app.app_context():
+        row = db.session.get(PriceHistory, flight_id)
+        data = row.points if row is not None else b""
+        db.session.remove()
+        return data
+
+
+def test_flush_appends(test_app):
+    """A flush adds the new points to the row without rewriting the older ones"""
+    recorder = test_app.extensions["price_history"]
+    with test_app.app_context():
+        recorder.record([FLIGHT], [5000], 10 * DAY)
+        recorder.flush()
+        first = stored(test_app)
+        recorder.record([FLIGHT], [5100], 10 * DAY + HOUR)
+        recorder.record([FLIGHT], [5200], 10 * DAY + 2 * HOUR)
+        assert recorder.flush() == 2
+
+    data = stored(test_app)
+    assert len(data) == len(first) + 2 * POINT.size and data.startswith(first)
+    assert unpack(data) == [(10 * DAY, 5000), (10 * DAY + HOUR, 5100), (10 * DAY + 2 * HOUR, 5200)]
+
+
+def test_compaction_downsamples(test_app):
+    recorder = test_app.extensions["price_history"]
+    points = [(DAY + i * 600, 4000 + i) for i in range(0, 12 * 24 * 6, 7)]   # ~5 days every 70 minutes
+    with test_app.app_context():
+        for t, price in points:
+            recorder.record([FLIGHT], [price], t)
+        recorder.flush()
+        assert len(price_history.series("AI101")) == len(points)
+
+        now = points[-1][0]
+        assert price_history.compact(now=now) == 1
+        assert price_history.series("AI101") == downsample(points, now)
+        assert price_history.compact(now=now) == 0   # nothing appended since
+
+
+def test_failed_append_is_kept_for_next_flush(test_app, monkeypatch):
+    recorder = test_app.extensions["price_history"]
+    with test_app.app_context():
+        recorder.record([FLIGHT], [5000], 10 * DAY)
+        monkeypatch.setattr(recorder, "_append", lambda by_flight, now: False)
+        assert recorder.flush() == 0
+        assert recorder.points_written == 0 and len(recorder.pending) == 1
+
+        monkeypatch.undo()
+        assert recorder.flush() == 1
+        assert price_history.series("AI101") == [(10 * DAY, 5000)]
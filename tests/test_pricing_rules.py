@@ -0,0 +1,174 @@
+"""
+Pricing Rules Tests
+"""
+
+import json
+import math
+import os
+import shutil
+
+import pytest
+
+import pricing_rules
+from pricing import finalize_price
+from pricing_rules import PricingRules, _RulesFile
+
+
+# The factor ladders the rules file replaced, kept as the reference
+def legacy_occupancy_factor(rate):
+    if rate >= 0.8:
+        return 1.6
+    elif rate >= 0.6:
+        return 1.4
+    elif rate >= 0.4:
+        return 1.2
+    elif rate >= 0.2:
+        return 1.1
+    return 0.95
+
+
+def legacy_time_factor(days):
+    if days >= 45:
+        return 0.75
+    elif days >= 30:
+        return 0.8
+    elif days >= 21:
+        return 0.9
+    elif days >= 14:
+        return 1.0
+    elif days >= 7:
+        return 1.25
+    elif days >= 3:
+        return 1.5
+    elif days >= 1:
+        return 1.75
+    return 2.0
+
+
+def legacy_peak_factor(hour):
+    if hour is None:
+        return 1.0
+    if (6 <= hour <= 9) or (18 <= hour <= 21):
+        return 1.15
+    return 1.0
+
+
+def legacy_weekday_factor(day_of_week):
+    if day_of_week is None:
+        return 1.0
+    if day_of_week >= 5:
+        return 1.1
+    elif day_of_week == 4:
+        return 1.05
+    return 1.0
+
+
+def legacy_finalize_price(base_price, multiplier, fluctuation):
+    dynamic_price = math.ceil(base_price * multiplier * fluctuation / 50) * 50
+    return max(int(base_price * 0.7), int(dynamic_price))
+
+
+@pytest.fixture(scope="module")
+def shipped():
+    return PricingRules.load(os.path.join(os.path.dirname(pricing_rules.__file__), "pricing_rules.json"))
+
+
+def around(bounds, step):
+    """Each breakpoint and its neighbours just below and above"""
+    return sorted({v for b in bounds for v in (b - step, b, b + step)})
+
+
+def test_occupancy_parity(shipped):
+    rates = around([0, 0.2, 0.4, 0.6, 0.8, 1.0], 1e-9) + [i / 100 for i in range(101)]
+    assert [shipped.occupancy_factor(r) for r in rates] == [legacy_occupancy_factor(r) for r in rates]
+
+
+def test_days_parity(shipped):
+    days = around([0, 1, 3, 7, 14, 21, 30, 45], 1e-6) + list(range(-2, 400))
+    assert [shipped.time_factor(d) for d in days] == [legacy_time_factor(d) for d in days]
+
+
+def test_hour_and_weekday_parity(shipped):
+    hours = [None, -1, 24] + list(range(24))
+    assert [shipped.peak_factor(h) for h in hours] == [legacy_peak_factor(h) for h in hours]
+    days = [None] + list(range(7))
+    assert [shipped.weekday_factor(d) for d in days] == [legacy_weekday_factor(d) for d in days]
+
+
+def test_route_and_price_parity(shipped):
+    assert shipped.route_factor("DEL-BOM") == 1.1 and shipped.route_factor("BOM-GOI") == 1.0
+    for base in (999, 3700, 5000, 12345):
+        for multiplier in (0.5, 0.7, 1.0, 1.37, 2.9):
+            for fluctuation in (0.97, 1.0, 1.03):
+                assert (finalize_price(base, multiplier, fluctuation, shipped)
+                        == legacy_finalize_price(base, multiplier, fluctuation))
+
+
+def test_hour_ranges_wrap_midnight():
+    config = json.load(open(pricing_rules.RULES_PATH))
+    config["departure_hour"]["ranges"] = [{"from": 22, "to": 5, "factor": 0.9}]
+    rules = PricingRules(config)
+
+    assert [h for h in range(24) if rules.peak_factor(h) == 0.9] == [0, 1, 2, 3, 4, 5, 22, 23]
+
+
+# ------------------ Hot reload ------------------
+@pytest.fixture
+def rules_file(tmp_path):
+    path = tmp_path / "pricing_rules.json"
+    shutil.copy(pricing_rules.RULES_PATH, path)
+    return path
+
+
+def rewrite(path, text, tick):
+    """Replace the file with a modification time that differs even on coarse clocks"""
+    path.write_text(text)
+    os.utime(path, ns=(tick * 10 ** 9, tick * 10 ** 9))
+
+
+def with_version(path, version, **changes):
+    config = json.load(open(path))
+    config["version"] = version
+    config.update(changes)
+    return json.dumps(config)
+
+
+def test_reload_on_mtime_change(rules_file):
+    loaded = _RulesFile(str(rules_file), check_interval=0)
+    first = loaded.get()
+    assert loaded.get() is first  # unchanged file: no recompile
+
+    rewrite(rules_file, with_version(rules_file, "v2", routes={"premium": ["BOM-GOI"], "premium_factor": 1.3}), 1)
+
+    rules = loaded.get()
+    assert rules.version == "v2"
+    assert rules.route_factor("BOM-GOI") == 1.3
+
+
+def test_reload_waits_for_check_interval(rules_file):
+    loaded = _RulesFile(str(rules_file), check_interval=3600)
+    first = loaded.get()
+    rewrite(rules_file, with_version(rules_file, "v2"), 1)
+
+    assert loaded.get() is first
+
+
+@pytest.mark.parametrize("text", ["{not json", '{"version": "broken"}',
+                                  '{"version": "v3", "weekday": {"base": 1, "days": {"funday": 2}}}'])
+def test_malformed_file_keeps_previous_rules(rules_file, text):
+    loaded = _RulesFile(str(rules_file), check_interval=0)
+    first = loaded.get()
+
+    rewrite(rules_file, text, 1)
+    assert loaded.get() is first
+
+    # Fixing the file is picked up again
+    rewrite(rules_file, with_version(pricing_rules.RULES_PATH, "v4"), 2)
+    assert loaded.get().version == "v4"
+
+
+def test_malformed_file_without_previous_rules_raises(rules_file):
+    rules_file.write_text("{not json")
+
+    with pytest.raises(ValueError):
+        _RulesFile(str(rules_file), check_interval=0).get()
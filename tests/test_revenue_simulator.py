@@ -0,0 +1,78 @@
+"""
+Revenue Simulator Tests (in-process)
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+import pricing_rules
+import revenue_simulator
+from revenue_simulator import SimFlight, run, simulate
+
+FLIGHTS = [SimFlight(f"SIM{i}", 5000 + 100 * i, 60, i * 5, 8 + i, i % 7, "DEL-BOM", 10 + i * 7) for i in range(5)]
+
+
+def test_simulate_bounds():
+    """Load factors stay within capacity; revenue is never negative"""
+    report = simulate(FLIGHTS, scenarios=200)
+
+    assert report["total"]["flights"] == len(FLIGHTS)
+    for flight in report["flights"]:
+        assert 0 <= flight["load_factor"]["p5"] <= flight["load_factor"]["p95"] <= 1
+        assert flight["revenue"]["p5"] >= 0
+    assert report["total"]["revenue"]["mean"] == pytest.approx(
+        sum(f["revenue"]["mean"] for f in report["flights"]), rel=1e-6)
+
+
+def test_simulate_is_reproducible_across_processes(monkeypatch):
+    """Same seed, same result in one process or on a pool"""
+    flights = [f._replace(id=f"{f.id}-{n}") for n in range(30) for f in FLIGHTS]
+    single = simulate(flights, scenarios=50, processes=1, seed=7)
+    monkeypatch.setattr(revenue_simulator, "POOL_MIN_STEPS", 0)
+    pooled = simulate(flights, scenarios=50, processes=2, seed=7)
+
+    assert single == pooled
+
+
+def test_small_runs_stay_in_process(monkeypatch):
+    """A run below POOL_MIN_STEPS never starts a pool"""
+    def no_pool(*args, **kwargs):
+        raise AssertionError("process pool started for a small run")
+    monkeypatch.setattr(revenue_simulator, "ProcessPoolExecutor", no_pool)
+
+    flights = [f._replace(id=f"{f.id}-{n}") for n in range(30) for f in FLIGHTS]
+    assert simulate(flights, scenarios=50, processes=4)["total"]["flights"] == len(flights)
+
+
+@pytest.mark.parametrize("options", [{"scenarios": 0}, {"decay": 0}, {"demand": -1}, {"window": -1}])
+def test_simulate_invalid_parameters(options):
+    with pytest.raises(ValueError):
+        simulate(FLIGHTS, **options)
+
+
+def test_run_limit_counts_flights_on_sale(test_app):
+    """--limit picks the earliest flights that have not departed yet"""
+    with test_app.app_context():
+        result = run(limit=2, scenarios=20, now=datetime(2025, 9, 12, 12, 0))
+
+    flights = result["current"]["flights"]
+    assert [f["id"] for f in flights] == ["UK887", "QP555"]  # UK887 leaves at 17:50 that day
+    assert all(f["days_until_departure"] >= 0 for f in flights)
+
+
+def test_run_compares_candidate_rules(test_app, tmp_path):
+    """A candidate rules file is simulated alongside the rules in force"""
+    config = json.load(open(pricing_rules.RULES_PATH))
+    config["version"] = "candidate"
+    config["occupancy"]["base"] *= 1.5
+    path = tmp_path / "candidate.json"
+    path.write_text(json.dumps(config))
+
+    with test_app.app_context():
+        result = run(candidate_rules=str(path), scenarios=50, now=datetime(2025, 9, 1))
+
+    assert result["candidate"]["rules_version"] == "candidate"
+    assert result["current"]["total"]["flights"] == result["candidate"]["total"]["flights"] > 0
+    assert result["candidate"]["total"]["load_factor"]["mean"] < result["current"]["total"]["load_factor"]["mean"]
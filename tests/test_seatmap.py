@@ -0,0 +1,83 @@
+"""
+Seat Map Encoding Tests
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+from types import SimpleNamespace
+
+import pytest
+
+from seatmap import SEAT_LETTERS, seat_map
+
+SCRIPT = os.path.join(os.path.dirname(__file__), '..', 'flight_reservation_system', 'static', 'script.js')
+
+
+def make_flight(rows, cols, booked):
+    return SimpleNamespace(seat_rows=rows, seat_cols=cols, booked_seats=json.dumps(booked),
+                           get_booked_seats=lambda: list(booked))
+
+
+def every_seat(rows, cols):
+    return [f"{row}{letter}" for row in range(1, rows + 1) for letter in SEAT_LETTERS[:cols]]
+
+
+CASES = {
+    "empty": make_flight(12, 6, []),
+    "full": make_flight(12, 6, every_seat(12, 6)),
+    "some": make_flight(12, 6, ["1A", "3F", "12C"]),
+    "narrow": make_flight(30, 4, ["30D", "1B", "15A"]),
+    "wide": make_flight(3, 10, ["2J", "3A", "1E"]),
+}
+
+
+def decode_compact(seats):
+    """The booked seats a client reads from the compact rows"""
+    columns = seats["layout"]["columns"]
+    return {f"{row}{columns[c]}" for row, states in enumerate(seats["rows"], start=1)
+            for c, state in enumerate(states) if state == "x"}
+
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_compact_round_trip(name):
+    flight = CASES[name]
+    compact = seat_map(flight, "compact")
+    full = seat_map(flight, "full")
+
+    assert compact["layout"] == {"rows": flight.seat_rows, "cols": flight.seat_cols,
+                                 "columns": SEAT_LETTERS[:flight.seat_cols]}
+    assert len(compact["rows"]) == flight.seat_rows
+    assert all(len(row) == flight.seat_cols for row in compact["rows"])
+    assert decode_compact(compact) == set(json.loads(flight.booked_seats))
+    assert decode_compact(compact) == {s["seat"] for s in full["seat_map"] if not s["available"]}
+    assert compact["booked"] == full["booked"] == len(json.loads(flight.booked_seats))
+    assert compact["total"] - compact["available"] == compact["booked"]
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+def test_client_decoder_round_trip():
+    """script.js SeatMap.decode gives back the layout and booked seats the server encoded"""
+    source = open(SCRIPT, encoding="utf-8").read()
+    seatmap_js = re.search(r"const SeatMap = \{.*?\n\};", source, re.S).group(0)
+    payload = {name: seat_map(flight, "compact") for name, flight in CASES.items()}
+    program = (seatmap_js + "\nconst input = JSON.parse(require('fs').readFileSync(0, 'utf8'));\n"
+               "const out = {};\nfor (const name in input) out[name] = SeatMap.decode(input[name]);\n"
+               "console.log(JSON.stringify(out));")
+    result = subprocess.run(["node", "-e", program], input=json.dumps(payload),
+                            capture_output=True, text=True, check=True)
+
+    decoded = json.loads(result.stdout)
+    for name, flight in CASES.items():
+        assert decoded[name]["rows"] == flight.seat_rows and decoded[name]["cols"] == flight.seat_cols
+        assert sorted(decoded[name]["booked"]) == sorted(json.loads(flight.booked_seats))
+
+
+@pytest.mark.api
+def test_seats_api_compact(client):
+    compact = client.get("/api/flights/AI101/seats?format=compact").get_json()["seats"]
+    full = client.get("/api/flights/AI101/seats").get_json()["seats"]
+
+    assert decode_compact(compact) == set(full["booked_seats"])
@@ -0,0 +1,101 @@
+"""
+Static Asset and Response Compression Tests (in-process)
+"""
+
+import gzip
+import json
+import os
+import re
+
+import pytest
+from flask import url_for
+
+import assets
+
+STATIC_DIR = os.path.join(os.path.dirname(__file__), '..', 'flight_reservation_system', 'static')
+
+
+def static_file(name):
+    with open(os.path.join(STATIC_DIR, name), "rb") as f:
+        return f.read()
+
+
+@pytest.fixture
+def style_url(test_app):
+    with test_app.test_request_context():
+        return url_for("static", filename="style.css")
+
+
+def test_static_urls_are_fingerprinted(style_url):
+    assert re.fullmatch(r"/static/style\.[0-9a-f]{12}\.css", style_url)
+
+
+def test_fingerprinted_asset_gzip(client, style_url):
+    response = client.get(style_url, headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == assets.IMMUTABLE
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.mimetype == "text/css"
+    assert gzip.decompress(response.data) == static_file("style.css")
+
+
+@pytest.mark.parametrize("accept", [None, "identity", "gzip;q=0"])
+def test_fingerprinted_asset_identity(client, style_url, accept):
+    """Clients that don't accept gzip get the file as is"""
+    response = client.get(style_url, headers={"Accept-Encoding": accept} if accept else {})
+
+    assert response.status_code == 200
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["Cache-Control"] == assets.IMMUTABLE
+    assert response.data == static_file("style.css")
+
+
+def test_fingerprinted_asset_revalidation(client, style_url):
+    etag = client.get(style_url, headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+
+    response = client.get(style_url, headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_plain_static_url_still_served(client):
+    response = client.get("/static/style.css")
+
+    assert response.status_code == 200
+    assert response.headers.get("Cache-Control") != assets.IMMUTABLE
+    assert response.get_data() == static_file("style.css")
+    response.close()
+
+
+@pytest.mark.api
+def test_large_json_is_gzipped(client):
+    response = client.get("/api/flights", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert json.loads(gzip.decompress(response.data))["success"] is True
+
+
+@pytest.mark.api
+def test_json_identity_without_gzip(client):
+    response = client.get("/api/flights")
+
+    assert "Content-Encoding" not in response.headers
+    assert response.get_json()["success"] is True
+
+
+@pytest.mark.api
+def test_small_json_is_not_compressed(client):
+    response = client.get("/api/flights/NOPE", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 404
+    assert "Content-Encoding" not in response.headers
+
+
+@pytest.mark.skipif(assets.brotli is not None, reason="brotli is installed")
+def test_brotli_request_falls_back_to_gzip(client, style_url):
+    response = client.get(style_url, headers={"Accept-Encoding": "br, gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
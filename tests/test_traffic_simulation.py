@@ -0,0 +1,51 @@
+"""
+Traffic Simulation Benchmark Tests (in-process)
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from _stats import percentile  # noqa: E402
+from bench_traffic import SEAT_COLS, SEAT_ROWS, Simulation, parse_mix, summarize  # noqa: E402
+from models import db, Flight  # noqa: E402
+
+
+def test_parse_mix():
+    assert parse_mix("browse=3,book=1") == {"browse": 0.75, "book": 0.25}
+    with pytest.raises(ValueError):
+        parse_mix("browse=1,shop=1")
+    with pytest.raises(ValueError):
+        parse_mix("browse=0")
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert [percentile(values, p) for p in (50, 95, 99, 100)] == [50, 95, 99, 100]
+    assert percentile([], 50) is None
+
+
+def test_simulation_runs_every_session(test_app):
+    """A short simulation books, pays, downloads and cancels through the real routes without errors"""
+    with test_app.app_context():
+        for i in range(3):
+            db.session.add(Flight(id=f"TS{i}", airline="Sim Air", origin="DEL", destination="GOI",
+                                  date="2030-01-05", dep_time="10:00", arr_time="12:00", price=5000,
+                                  seat_rows=SEAT_ROWS, seat_cols=len(SEAT_COLS)))
+        db.session.commit()
+        catalogue = [(f.id, f.origin, f.destination, f.date, f.seat_rows, f.seat_cols)
+                     for f in Flight.query.filter(Flight.id.like("TS%"))]
+
+    mix = parse_mix("browse=1,book=1,cancel=1")
+    sim = Simulation(test_app, catalogue, random.Random(3), rate=2, duration=5, mix=mix, think=0.5, realtime=False)
+    elapsed = sim.run()
+
+    report = summarize([{"elapsed": elapsed, "latencies": sim.latencies, "errors": sim.errors,
+                         "counters": sim.counters, "max_lag": sim.max_lag}], 5, False)
+    assert report["sessions"] > 0 and report["bookings"] > 0
+    assert all(route["errors"] == 0 for route in report["routes"].values()), report["routes"]
+    assert report["requests"] == sum(len(v) for v in sim.latencies.values())
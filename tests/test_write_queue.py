@@ -0,0 +1,125 @@
+"""
+Group-commit Write Queue Tests (in-process)
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import pytest
+
+from models import db, Flight
+from write_queue import write_queue
+
+
+@pytest.fixture
+def queued_app(tmp_path):
+    """Application with the write queue on and a wait long enough to batch concurrent writes"""
+    from app import create_app
+    from bootstrap import bootstrap_database
+
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'queue.db'}", "TESTING": True,
+                      "WRITE_QUEUE_ENABLED": True, "WRITE_QUEUE_MAX_WAIT_MS": 50})
+    bootstrap_database(app)
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+def add_flight(flight_id, fail=False):
+    db.session.add(Flight(id=flight_id, airline="Queue Air", origin="DEL", destination="BOM", date="2030-01-01",
+                          dep_time="08:00", arr_time="10:00", price=4000, seat_rows=10, seat_cols=6))
+    db.session.flush()
+    if fail:
+        raise ValueError(f"{flight_id} rejected")
+    return flight_id
+
+
+@pytest.mark.booking
+def test_concurrent_bookings_share_commits(queued_app):
+    """Concurrent bookings for different seats all succeed, committed in fewer batches than bookings"""
+    seat_map = queued_app.test_client().get("/api/flights/AI101/seats").get_json()["seats"]["seat_map"]
+    seats = [s["seat"] for s in seat_map if s["available"]][:6]
+
+    def book(seat):
+        return queued_app.test_client().post("/api/bookings", json={
+            "flight_id": "AI101", "fullname": "Queue Tester", "email": "queue@example.com",
+            "phone": "9876543210", "seats": [seat]})
+
+    with ThreadPoolExecutor(max_workers=len(seats)) as pool:
+        responses = list(pool.map(book, seats))
+
+    assert [r.status_code for r in responses] == [201] * len(seats), [r.get_json() for r in responses]
+    writer = write_queue.writer(queued_app)
+    assert writer.jobs_committed == len(seats)
+    assert writer.batches_committed < len(seats)
+
+
+def test_failed_job_rolls_back_alone(queued_app):
+    """A job that raises loses its own changes; the rest of its batch commits"""
+    def submit(args):
+        with queued_app.app_context():
+            try:
+                return write_queue.submit(add_flight, *args)
+            except ValueError as e:
+                return str(e)
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        results = list(pool.map(submit, [("WQ1",), ("WQ2", True), ("WQ3",)]))
+
+    assert results == ["WQ1", "WQ2 rejected", "WQ3"]
+    with queued_app.app_context():
+        assert db.session.get(Flight, "WQ1") and db.session.get(Flight, "WQ3")
+        assert db.session.get(Flight, "WQ2") is None
+
+
+def test_timeout_after_job_started_returns_its_outcome(queued_app):
+    """A job the writer already runs when the caller times out still reports its result"""
+    queued_app.config.update(WRITE_QUEUE_TIMEOUT=0.1, WRITE_QUEUE_MAX_WAIT_MS=0)
+
+    def slow_add(flight_id):
+        time.sleep(0.3)
+        return add_flight(flight_id)
+
+    with queued_app.app_context():
+        assert write_queue.submit(slow_add, "WQ6") == "WQ6"
+        assert db.session.get(Flight, "WQ6") is not None
+
+
+def test_timeout_before_job_started_drops_it(queued_app):
+    """A job still waiting behind a slow batch is cancelled and never committed"""
+    queued_app.config["WRITE_QUEUE_TIMEOUT"] = 0.1
+    started = threading.Event()
+
+    def slow(flight_id):
+        started.set()
+        time.sleep(0.5)
+        return add_flight(flight_id)
+
+    def submit_slow():
+        with queued_app.app_context():
+            write_queue.submit(slow, "WQ7")
+
+    blocker = threading.Thread(target=submit_slow)
+    blocker.start()
+    started.wait(1)
+    with queued_app.app_context():
+        with pytest.raises(FutureTimeout):
+            write_queue.submit(add_flight, "WQ8")
+    blocker.join()
+
+    with queued_app.app_context():
+        assert db.session.get(Flight, "WQ7") is not None
+        assert db.session.get(Flight, "WQ8") is None
+
+
+def test_disabled_queue_runs_inline(test_app):
+    """With the queue off, submit commits in the caller's session and starts no thread"""
+    with test_app.app_context():
+        assert write_queue.submit(add_flight, "WQ4") == "WQ4"
+        with pytest.raises(ValueError):
+            write_queue.submit(add_flight, "WQ5", True)
+        assert db.session.get(Flight, "WQ4") is not None
+        assert db.session.get(Flight, "WQ5") is None
+
+    assert write_queue.writer(test_app).thread is None